@@ -0,0 +1 @@
+"""Benchmarks of `Client` RPCs against in-process stand-in services, see `python -m benchmarks -h`."""
@@ -0,0 +1,76 @@
+"""Command line of the benchmark suite, run from the repository root:
+
+    python -m benchmarks run --sizes 1KB,1MB,64MB --services 1,8 --out base.json
+    python -m benchmarks compare base.json head.json --threshold 0.1
+    python -m benchmarks replay --capacity 1000000 --batch-sizes 32,256 --out replay.json
+"""
+import argparse
+import sys
+
+from .cases import CASES
+from . import replay
+from .runner import compare, format_size, load, parse_size, run, save
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='benchmarks', description='Benchmarks of rlsdk Client RPCs.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    parser_run = commands.add_parser('run', help='run benchmarks against a local stand-in cluster')
+    parser_run.add_argument('--cases', default=','.join(CASES), help='comma separated case names')
+    parser_run.add_argument('--sizes', default='1KB,64KB,1MB,16MB,256MB,1GB', help='payload sizes per service')
+    parser_run.add_argument('--services', default='1,4,16,64', help='numbers of services')
+    parser_run.add_argument('--max-bytes', default='1GB', help='skip combinations moving more bytes per call')
+    parser_run.add_argument('--min-time', type=float, default=1.0, help='minimum seconds of each combination')
+    parser_run.add_argument('--direct', action='store_true', help='bypass BFF for data-heavy RPCs')
+    parser_run.add_argument('--fanout', type=int, default=0, help='concurrency of per-service requests')
+    parser_run.add_argument('--shm', action='store_true', help='move weights and buffers through shared memory')
+    parser_run.add_argument('--out', default='benchmarks.json', help='path of json results')
+
+    parser_replay = commands.add_parser('replay', help='run micro-benchmarks of replay buffers')
+    parser_replay.add_argument('--capacity', type=int, default=1000000, help='capacity of filled buffers')
+    parser_replay.add_argument('--batch-sizes', default='32,256,1024', help='comma separated sizes of sampled batches')
+    parser_replay.add_argument('--obs-dim', type=int, default=8, help='dimension of float32 states')
+    parser_replay.add_argument('--min-time', type=float, default=1.0, help='minimum seconds of each combination')
+    parser_replay.add_argument('--out', default='replay.json', help='path of json results')
+
+    parser_compare = commands.add_parser('compare', help='compare two json results')
+    parser_compare.add_argument('base', help='baseline results')
+    parser_compare.add_argument('head', help='new results')
+    parser_compare.add_argument('--threshold', type=float, default=0.1, help='relative slowdown counted as regression')
+
+    args = parser.parse_args(argv)
+    if args.command == 'run':
+        report = run(
+            cases=args.cases.split(','),
+            sizes=[parse_size(s) for s in args.sizes.split(',')],
+            services=[int(n) for n in args.services.split(',')],
+            max_bytes=parse_size(args.max_bytes),
+            min_time=args.min_time,
+            direct=args.direct,
+            fanout=args.fanout,
+            shm=args.shm,
+        )
+        save(report, args.out)
+        print(f'Results saved to {args.out}.')
+        return 0
+    elif args.command == 'replay':
+        report = replay.run(
+            capacity=args.capacity,
+            batch_sizes=[int(n) for n in args.batch_sizes.split(',')],
+            obs_dim=args.obs_dim,
+            min_time=args.min_time,
+        )
+        save(report, args.out)
+        print(f'Results saved to {args.out}.')
+        return 0
+    else:
+        rows, regressed = compare(load(args.base), load(args.head), args.threshold)
+        for row in rows:
+            print(f'{row["name"]:<28}{format_size(row["size"]):>8}{row["services"]:>5}  '
+                  f'{row["base"] * 1000:10.3f} ms -> {row["head"] * 1000:10.3f} ms  x{row["ratio"]:.2f}  {row["verdict"]}')
+        return 1 if regressed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
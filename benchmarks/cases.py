@@ -0,0 +1,92 @@
+"""Benchmark cases, one per `Client` RPC.
+
+A case prepares its payload for a given size and number of services, then times one call per iteration. Payload
+sizes are in bytes and apply to each service, so one iteration moves `size * services` bytes.
+"""
+import contextlib
+import io
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+
+from src.rlsdk.client import Client
+from src.rlsdk.configs import Agent, Service
+from src.rlsdk.testing import StandInCluster
+
+Case = Callable[[Client, StandInCluster, int], Callable[[], Any]]
+
+
+def _tensor(size: int) -> Dict[str, np.ndarray]:
+    return {'w': np.random.default_rng(0).random(max(size // 4, 1), dtype=np.float32)}
+
+
+def _agents(cluster: StandInCluster) -> List[str]:
+    return list(cluster.models.keys())
+
+
+def _simenvs(cluster: StandInCluster) -> List[str]:
+    return list(cluster.engines.keys())
+
+
+def register_service(client: Client, cluster: StandInCluster, size: int) -> Callable[[], Any]:
+    services = {id: Service(s.type, s.name, s.host, s.port, 'x' * size) for id, s in cluster.services.items()}
+    return lambda: client.register_service(services)
+
+
+def set_agent_config(client: Client, cluster: StandInCluster, size: int) -> Callable[[], Any]:
+    with contextlib.redirect_stdout(io.StringIO()):
+        agent = Agent('Benchmark', {'padding': 'x' * size}, True, '', '', '')
+    agents = {id: agent for id in _agents(cluster)}
+    return lambda: client.set_agent_config(agents)
+
+
+def get_model_weights(client: Client, cluster: StandInCluster, size: int) -> Callable[[], Any]:
+    ids = _agents(cluster)
+    client.set_model_weights({id: _tensor(size) for id in ids})
+    return lambda: client.get_model_weights(ids)
+
+
+def set_model_weights(client: Client, cluster: StandInCluster, size: int) -> Callable[[], Any]:
+    weights = {id: _tensor(size) for id in _agents(cluster)}
+    return lambda: client.set_model_weights(weights)
+
+
+def set_model_weights_tensor(client: Client, cluster: StandInCluster, size: int) -> Callable[[], Any]:
+    weights = {id: _tensor(size) for id in _agents(cluster)}
+    return lambda: client.set_model_weights(weights, format='tensor')
+
+
+def get_model_buffer(client: Client, cluster: StandInCluster, size: int) -> Callable[[], Any]:
+    ids = _agents(cluster)
+    client.set_model_buffer({id: _tensor(size) for id in ids})
+    return lambda: client.get_model_buffer(ids)
+
+
+def set_model_buffer(client: Client, cluster: StandInCluster, size: int) -> Callable[[], Any]:
+    buffers = {id: _tensor(size) for id in _agents(cluster)}
+    return lambda: client.set_model_buffer(buffers)
+
+
+def sim_monitor(client: Client, cluster: StandInCluster, size: int) -> Callable[[], Any]:
+    ids = _simenvs(cluster)
+    for engine in cluster.engines.values():
+        engine.payload_size = size
+    return lambda: client.sim_monitor(ids)
+
+
+def call(client: Client, cluster: StandInCluster, size: int) -> Callable[[], Any]:
+    data = {id: ('benchmark', '', b'x' * size) for id in _agents(cluster)}
+    return lambda: client.call(data)
+
+
+CASES: Dict[str, Case] = {
+    'register_service': register_service,
+    'set_agent_config': set_agent_config,
+    'get_model_weights': get_model_weights,
+    'set_model_weights': set_model_weights,
+    'set_model_weights_tensor': set_model_weights_tensor,
+    'get_model_buffer': get_model_buffer,
+    'set_model_buffer': set_model_buffer,
+    'sim_monitor': sim_monitor,
+    'call': call,
+}
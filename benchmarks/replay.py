@@ -0,0 +1,95 @@
+"""Micro-benchmarks of uniform and prioritized replay buffers, results share the format of client benchmarks.
+
+Every result is named after the operation, with `size` holding bytes of one sampled batch and `services` always 1,
+so reports of both suites can be compared with `python -m benchmarks compare`.
+"""
+import platform
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from src.rlsdk.buffers import PrioritizedReplayBuffer, ReplayBuffer
+
+from .runner import AnyDict, format_size, measure, summarize
+
+CHUNK = 65536
+
+
+def _fill(buffer: ReplayBuffer, obs_dim: int):
+    rng = np.random.default_rng(0)
+    for start in range(0, buffer.capacity, CHUNK):
+        n = min(CHUNK, buffer.capacity - start)
+        states = rng.random((n, obs_dim), dtype=np.float32)
+        buffer.extend({
+            'states': states,
+            'actions': rng.integers(0, 4, n),
+            'next_states': states,
+            'reward': rng.random(n),
+            'terminated': np.zeros(n, dtype=bool),
+            'truncated': np.zeros(n, dtype=bool),
+        })
+
+
+def _cases(uniform: ReplayBuffer, prioritized: PrioritizedReplayBuffer, batch_size: int) -> Dict[str, Callable[[], Any]]:
+    indices = np.arange(batch_size) * (prioritized.capacity // batch_size)
+    priorities = np.random.default_rng(0).random(batch_size)
+    transition = tuple(column[0] for column in uniform.to_dict()['columns'].values())
+
+    def sample_update():
+        batch = prioritized.sample(batch_size)
+        prioritized.update_priorities(batch['indices'], priorities)
+
+    return {
+        'replay_add': lambda: uniform.add(*transition),
+        'replay_add_prioritized': lambda: prioritized.add(*transition),
+        'replay_sample': lambda: uniform.sample(batch_size),
+        'replay_sample_prioritized': lambda: prioritized.sample(batch_size),
+        'replay_update_priorities': lambda: prioritized.update_priorities(indices, priorities),
+        'replay_sample_update': sample_update,
+    }
+
+
+def run(
+    capacity=1000000,
+    batch_sizes: List[int] = [32, 256, 1024],
+    obs_dim=8,
+    min_time=1.0,
+    log: Optional[Callable[[str], Any]] = print,
+) -> AnyDict:
+    """Time buffer operations on full buffers.
+
+    Args:
+        capacity: capacity of buffers, filled before timing.
+        batch_sizes: sizes of sampled batches.
+        obs_dim: dimension of float32 states.
+        min_time: minimum seconds spent on each operation and batch size.
+        log: function printing progress, None for silence.
+
+    Returns:
+        Environment and results of every operation and batch size.
+    """
+    uniform = ReplayBuffer(capacity, seed=0)
+    prioritized = PrioritizedReplayBuffer(capacity, seed=0)
+    _fill(uniform, obs_dim)
+    _fill(prioritized, obs_dim)
+    row = sum(column[0].nbytes for column in uniform.to_dict()['columns'].values())
+
+    results = []
+    for batch_size in batch_sizes:
+        for name, fn in _cases(uniform, prioritized, batch_size).items():
+            stats = summarize(measure(fn, min_time=min_time, max_repeat=100000), row * batch_size)
+            results.append({'name': name, 'size': row * batch_size, 'services': 1, 'batch_size': batch_size, **stats})
+            if log is not None:
+                log(f'{name:<28}{format_size(row * batch_size):>8}{batch_size:>6}  median {stats["median"] * 1e6:10.1f} us')
+    return {
+        'meta': {
+            'time': time.time(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'numpy': np.__version__,
+            'capacity': capacity,
+            'obs_dim': obs_dim,
+        },
+        'results': results,
+    }
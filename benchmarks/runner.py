@@ -0,0 +1,181 @@
+"""Running benchmark cases against a stand-in cluster and comparing stored results."""
+import json
+import math
+import platform
+import statistics
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import grpc
+import numpy as np
+
+from src.rlsdk.client import Client
+from src.rlsdk.testing import StandInCluster
+
+from .cases import CASES
+
+AnyDict = Dict[str, Any]
+
+KB, MB, GB = 1 << 10, 1 << 20, 1 << 30
+
+
+def parse_size(text: str) -> int:
+    """Parse a size like `1KB`, `16MB` or `1GB` into bytes."""
+    text = text.strip().upper().rstrip('B')
+    units = {'K': KB, 'M': MB, 'G': GB}
+    if text and text[-1] in units:
+        return int(float(text[:-1]) * units[text[-1]])
+    return int(text)
+
+
+def format_size(size: int) -> str:
+    for unit, scale in [('GB', GB), ('MB', MB), ('KB', KB)]:
+        if size >= scale and size % scale == 0:
+            return f'{size // scale}{unit}'
+    return f'{size}B'
+
+
+def measure(fn: Callable[[], Any], min_time=1.0, min_repeat=3, max_repeat=1000, warmup=1) -> List[float]:
+    """Time repeated calls of a function.
+
+    Args:
+        fn: function to time.
+        min_time: minimum seconds to keep repeating.
+        min_repeat: minimum number of timed calls.
+        max_repeat: maximum number of timed calls.
+        warmup: number of untimed calls first.
+
+    Returns:
+        Seconds of each timed call.
+    """
+    for _ in range(warmup):
+        fn()
+    samples: List[float] = []
+    start = time.perf_counter()
+    while len(samples) < max_repeat and (len(samples) < min_repeat or time.perf_counter() - start < min_time):
+        t = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t)
+    return samples
+
+
+def summarize(samples: List[float], nbytes: int) -> AnyDict:
+    median = statistics.median(samples)
+    return {
+        'repeat': len(samples),
+        'mean': statistics.fmean(samples),
+        'median': median,
+        'min': min(samples),
+        'p95': float(np.percentile(samples, 95)),
+        'stdev': statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        'ops': 1 / median if median > 0 else math.inf,
+        'mbps': nbytes / MB / median if median > 0 else math.inf,
+    }
+
+
+def run(
+    cases: List[str],
+    sizes: List[int],
+    services: List[int],
+    max_bytes=GB,
+    min_time=1.0,
+    direct=False,
+    fanout=0,
+    shm=False,
+    log: Optional[Callable[[str], Any]] = print,
+) -> AnyDict:
+    """Run benchmark cases over all combinations of payload size and number of services.
+
+    Args:
+        cases: names of cases.
+        sizes: payload sizes per service in bytes.
+        services: numbers of services.
+        max_bytes: combinations moving more bytes per call are skipped.
+        min_time: minimum seconds spent on each combination.
+        direct: whether client bypasses BFF for data-heavy RPCs.
+        fanout: concurrency of per-service requests, 0 for batched requests.
+        shm: whether weights and buffers are moved through shared memory.
+        log: function printing progress, None for silence.
+
+    Returns:
+        Environment and results of every combination.
+    """
+    for name in cases:
+        if name not in CASES:
+            raise ValueError(f'Unknown case {name}, must be one of {", ".join(CASES)}.')
+    results = []
+    for n in services:
+        for size in sizes:
+            if size * n > max_bytes:
+                continue
+            max_msg_len = min(max(256, 2 * size * n // MB + 1), 2047)
+            with StandInCluster(agents=n, simenvs=n, max_msg_len=max_msg_len) as cluster:
+                with Client(cluster.address, max_msg_len=max_msg_len, direct=direct, fanout=fanout, use_shm=shm) as client:
+                    for name in cases:
+                        fn = CASES[name](client, cluster, size)
+                        stats = summarize(measure(fn, min_time=min_time), size * n)
+                        results.append({'name': name, 'size': size, 'services': n, **stats})
+                        if log is not None:
+                            log(f'{name:<28}{format_size(size):>8}{n:>5}  '
+                                f'median {stats["median"] * 1000:10.3f} ms  {stats["mbps"]:10.1f} MB/s')
+    return {
+        'meta': {
+            'time': time.time(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'numpy': np.__version__,
+            'grpc': grpc.__version__,
+            'direct': direct,
+            'fanout': fanout,
+            'shm': shm,
+        },
+        'results': results,
+    }
+
+
+def save(report: AnyDict, path: str):
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+
+
+def load(path: str) -> AnyDict:
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def compare(base: AnyDict, head: AnyDict, threshold=0.1) -> Tuple[List[AnyDict], bool]:
+    """Compare median latency of matching results.
+
+    Args:
+        base: baseline report.
+        head: new report.
+        threshold: relative slowdown counted as regression.
+
+    Returns:
+        Rows with base and head medians, their ratio and verdict.
+        Whether any result regressed.
+    """
+    index = {(r['name'], r['size'], r['services']): r for r in base['results']}
+    rows, regressed = [], False
+    for r in head['results']:
+        key = (r['name'], r['size'], r['services'])
+        if key not in index:
+            continue
+        ratio = r['median'] / index[key]['median'] if index[key]['median'] > 0 else math.inf
+        if ratio > 1 + threshold:
+            verdict = 'slower'
+            regressed = True
+        elif ratio < 1 - threshold:
+            verdict = 'faster'
+        else:
+            verdict = 'same'
+        rows.append({
+            'name': r['name'],
+            'size': r['size'],
+            'services': r['services'],
+            'base': index[key]['median'],
+            'head': r['median'],
+            'ratio': ratio,
+            'verdict': verdict,
+        })
+    return rows, regressed
@@ -17,6 +17,10 @@ setup(
         'grpcio-tools==1.48.2',
         'numpy==1.23.2',
     ],
+    extras_require={
+        'fast': ['orjson'],
+        'arrow': ['pyarrow'],
+    },
     packages=find_namespace_packages(where='src', exclude=['tests']),
     package_dir={'': 'src'},
 )
@@ -1,3 +1,8 @@
 from .configs import ConfigBase, Service, Agent, Simenv  # noqa: F401
-from .client import Client  # noqa: F401
+from .client import BatchError, Client  # noqa: F401
+from .aio import AsyncClient  # noqa: F401
 from .task import Task  # noqa: F401
+from .group import TaskGroup  # noqa: F401
+from .local import LocalTask  # noqa: F401
+from .vector import VectorEnv  # noqa: F401
+from .buffers import ReplayBuffer  # noqa: F401
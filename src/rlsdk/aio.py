@@ -0,0 +1,228 @@
+import asyncio
+import hashlib
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import grpc
+
+from .configs import AnyDict, Service, Agent, Simenv
+from . import chunks
+from . import convert
+from . import monitor
+from .convert import CallTuple, Format
+from . import sync
+
+from .protos import bff_pb2_grpc
+from .protos import types_pb2
+
+
+class AsyncClient:
+    """Asyncio counterpart of `Client` built on `grpc.aio`.
+
+    Every RPC method of `Client` is available here as a coroutine with the same arguments and results, so many
+    requests can be in flight from a single event loop:
+
+        async with AsyncClient('localhost:10000') as client:
+            weights, infos = await asyncio.gather(client.get_model_weights(), client.sim_monitor())
+    """
+
+    def __init__(self, address: str, max_msg_len=256):
+        """Init client, the channel is connected by `connect()` or `async with`.
+
+        Args:
+            address: address of BFF service.
+            max_msg_len: maximum length of messages in MB.
+        """
+        self.address = address
+        self.channel = grpc.aio.insecure_channel(
+            address,
+            options=[
+                ('grpc.max_send_message_length', max_msg_len * 1024 * 1024),
+                ('grpc.max_receive_message_length', max_msg_len * 1024 * 1024),
+            ],
+        )
+        self.stub = bff_pb2_grpc.BFFStub(self.channel)
+        self.uploads: Dict[str, str] = {}
+
+    async def connect(self, timeout=3):
+        try:
+            await asyncio.wait_for(self.channel.channel_ready(), timeout=timeout)
+        except asyncio.TimeoutError:
+            await self.channel.close()
+            raise ConnectionError(f'Connection to {self.address} timed out, please check the address again.')
+
+    async def close(self):
+        await self.channel.close()
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def reset_server(self):
+        self.uploads.clear()
+        await self.stub.ResetServer(types_pb2.CommonRequest())
+
+    async def register_service(self, services: Dict[str, Service]):
+        self.__forget(list(services.keys()))
+        await self.stub.RegisterService(convert.encode_services(services))
+
+    async def unregister_service(self, ids: List[str] = []):
+        self.__forget(ids)
+        await self.stub.UnRegisterService(convert.encode_ids(ids))
+
+    async def get_service_info(self, ids: List[str] = []) -> Dict[str, Service]:
+        return convert.decode_services(await self.stub.GetServiceInfo(convert.encode_ids(ids)))
+
+    async def set_service_info(self, services: Dict[str, Service]):
+        self.__forget(list(services.keys()))
+        await self.stub.SetServiceInfo(convert.encode_services(services))
+
+    async def reset_service(self, ids: List[str] = []):
+        self.__forget(ids)
+        await self.stub.ResetService(convert.encode_ids(ids))
+
+    async def query_service(self, ids: List[str] = []) -> Dict[str, bool]:
+        return convert.decode_states(await self.stub.QueryService(convert.encode_ids(ids)))
+
+    async def get_agent_config(self, ids: List[str] = []) -> Dict[str, Agent]:
+        return convert.decode_agents(await self.stub.GetAgentConfig(convert.encode_ids(ids)))
+
+    async def set_agent_config(self, agents: Dict[str, Agent]):
+        await self.stub.SetAgentConfig(convert.encode_agents(agents))
+
+    async def get_agent_mode(self, ids: List[str] = []) -> Dict[str, bool]:
+        return convert.decode_modes(await self.stub.GetAgentMode(convert.encode_ids(ids)))
+
+    async def set_agent_mode(self, modes: Dict[str, bool]):
+        await self.stub.SetAgentMode(convert.encode_modes(modes))
+
+    async def get_model_weights(self, ids: List[str] = []) -> AnyDict:
+        return convert.decode_weights(await self.stub.GetModelWeights(convert.encode_ids(ids)))
+
+    async def set_model_weights(self, weights: AnyDict, format: Format = 'pickle'):
+        await self.stub.SetModelWeights(convert.encode_weights(weights, format))
+
+    async def sync_model_weights(
+        self,
+        weights: AnyDict,
+        state: sync.WeightSync,
+        mode: sync.Mode = 'replace',
+    ) -> Dict[str, int]:
+        heads = {id: sync.parse(res) for id, res in (await self.call({id: sync.query() for id in weights})).items()}
+        sent, patches = {}, {}
+        snapshots = state.snapshots({id: weights[id] for id in weights if heads[id] is not None})
+        for id in weights:
+            if heads[id] is None:
+                state.forget(id)
+                model_weights_map = convert.encode_weights({id: weights[id]})
+                await self.stub.SetModelWeights(model_weights_map)
+                sent[id] = len(model_weights_map.weights[id].weights)
+            else:
+                patches[id] = state.patch(id, snapshots[id], heads[id]['version'], mode)
+        if len(patches) > 0:
+            heads = {id: sync.parse(res) for id, res in (await self.call(patches)).items()}
+        for id in patches:
+            if 'error' in heads[id]:
+                state.forget(id)
+                patches[id] = state.patch(id, snapshots[id], None, mode)
+                heads[id] = sync.parse((await self.call({id: patches[id]}))[id])
+                if 'error' in heads[id]:
+                    raise RuntimeError(f'Failed to sync weights of {id}: {heads[id]["error"]}.')
+            state.commit(id, heads[id]['version'])
+            sent[id] = len(patches[id][1]) + len(patches[id][2])
+        return sent
+
+    async def get_model_buffer(self, ids: List[str] = [], chunk_size=0) -> AnyDict:
+        if chunk_size > 0:
+            ids = ids or await self.__service_ids('agent')
+            return {id: await self.__get_buffer_chunked(id, chunk_size) for id in ids}
+        return convert.decode_buffers(await self.stub.GetModelBuffer(convert.encode_ids(ids)))
+
+    async def set_model_buffer(self, buffers: AnyDict, format: Format = 'pickle', chunk_size=0):
+        if chunk_size > 0:
+            for id in buffers:
+                await self.__set_buffer_chunked(id, convert.dumps(buffers[id], format), chunk_size)
+            return
+        await self.stub.SetModelBuffer(convert.encode_buffers(buffers, format))
+
+    async def get_model_status(self, ids: List[str] = []) -> Dict[str, AnyDict]:
+        return convert.decode_status(await self.stub.GetModelStatus(convert.encode_ids(ids)))
+
+    async def set_model_status(self, status: Dict[str, AnyDict]):
+        await self.stub.SetModelStatus(convert.encode_status(status))
+
+    async def get_simenv_config(self, ids: List[str] = []) -> Dict[str, Simenv]:
+        return convert.decode_simenvs(await self.stub.GetSimenvConfig(convert.encode_ids(ids)))
+
+    async def set_simenv_config(self, simenvs: Dict[str, Simenv]):
+        await self.stub.SetSimenvConfig(convert.encode_simenvs(simenvs))
+
+    async def sim_control(self, cmds: Dict[str, str]):
+        await self.stub.SimControl(convert.encode_cmds(cmds))
+
+    async def sim_monitor(self, ids: List[str] = [], lazy=False) -> Dict[str, AnyDict]:
+        return convert.decode_infos(await self.stub.SimMonitor(convert.encode_ids(ids)), lazy)
+
+    async def watch_monitor(
+        self,
+        ids: List[str] = [],
+        min_interval=0.1,
+        max_interval=5.0,
+        duration: Optional[float] = None,
+    ) -> AsyncIterator[Dict[str, AnyDict]]:
+        cursors: Dict[str, monitor.MonitorCursor] = {}
+        backoff = monitor.Backoff(min_interval, max_interval)
+        loop = asyncio.get_running_loop()
+        deadline = None if duration is None else loop.time() + duration
+        while True:
+            sim_info_map = await self.stub.SimMonitor(convert.encode_ids(ids))
+            changes = monitor.updates(cursors, dict(sim_info_map.infos))
+            if len(changes) > 0:
+                yield changes
+            interval = backoff.next(len(changes) > 0)
+            if deadline is not None:
+                if loop.time() + interval > deadline:
+                    return
+            await asyncio.sleep(interval)
+
+    async def call(self, data: Dict[str, CallTuple]) -> Dict[str, CallTuple]:
+        return convert.decode_calls(await self.stub.Call(convert.encode_calls(data)))
+
+    async def upload_custom(self, ids: List[str], path: str, force=False) -> List[str]:
+        file = await asyncio.get_running_loop().run_in_executor(None, convert.pack_custom, path)
+        digest = hashlib.sha256(file).hexdigest()
+        ids = [id for id in ids if force or self.uploads.get(id) != digest]
+        if len(ids) > 0:
+            data = ('@custom', '', file)
+            await self.call({id: data for id in ids})
+            self.uploads.update({id: digest for id in ids})
+        return ids
+
+    async def upload_custom_model(self, path: str, force=False) -> List[str]:
+        return await self.upload_custom(await self.__service_ids('agent'), path, force)
+
+    async def upload_custom_engine(self, path: str, force=False) -> List[str]:
+        return await self.upload_custom(await self.__service_ids('simenv'), path, force)
+
+    def __forget(self, ids: List[str]):
+        if len(ids) == 0:
+            self.uploads.clear()
+        for id in ids:
+            self.uploads.pop(id, None)
+
+    async def __service_ids(self, type: str) -> List[str]:
+        services = await self.get_service_info()
+        return [id for id, service in services.items() if service.type == type]
+
+    async def __get_buffer_chunked(self, id: str, chunk_size: int) -> Any:
+        assembler = chunks.Assembler(chunk_size)
+        req = assembler.request()
+        while req is not None:
+            req = assembler.feed((await self.call({id: req}))[id])
+        return convert.loads(assembler.data)
+
+    async def __set_buffer_chunked(self, id: str, payload: bytes, chunk_size: int):
+        for req in chunks.split(payload, chunk_size):
+            chunks.check((await self.call({id: req}))[id])
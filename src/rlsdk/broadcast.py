@@ -0,0 +1,311 @@
+"""Background broadcast of learner weights to inference agents.
+
+`WeightBroadcaster` pulls serialized weights from one learner agent, either every `interval` seconds or whenever a
+step counter in its status advanced by `every`, and pushes the very same bytes to all follower agents, so weights are
+serialized once by the learner and never decoded by the controller. Followers are reached either concurrently from
+the controller, or through a relay tree of `@weights-relay` calls in which every follower forwards the payload to its
+children before replying:
+
+    relay: {"op": "relay", "children": [{"id": ..., "address": ..., "children": [...]}, ...]} + weights in dbin
+           -> {"ok": [<ids>], "errors": {<id>: <error>}}
+
+Relaying lets bandwidth scale with the number of followers instead of being bounded by the controller's uplink, but
+requires followers to reach each other directly at their registered addresses.
+"""
+from concurrent.futures import ThreadPoolExecutor
+import json
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import grpc
+
+from .client import Client
+from .configs import AnyDict
+from .metrics import Histogram
+from .task import Task
+
+from .protos import agent_pb2_grpc
+from .protos import types_pb2
+
+NAME = '@weights-relay'
+
+CallTuple = Tuple[str, str, bytes]
+
+
+def relay_tree(nodes: List[Tuple[str, str]], degree: int) -> List[AnyDict]:
+    """Arrange followers in a complete tree.
+
+    Args:
+        nodes: id and address of each follower, in order of levels.
+        degree: number of children of every node, and of roots.
+
+    Returns:
+        Roots of the tree, each with `id`, `address` and `children`.
+    """
+    if degree <= 0:
+        raise ValueError('degree must be positive.')
+    trees = [{'id': id, 'address': address, 'children': []} for id, address in nodes]
+    for i, tree in enumerate(trees[degree:], start=degree):
+        trees[i // degree - 1]['children'].append(tree)
+    return trees[:degree]
+
+
+def request(children: List[AnyDict], payload: bytes) -> CallTuple:
+    """Get call data delivering weights to a node which relays them to its children.
+
+    Args:
+        children: subtrees below the node.
+        payload: serialized weights.
+
+    Returns:
+        Call data of the relay.
+    """
+    return NAME, json.dumps({'op': 'relay', 'children': children}), payload
+
+
+def check(res: CallTuple) -> AnyDict:
+    """Check reply of a relay call.
+
+    Args:
+        res: call data replied by node.
+
+    Returns:
+        Control header of the reply, with ids of nodes that applied the weights and errors of the others.
+
+    Raises:
+        RuntimeError: When node does not support relaying.
+    """
+    name, dstr, _ = res
+    if name != NAME or not dstr:
+        raise RuntimeError('Service does not support relayed weights.')
+    return json.loads(dstr)
+
+
+def _ids(tree: AnyDict) -> List[str]:
+    return [tree['id'], *[id for child in tree['children'] for id in _ids(child)]]
+
+
+class RelayHandler:
+    """Service side of the relay protocol."""
+
+    def __init__(self, load: Callable[[bytes], Any], max_msg_len=256, timeout: Optional[float] = None):
+        """Init handler.
+
+        Args:
+            load: function deserializing and applying received weights.
+            max_msg_len: maximum length of forwarded messages in MB.
+            timeout: seconds to wait for each child.
+        """
+        self.load = load
+        self.options = [
+            ('grpc.max_send_message_length', max_msg_len * 1024 * 1024),
+            ('grpc.max_receive_message_length', max_msg_len * 1024 * 1024),
+        ]
+        self.timeout = timeout
+
+    def __call__(self, dstr: str, dbin: bytes) -> Tuple[str, bytes]:
+        """Handle a relay call, children are served concurrently with applying the weights locally.
+
+        Args:
+            dstr: control header of the call.
+            dbin: serialized weights.
+
+        Returns:
+            Control header and empty data of the reply.
+        """
+        children = json.loads(dstr)['children']
+        ok, errors = [], {}
+        with ThreadPoolExecutor(max_workers=len(children) + 1) as executor:
+            futures = [(child, executor.submit(self.__forward, child, dbin)) for child in children]
+            try:
+                self.load(dbin)
+            except Exception as e:
+                errors[''] = str(e)
+            for child, future in futures:
+                try:
+                    head = future.result()
+                    ok.extend(head['ok'])
+                    errors.update(head['errors'])
+                except Exception as e:
+                    errors.update({id: str(e) for id in _ids(child)})
+        return json.dumps({'ok': ok, 'errors': errors}), b''
+
+    def __forward(self, child: AnyDict, payload: bytes) -> AnyDict:
+        with grpc.insecure_channel(child['address'], options=self.options) as channel:
+            name, dstr, dbin = request(child['children'], payload)
+            msg = agent_pb2_grpc.AgentStub(channel).Call(
+                types_pb2.CallData(name=name, dstr=dstr, dbin=dbin),
+                timeout=self.timeout,
+            )
+        head = check((msg.name, msg.dstr, msg.dbin))
+        if '' in head['errors']:
+            head['errors'][child['id']] = head['errors'].pop('')
+        else:
+            head['ok'].insert(0, child['id'])
+        return head
+
+
+class WeightBroadcaster:
+    """Scheduled broadcast of weights from a learner agent to follower agents of a task."""
+
+    def __init__(
+        self,
+        task: Task,
+        learner: str,
+        followers: List[str] = [],
+        interval: Optional[float] = None,
+        every: Optional[int] = None,
+        step_key='steps',
+        poll_interval=0.5,
+        fanout=16,
+        relay=0,
+    ):
+        """Init broadcaster.
+
+        Args:
+            task: inited task holding learner and followers.
+            learner: id of learner agent.
+            followers: ids of follower agents, defaults to all other agents of task.
+            interval: seconds between broadcasts.
+            every: broadcast once status value `step_key` of learner advanced by this many steps.
+            step_key: key of step counter in status of learner.
+            poll_interval: seconds between checks of the schedule.
+            fanout: concurrency of pushes from controller.
+            relay: number of children of each node of a relay tree, 0 to push every follower from controller.
+        """
+        if not task.inited:
+            raise RuntimeError('Task not inited, call push() or pull() first.')
+        if learner not in task.agents:
+            raise ValueError(f'Agent {learner} not in task.')
+        if interval is None and every is None:
+            raise ValueError('Either interval or every must be given.')
+        self.task = task
+        self.learner = learner
+        self.followers = followers or [id for id in task.agents if id != learner]
+        for id in self.followers:
+            if id not in task.agents:
+                raise ValueError(f'Agent {id} not in task.')
+        self.interval = interval
+        self.every = every
+        self.step_key = step_key
+        self.poll_interval = poll_interval
+        self.relay = relay
+
+        client = task.client
+        self.client = Client(task.address, direct=client.direct, fanout=fanout, pool=client.pool)
+
+        self.broadcasts = 0
+        self.failures = 0
+        self.bytes = 0
+        self.duration = Histogram()
+        self.last_duration = 0.0
+        self.last_time: Optional[float] = None
+        self.last_step: Optional[int] = None
+        self.step: Optional[int] = None
+        self.last_error: Optional[Exception] = None
+        self.lock = threading.Lock()
+
+        self.stopped = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start broadcasting in a background thread."""
+        if self.thread is not None:
+            raise RuntimeError('Broadcaster already started.')
+        self.stopped.clear()
+        self.thread = threading.Thread(target=self.__run, name='WeightBroadcaster', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stop background thread, waiting for a running broadcast to finish."""
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def close(self):
+        self.stop()
+        self.client.close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def due(self) -> bool:
+        """Check whether a broadcast is due, refreshing the step of learner when triggered by steps."""
+        if self.every is not None:
+            self.step = int(self.client.get_model_status([self.learner])[self.learner].get(self.step_key, 0))
+            if self.last_step is None or self.step - self.last_step >= self.every:
+                return True
+        if self.interval is not None:
+            if self.last_time is None or time.monotonic() - self.last_time >= self.interval:
+                return True
+        return False
+
+    def broadcast(self) -> Dict[str, str]:
+        """Copy weights of learner to all followers now.
+
+        Returns:
+            Errors keyed by id of followers that failed, empty if all succeeded.
+        """
+        start = time.perf_counter()
+        step = self.step
+        payload = self.client.get_model_weights_bytes([self.learner])[self.learner]
+        errors: Dict[str, str] = {}
+        if self.relay > 0:
+            services = self.client.get_service_info(self.followers)
+            roots = relay_tree([(id, services[id].address) for id in self.followers], self.relay)
+            data = {root['id']: request(root['children'], payload) for root in roots}
+            for id, res in self.client.call(data).items():
+                head = check(res)
+                errors.update(head['errors'])
+                if '' in errors:
+                    errors[id] = errors.pop('')
+        else:
+            self.client.set_model_weights_bytes({id: payload for id in self.followers})
+        seconds = time.perf_counter() - start
+        with self.lock:
+            self.broadcasts += 1
+            self.bytes += len(payload) * len(self.followers)
+            self.duration.observe(seconds)
+            self.last_duration = seconds
+            self.last_time = time.monotonic()
+            self.last_step = step
+            if len(errors) > 0:
+                self.failures += 1
+        return errors
+
+    def stats(self) -> AnyDict:
+        """Figures of broadcasts so far.
+
+        Returns:
+            Counts, bytes sent, durations, and staleness of followers in seconds and in learner steps.
+        """
+        with self.lock:
+            return {
+                'broadcasts': self.broadcasts,
+                'failures': self.failures,
+                'bytes': self.bytes,
+                'duration': self.duration.to_dict(),
+                'last_duration': self.last_duration,
+                'staleness_seconds': None if self.last_time is None else time.monotonic() - self.last_time,
+                'staleness_steps': None if self.step is None or self.last_step is None else self.step - self.last_step,
+                'last_error': None if self.last_error is None else str(self.last_error),
+            }
+
+    def __run(self):
+        while not self.stopped.is_set():
+            try:
+                if self.due():
+                    errors = self.broadcast()
+                    if len(errors) > 0:
+                        self.last_error = RuntimeError(f'Broadcast failed for {", ".join(errors)}.')
+            except Exception as e:
+                with self.lock:
+                    self.failures += 1
+                self.last_error = e
+            self.stopped.wait(self.poll_interval)
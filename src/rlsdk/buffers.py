@@ -0,0 +1,544 @@
+"""Preallocated replay memory, the standard format of model buffers.
+
+`ReplayBuffer` keeps transitions in one fixed-size numpy array per column, written as a ring so inserting is `O(1)`
+and sampling a batch is a single fancy-indexing per column. Columns are allocated on first insert from the shapes and
+dtypes of the first transition, unless given upfront. When a `path` is given, columns are `.npy` files mapped with
+`np.memmap` instead, so buffers sized to `DQN.buffer_size` live in the page cache and can be reopened after a restart.
+
+The canonical form of a buffer is a plain dict of its filled rows and cursors:
+
+    {'format': 'replay', 'version': 1, 'capacity': ..., 'pos': ..., 'size': ..., 'columns': {<name>: <array>, ...}}
+
+which can be encoded by `tensors.dumps` without pickling, and whose arrays are views of the buffer rather than copies.
+`convert.dumps` encodes `ReplayBuffer` objects as this dict in the requested format, so they can be passed to
+`set_model_buffer` as they are, with `format='tensor'` to skip pickling, and `ReplayBuffer.from_dict` loads the dict
+`get_model_buffer` returns for them. Columns must hold numeric or boolean values, as dict states of models have to be
+flattened into arrays by a sifunc before they are stored.
+
+`PrioritizedReplayBuffer` adds proportional prioritized sampling on top, backed by a `SumTree` and a `MinTree` of
+priorities kept in flat arrays. Sampling a batch descends the sum tree for all values at once, and updating priorities
+of a batch recomputes one level of ancestors per step, so both cost `O(log capacity)` numpy calls whatever the batch
+size. `from_config` creates the buffer described by `buffer_size`, `prioritized`, `alpha`, `beta` and `beta_anneal` of
+a model config.
+"""
+import json
+import os
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from .configs import AnyDict
+
+FORMAT = 'replay'
+VERSION = 1
+COLUMNS = ('states', 'actions', 'next_states', 'reward', 'terminated', 'truncated')
+META = 'meta.json'
+
+Spec = Tuple[Tuple[int, ...], Any]
+
+
+class ReplayBuffer:
+    """Ring buffer of transitions kept in preallocated columns."""
+
+    def __init__(
+        self,
+        capacity: int,
+        specs: Optional[Dict[str, Spec]] = None,
+        path: Optional[str] = None,
+        seed: Optional[int] = None,
+    ):
+        """Init buffer, reopening the one saved in `path` if there is any.
+
+        Args:
+            capacity: maximum number of transitions, older ones are overwritten once full.
+            specs: shape of one row and dtype of every column, inferred from the first transition if not given.
+            path: directory of memory-mapped columns, None to keep columns in memory.
+            seed: seed of the generator sampling batches.
+        """
+        if capacity < 1:
+            raise ValueError('capacity must be greater than 0')
+        self.capacity = capacity
+        self.path = path
+        self.rng = np.random.default_rng(seed)
+        self.pos = 0
+        self.size = 0
+        self.columns: Dict[str, np.ndarray] = {}
+        if path is not None and os.path.exists(os.path.join(path, META)):
+            self.__open()
+        elif specs is not None:
+            self.__allocate(specs)
+
+    def __len__(self) -> int:
+        return self.size
+
+    @property
+    def full(self) -> bool:
+        return self.size == self.capacity
+
+    def add(
+        self,
+        states: Any,
+        actions: Any,
+        next_states: Any,
+        reward: Any,
+        terminated: bool,
+        truncated: bool,
+    ) -> int:
+        """Insert one transition, same arguments as `store` of models.
+
+        Returns:
+            Index of the row written.
+        """
+        row = {
+            'states': states,
+            'actions': actions,
+            'next_states': next_states,
+            'reward': reward,
+            'terminated': terminated,
+            'truncated': truncated,
+        }
+        if not self.columns:
+            self.__allocate({name: (np.shape(value), np.asarray(value).dtype) for name, value in row.items()})
+        index = self.pos
+        for name, value in row.items():
+            self.columns[name][index] = value
+        self.pos = (index + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+        return index
+
+    def extend(self, batch: Dict[str, Any]) -> np.ndarray:
+        """Insert a batch of transitions with one vectorized write per column.
+
+        Args:
+            batch: arrays of all columns, with transitions along the first axis.
+
+        Returns:
+            Indices of the rows written.
+        """
+        if set(batch) != set(COLUMNS):
+            raise ValueError(f'Batch must hold columns {", ".join(COLUMNS)}.')
+        n = len(batch['reward'])
+        if not self.columns:
+            self.__allocate({name: (np.shape(value)[1:], np.asarray(value).dtype) for name, value in batch.items()})
+        if n > self.capacity:
+            batch = {name: value[n - self.capacity:] for name, value in batch.items()}
+            self.pos = (self.pos + n - self.capacity) % self.capacity
+            n = self.capacity
+        indices = (self.pos + np.arange(n)) % self.capacity
+        for name, value in batch.items():
+            self.columns[name][indices] = value
+        self.pos = (self.pos + n) % self.capacity
+        self.size = min(self.size + n, self.capacity)
+        return indices
+
+    def sample(self, batch_size: int) -> Dict[str, np.ndarray]:
+        """Sample transitions uniformly with replacement.
+
+        Args:
+            batch_size: number of transitions.
+
+        Returns:
+            Arrays of all columns, and `indices` of the sampled rows.
+        """
+        if self.size == 0:
+            raise RuntimeError('Buffer is empty.')
+        return self.get(self.rng.integers(0, self.size, batch_size))
+
+    def get(self, indices: np.ndarray) -> Dict[str, np.ndarray]:
+        """Gather rows.
+
+        Args:
+            indices: indices of rows.
+
+        Returns:
+            Copies of the rows of all columns, and `indices`.
+        """
+        batch = {name: column[indices] for name, column in self.columns.items()}
+        batch['indices'] = indices
+        return batch
+
+    def clear(self):
+        """Drop all transitions, keeping allocated columns."""
+        self.pos = 0
+        self.size = 0
+
+    def flush(self):
+        """Write memory-mapped columns and cursors to disk."""
+        if self.path is None or not self.columns:
+            return
+        for column in self.columns.values():
+            column.flush()
+        tmp = os.path.join(self.path, f'{META}.tmp')
+        with open(tmp, 'w') as f:
+            json.dump({'capacity': self.capacity, 'pos': self.pos, 'size': self.size}, f)
+        os.replace(tmp, os.path.join(self.path, META))
+
+    def close(self):
+        self.flush()
+        self.columns = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def to_dict(self) -> AnyDict:
+        """Get canonical form of buffer.
+
+        Returns:
+            Cursors and filled rows of all columns, as views of the buffer.
+        """
+        return {
+            'format': FORMAT,
+            'version': VERSION,
+            'capacity': self.capacity,
+            'pos': self.pos,
+            'size': self.size,
+            'columns': {name: column[:self.size] for name, column in self.columns.items()},
+        }
+
+    def load_dict(self, data: AnyDict):
+        """Replace content of buffer with a canonical form.
+
+        Args:
+            data: canonical form, whose capacity must fit this buffer.
+        """
+        if not is_replay(data):
+            raise ValueError('Data is not a replay buffer.')
+        if data['size'] > self.capacity:
+            raise ValueError(f'Buffer of {data["size"]} transitions does not fit capacity {self.capacity}.')
+        columns = data['columns']
+        if not self.columns and columns:
+            self.__allocate({name: (column.shape[1:], column.dtype) for name, column in columns.items()})
+        size = data['size']
+        if data['capacity'] == self.capacity:
+            for name, column in columns.items():
+                self.columns[name][:size] = column
+            self.pos = data['pos'] % self.capacity
+        else:
+            order = (data['pos'] + np.arange(size)) % size if size == data['capacity'] else np.arange(size)
+            for name, column in columns.items():
+                self.columns[name][:size] = column[order]
+            self.pos = size % self.capacity
+        self.size = size
+
+    @classmethod
+    def from_dict(cls, data: AnyDict, path: Optional[str] = None, seed: Optional[int] = None) -> 'ReplayBuffer':
+        """Create buffer from a canonical form.
+
+        Args:
+            data: canonical form.
+            path: directory of memory-mapped columns, None to keep columns in memory.
+            seed: seed of the generator sampling batches.
+
+        Returns:
+            Buffer holding a copy of the transitions.
+        """
+        if not is_replay(data):
+            raise ValueError('Data is not a replay buffer.')
+        buffer = cls(data['capacity'], path=path, seed=seed)
+        buffer.load_dict(data)
+        return buffer
+
+    def __allocate(self, specs: Dict[str, Spec]):
+        if set(specs) != set(COLUMNS):
+            raise ValueError(f'Specs must hold columns {", ".join(COLUMNS)}.')
+        for name in COLUMNS:
+            dtype = np.dtype(specs[name][1])
+            if dtype.kind not in 'biufc':
+                raise TypeError(f'Column {name} must hold numeric or boolean values, got dtype {dtype}.')
+        if self.path is not None:
+            os.makedirs(self.path, exist_ok=True)
+        for name in COLUMNS:
+            shape, dtype = specs[name]
+            shape = (self.capacity, *shape)
+            if self.path is None:
+                self.columns[name] = np.zeros(shape, dtype=dtype)
+            else:
+                file = os.path.join(self.path, f'{name}.npy')
+                self.columns[name] = np.lib.format.open_memmap(file, mode='w+', dtype=dtype, shape=shape)
+        self.flush()
+
+    def __open(self):
+        with open(os.path.join(self.path, META), 'r') as f:
+            meta = json.load(f)
+        if meta['capacity'] != self.capacity:
+            raise ValueError(f'Buffer in {self.path} has capacity {meta["capacity"]}, not {self.capacity}.')
+        for name in COLUMNS:
+            self.columns[name] = np.load(os.path.join(self.path, f'{name}.npy'), mmap_mode='r+')
+        self.pos = meta['pos']
+        self.size = meta['size']
+
+
+class _SegmentTree(ABC):
+    identity = 0.0
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.leaves = max(1 << (capacity - 1).bit_length(), 2)
+        self.depth = self.leaves.bit_length() - 1
+        self.tree = np.full(2 * self.leaves, self.identity)
+        self.pairs = self.tree.reshape(-1, 2)
+
+    @abstractmethod
+    def _reduce(self, left: np.ndarray, right: np.ndarray) -> np.ndarray:
+        ...
+
+    @abstractmethod
+    def _combine(self, left: float, right: float) -> float:
+        ...
+
+    @property
+    def root(self) -> float:
+        return float(self.tree[1])
+
+    def get(self, indices: np.ndarray) -> np.ndarray:
+        """Get values of leaves.
+
+        Args:
+            indices: indices of leaves.
+
+        Returns:
+            Values of leaves.
+        """
+        return self.tree.take(np.asarray(indices) + self.leaves)
+
+    def update(self, indices: np.ndarray, values: np.ndarray):
+        """Set values of leaves, then recompute their ancestors one level at a time.
+
+        Ancestors shared by several leaves are recomputed more than once per level instead of being deduplicated,
+        which is cheaper than sorting. Both children of every node are gathered at once through `pairs`, row `i` of
+        which views nodes `2i` and `2i + 1`, and a single leaf walks up with scalar indexing.
+
+        Args:
+            indices: indices of leaves.
+            values: values of leaves, the last one wins for repeated indices.
+        """
+        nodes = np.asarray(indices, dtype=np.int64).reshape(-1) + self.leaves
+        if nodes.size == 1:
+            tree, node = self.tree, int(nodes[0])
+            tree[node] = np.asarray(values).reshape(-1)[-1]
+            for _ in range(self.depth):
+                node //= 2
+                tree[node] = self._combine(tree[2 * node], tree[2 * node + 1])
+            return
+        self.tree[nodes] = values
+        for _ in range(self.depth):
+            nodes >>= 1
+            pairs = self.pairs.take(nodes, axis=0)
+            self.tree[nodes] = self._reduce(pairs[:, 0], pairs[:, 1])
+
+    def clear(self):
+        self.tree[:] = self.identity
+
+
+class SumTree(_SegmentTree):
+    """Array-backed binary tree of sums over leaves, searched by prefix sums a batch at a time."""
+
+    def _reduce(self, left: np.ndarray, right: np.ndarray) -> np.ndarray:
+        return np.add(left, right)
+
+    def _combine(self, left: float, right: float) -> float:
+        return left + right
+
+    def find(self, values: np.ndarray) -> np.ndarray:
+        """Find the leaves where prefix sums reach given values, descending all values together level by level.
+
+        Args:
+            values: prefix sums in `[0, root)`.
+
+        Returns:
+            Indices of leaves.
+        """
+        values = np.array(values, dtype=np.float64)
+        nodes = np.ones(values.shape, dtype=np.int64)
+        for _ in range(self.depth):
+            nodes <<= 1
+            left = self.tree.take(nodes)
+            right = values >= left
+            np.subtract(values, left, out=values, where=right)
+            nodes += right
+        return nodes - self.leaves
+
+
+class MinTree(_SegmentTree):
+    """Array-backed binary tree of minimums over leaves."""
+
+    identity = np.inf
+
+    def _reduce(self, left: np.ndarray, right: np.ndarray) -> np.ndarray:
+        return np.minimum(left, right)
+
+    def _combine(self, left: float, right: float) -> float:
+        return min(left, right)
+
+
+class PrioritizedReplayBuffer(ReplayBuffer):
+    """Replay buffer sampling transitions in proportion to their priorities.
+
+    Priorities are kept in memory only, transitions of a reopened or loaded buffer start from the maximum priority.
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        specs: Optional[Dict[str, Spec]] = None,
+        path: Optional[str] = None,
+        seed: Optional[int] = None,
+        alpha=0.6,
+        beta=0.4,
+        beta_anneal=0,
+        eps=1e-6,
+    ):
+        """Init buffer, reopening the one saved in `path` if there is any.
+
+        Args:
+            capacity: maximum number of transitions, older ones are overwritten once full.
+            specs: shape of one row and dtype of every column, inferred from the first transition if not given.
+            path: directory of memory-mapped columns, None to keep columns in memory.
+            seed: seed of the generator sampling batches.
+            alpha: exponent turning priorities into sampling probabilities, 0 for uniform sampling.
+            beta: exponent of importance weights correcting the bias of prioritized sampling.
+            beta_anneal: number of sampled batches over which beta grows linearly to 1, 0 to keep it fixed.
+            eps: added to priorities so no transition has zero probability.
+        """
+        if alpha < 0 or alpha > 1:
+            raise ValueError('alpha must be in [0, 1]')
+        if beta < 0 or beta > 1:
+            raise ValueError('beta must be in [0, 1]')
+        if beta_anneal < 0:
+            raise ValueError('beta_anneal must be greater than or equal to 0')
+        self.alpha = alpha
+        self.beta_start = beta
+        self.beta_anneal = beta_anneal
+        self.eps = eps
+        self.sums = SumTree(capacity)
+        self.mins = MinTree(capacity)
+        self.max_priority = 1.0
+        self.samples = 0
+        super().__init__(capacity, specs, path, seed)
+        self.__fill(np.arange(self.size))
+
+    @property
+    def beta(self) -> float:
+        if self.beta_anneal == 0:
+            return self.beta_start
+        return self.beta_start + (1.0 - self.beta_start) * min(self.samples / self.beta_anneal, 1.0)
+
+    def add(self, *args, **kwargs) -> int:
+        """Insert one transition with the maximum priority so far, see `ReplayBuffer.add`."""
+        index = super().add(*args, **kwargs)
+        self.__fill(np.array([index]))
+        return index
+
+    def extend(self, batch: Dict[str, Any]) -> np.ndarray:
+        """Insert a batch of transitions with the maximum priority so far, see `ReplayBuffer.extend`."""
+        indices = super().extend(batch)
+        self.__fill(indices)
+        return indices
+
+    def sample(self, batch_size: int) -> Dict[str, np.ndarray]:
+        """Sample transitions in proportion to priorities, one from each of `batch_size` equal segments of their sum.
+
+        Args:
+            batch_size: number of transitions.
+
+        Returns:
+            Arrays of all columns, `indices` of the sampled rows, and their importance `weights` normalized to
+            at most 1.
+        """
+        if self.size == 0:
+            raise RuntimeError('Buffer is empty.')
+        total = self.sums.root
+        values = (np.arange(batch_size) + self.rng.random(batch_size)) * (total / batch_size)
+        indices = np.minimum(self.sums.find(values), self.size - 1)
+        beta = self.beta
+        weights = (self.sums.get(indices) / total * self.size) ** -beta
+        weights /= (self.mins.root / total * self.size) ** -beta
+        self.samples += 1
+        batch = self.get(indices)
+        batch['weights'] = weights
+        return batch
+
+    def update_priorities(self, indices: np.ndarray, priorities: np.ndarray):
+        """Set priorities of sampled transitions, e.g. to their absolute TD errors.
+
+        Args:
+            indices: `indices` of a sampled batch.
+            priorities: new priorities, non-negative.
+        """
+        priorities = np.abs(np.asarray(priorities, dtype=np.float64)) + self.eps
+        if priorities.size > 0:
+            self.max_priority = max(self.max_priority, float(priorities.max()))
+        values = priorities ** self.alpha
+        self.sums.update(indices, values)
+        self.mins.update(indices, values)
+
+    def clear(self):
+        super().clear()
+        self.sums.clear()
+        self.mins.clear()
+        self.max_priority = 1.0
+
+    def to_dict(self) -> AnyDict:
+        """Get canonical form of buffer, with priorities of filled rows raised to alpha in `priorities`."""
+        data = super().to_dict()
+        data['priorities'] = self.sums.get(np.arange(self.size))
+        data['max_priority'] = self.max_priority
+        return data
+
+    def load_dict(self, data: AnyDict):
+        """Replace content of buffer with a canonical form, keeping its priorities when capacities match."""
+        super().load_dict(data)
+        self.sums.clear()
+        self.mins.clear()
+        indices = np.arange(self.size)
+        if 'priorities' in data and data['capacity'] == self.capacity:
+            self.sums.update(indices, data['priorities'])
+            self.mins.update(indices, data['priorities'])
+            self.max_priority = data.get('max_priority', self.max_priority)
+        else:
+            self.__fill(indices)
+
+    def __fill(self, indices: np.ndarray):
+        values = np.full(len(indices), self.max_priority ** self.alpha)
+        self.sums.update(indices, values)
+        self.mins.update(indices, values)
+
+
+def from_config(config: Any, path: Optional[str] = None) -> ReplayBuffer:
+    """Create the buffer described by a model config.
+
+    Args:
+        config: model config with `buffer_size` and `seed`, and `prioritized`, `alpha`, `beta` and `beta_anneal`
+            for prioritized replay.
+        path: directory of memory-mapped columns, None to keep columns in memory.
+
+    Returns:
+        Prioritized buffer if `config.prioritized`, uniform buffer otherwise.
+    """
+    seed = getattr(config, 'seed', None)
+    if getattr(config, 'prioritized', False):
+        return PrioritizedReplayBuffer(
+            config.buffer_size,
+            path=path,
+            seed=seed,
+            alpha=config.alpha,
+            beta=config.beta,
+            beta_anneal=config.beta_anneal,
+        )
+    return ReplayBuffer(config.buffer_size, path=path, seed=seed)
+
+
+def is_replay(data: Any) -> bool:
+    """Check whether data is the canonical form of a replay buffer.
+
+    Args:
+        data: data to check.
+
+    Returns:
+        True if `data` is a dict made by `ReplayBuffer.to_dict`.
+    """
+    return isinstance(data, dict) and data.get('format') == FORMAT and 'columns' in data
@@ -0,0 +1,167 @@
+"""On-disk snapshots of a task, written one object at a time so a snapshot never has to fit in memory.
+
+A checkpoint is a directory holding `manifest.json` and one sub-directory per agent:
+
+    manifest.json               configs of all services, and entries of every saved object
+    <id>/weights/<i>.npy        arrays of weights, one raw `.npy` file per array
+    <id>/buffer/<i>.npy         arrays of buffer
+    <id>/buffer/data.pkl        pickled object, used when it holds values that can not be stored as arrays
+
+Nested structures are split by `tensors.flatten` into a json tree kept in the manifest and plain arrays, which are
+loaded back with `np.load(mmap_mode=...)`. Every array is recorded with its sha256, so writing a checkpoint over an
+older one only rewrites changed arrays. The manifest is replaced atomically after every object, and is marked
+`complete` only when all objects are written.
+"""
+import hashlib
+import json
+import os
+import pickle
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from .configs import AnyDict, Service, Agent, Simenv
+from . import tensors
+
+MANIFEST = 'manifest.json'
+VERSION = 1
+
+
+def _sha256(data: Any) -> str:
+    return hashlib.sha256(memoryview(data).cast('B')).hexdigest()
+
+
+def _replace(path: str, write: Any):
+    tmp = f'{path}.tmp'
+    with open(tmp, 'wb') as f:
+        write(f)
+    os.replace(tmp, path)
+
+
+def new_manifest(services: Dict[str, Service], agents: Dict[str, Agent], simenvs: Dict[str, Simenv]) -> AnyDict:
+    """Create an empty manifest holding configs of services.
+
+    Args:
+        services: services of task.
+        agents: agent configs of task.
+        simenvs: simenv configs of task.
+
+    Returns:
+        Manifest without any saved object.
+    """
+    return {
+        'version': VERSION,
+        'complete': False,
+        'services': {id: vars(service) for id, service in services.items()},
+        'agents': {id: vars(agent) for id, agent in agents.items()},
+        'simenvs': {id: vars(simenv) for id, simenv in simenvs.items()},
+        'states': {},
+    }
+
+
+def read_manifest(path: str) -> Optional[AnyDict]:
+    """Read manifest of a checkpoint.
+
+    Args:
+        path: directory of checkpoint.
+
+    Returns:
+        Manifest, None if directory holds no checkpoint.
+    """
+    try:
+        with open(os.path.join(path, MANIFEST), 'r') as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return None
+    if manifest.get('version') != VERSION:
+        raise ValueError(f'Unsupported checkpoint version {manifest.get("version")}.')
+    return manifest
+
+
+def write_manifest(path: str, manifest: AnyDict):
+    """Atomically replace manifest of a checkpoint.
+
+    Args:
+        path: directory of checkpoint.
+        manifest: manifest to write.
+    """
+    os.makedirs(path, exist_ok=True)
+    _replace(os.path.join(path, MANIFEST), lambda f: f.write(json.dumps(manifest, indent=2).encode()))
+
+
+def decode_configs(manifest: AnyDict) -> Dict[str, Dict[str, Any]]:
+    """Rebuild configs of services from a manifest.
+
+    Args:
+        manifest: manifest of checkpoint.
+
+    Returns:
+        Services, agents and simenvs, keyed by `services`, `agents` and `simenvs`.
+    """
+    return {
+        'services': {id: Service(**configs) for id, configs in manifest['services'].items()},
+        'agents': {id: Agent(**configs) for id, configs in manifest['agents'].items()},
+        'simenvs': {id: Simenv(**configs) for id, configs in manifest['simenvs'].items()},
+    }
+
+
+def save(path: str, obj: Any, previous: Optional[AnyDict] = None) -> AnyDict:
+    """Save an object into a directory.
+
+    Args:
+        path: directory of object.
+        obj: nested structure of arrays and json values, or any picklable object.
+        previous: entry of the object in an older checkpoint at the same path, arrays equal to it are not rewritten.
+
+    Returns:
+        Entry of the object to keep in manifest.
+    """
+    os.makedirs(path, exist_ok=True)
+    try:
+        tree, arrays = tensors.flatten(obj)
+    except TypeError:
+        data = pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+        entry = {'format': 'pickle', 'file': 'data.pkl', 'sha256': _sha256(data)}
+        if previous is None or previous.get('sha256') != entry['sha256'] or not os.path.exists(f'{path}/data.pkl'):
+            _replace(f'{path}/data.pkl', lambda f: f.write(data))
+        _prune(path, {'data.pkl'})
+        return entry
+
+    olds = previous.get('arrays', []) if previous is not None and previous.get('format') == 'npy' else []
+    files = []
+    for i, (_, arr) in enumerate(arrays):
+        file = f'{i}.npy'
+        digest = _sha256(arr.reshape(-1).view(np.uint8)) if arr.nbytes > 0 else ''
+        info = {'file': file, 'dtype': np.lib.format.dtype_to_descr(arr.dtype), 'shape': list(arr.shape), 'sha256': digest}
+        if i >= len(olds) or olds[i] != info or not os.path.exists(f'{path}/{file}'):
+            _replace(f'{path}/{file}', lambda f: np.save(f, arr, allow_pickle=False))
+        files.append(info)
+    _prune(path, {info['file'] for info in files})
+    return {'format': 'npy', 'tree': tree, 'arrays': files}
+
+
+def load(path: str, entry: AnyDict, mmap_mode: Optional[str] = 'r') -> Any:
+    """Load an object saved by `save`.
+
+    Args:
+        path: directory of object.
+        entry: entry of the object in manifest.
+        mmap_mode: mode of memory-mapping arrays, see `np.load`, None to read arrays into memory.
+
+    Returns:
+        Saved object.
+    """
+    if entry['format'] == 'pickle':
+        with open(f'{path}/{entry["file"]}', 'rb') as f:
+            return pickle.load(f)
+    arrays = []
+    for info in entry['arrays']:
+        mode = mmap_mode if np.prod(info['shape']) > 0 else None
+        arrays.append(np.load(f'{path}/{info["file"]}', mmap_mode=mode, allow_pickle=False))
+    return tensors.unflatten(entry['tree'], arrays)
+
+
+def _prune(path: str, keep: set):
+    for file in os.listdir(path):
+        if file not in keep and (file.endswith('.npy') or file.endswith('.pkl') or file.endswith('.tmp')):
+            os.remove(os.path.join(path, file))
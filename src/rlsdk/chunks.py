@@ -0,0 +1,186 @@
+"""Chunked transfer of model buffers over the `Call` RPC.
+
+A buffer larger than the message limit is moved as a sequence of `@buffer-chunk` calls, each carrying a json control
+header in `CallData.dstr` and at most `chunk_size` bytes of the serialized buffer in `CallData.dbin`:
+
+    set: {"op": "set", "xfer": <id>, "seq": i, "size": chunk_size, "total": n, "nbytes": N} -> service acks {"seq": i}
+    get: {"op": "get", "xfer": <id>, "seq": i, "size": chunk_size} -> service replies {"seq": i, "total": n, "nbytes": N}
+
+Client side helpers are sans-io, so both `Client` and `AsyncClient` drive them, while `ChunkHandler` implements the
+service side of the protocol on top of plain get/set callables.
+"""
+import json
+import math
+import time
+import uuid
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+NAME = '@buffer-chunk'
+
+CallTuple = Tuple[str, str, bytes]
+
+
+def split(payload: bytes, chunk_size: int) -> Iterator[CallTuple]:
+    """Split a serialized buffer into `set` calls.
+
+    Args:
+        payload: serialized buffer.
+        chunk_size: maximum bytes of each chunk.
+
+    Yields:
+        Call data of each chunk.
+    """
+    if chunk_size <= 0:
+        raise ValueError('chunk_size must be positive.')
+    xfer = uuid.uuid4().hex
+    view = memoryview(payload)
+    total = max(math.ceil(len(view) / chunk_size), 1)
+    for seq in range(total):
+        head = {'op': 'set', 'xfer': xfer, 'seq': seq, 'size': chunk_size, 'total': total, 'nbytes': len(view)}
+        yield NAME, json.dumps(head), bytes(view[seq * chunk_size:(seq + 1) * chunk_size])
+
+
+def check(res: CallTuple) -> Dict[str, Any]:
+    """Check reply of a chunk call.
+
+    Args:
+        res: call data replied by service.
+
+    Returns:
+        Control header of the reply.
+
+    Raises:
+        RuntimeError: When service does not support chunked transfer or reports an error.
+    """
+    name, dstr, _ = res
+    if name != NAME or not dstr:
+        raise RuntimeError('Service does not support chunked transfer.')
+    head = json.loads(dstr)
+    if 'error' in head:
+        raise RuntimeError(f'Chunked transfer failed: {head["error"]}.')
+    return head
+
+
+class Assembler:
+    """Reassemble a buffer from `get` calls incrementally."""
+
+    def __init__(self, chunk_size: int):
+        """Init assembler.
+
+        Args:
+            chunk_size: maximum bytes of each chunk.
+        """
+        if chunk_size <= 0:
+            raise ValueError('chunk_size must be positive.')
+        self.chunk_size = chunk_size
+        self.xfer = uuid.uuid4().hex
+        self.data: Optional[bytearray] = None
+        self.seq = 0
+        self.total = 1
+
+    def request(self) -> CallTuple:
+        """Get call data requesting the next chunk."""
+        head = {'op': 'get', 'xfer': self.xfer, 'seq': self.seq, 'size': self.chunk_size}
+        return NAME, json.dumps(head), b''
+
+    def feed(self, res: CallTuple) -> Optional[CallTuple]:
+        """Write a replied chunk into the buffer.
+
+        Args:
+            res: call data replied by service.
+
+        Returns:
+            Call data requesting the next chunk, or None when all chunks are received.
+        """
+        head = check(res)
+        if head['seq'] != self.seq:
+            raise RuntimeError(f'Chunk {self.seq} expected, but got {head["seq"]}.')
+        if self.data is None:
+            self.data = bytearray(head['nbytes'])
+            self.total = head['total']
+        start = self.seq * self.chunk_size
+        self.data[start:start + len(res[2])] = res[2]
+        self.seq += 1
+        return self.request() if self.seq < self.total else None
+
+
+class ChunkHandler:
+    """Service side of the chunked transfer protocol."""
+
+    def __init__(self, dump: Callable[[], bytes], load: Callable[[bytearray], Any], ttl=60.0):
+        """Init handler.
+
+        Args:
+            dump: function serializing current buffer, called once per `get` transfer.
+            load: function deserializing and applying a buffer received by `set` transfer.
+            ttl: seconds after which a transfer without new chunks is dropped, e.g. when its client died.
+        """
+        self.dump = dump
+        self.load = load
+        self.ttl = ttl
+        self.sending: Dict[str, memoryview] = {}
+        self.receiving: Dict[str, bytearray] = {}
+        self.received: Dict[str, Tuple[int, int]] = {}
+        self.touched: Dict[str, float] = {}
+
+    def __call__(self, dstr: str, dbin: bytes) -> Tuple[str, bytes]:
+        """Handle a chunk call.
+
+        Args:
+            dstr: control header of the call.
+            dbin: chunk data of the call.
+
+        Returns:
+            Control header and chunk data of the reply.
+        """
+        head = json.loads(dstr)
+        xfer, seq = head['xfer'], head['seq']
+        self.__expire(time.monotonic())
+        try:
+            if seq > 0 and xfer not in self.sending and xfer not in self.receiving:
+                raise RuntimeError(f'transfer {xfer} unknown or expired')
+            self.touched[xfer] = time.monotonic()
+            if head['op'] == 'set':
+                if seq == 0:
+                    self.receiving[xfer] = bytearray(head['nbytes'])
+                    self.received[xfer] = (0, 0)
+                data, (expected, nbytes) = self.receiving[xfer], self.received[xfer]
+                if seq != expected:
+                    raise RuntimeError(f'chunk {expected} expected, but got {seq}')
+                start = seq * head['size']
+                if start != nbytes or start + len(dbin) > len(data):
+                    raise RuntimeError(f'chunk {seq} of {len(dbin)} bytes at {start} does not fit {len(data)} bytes')
+                data[start:start + len(dbin)] = dbin
+                self.received[xfer] = (seq + 1, start + len(dbin))
+                if seq == head['total'] - 1:
+                    if start + len(dbin) != len(data):
+                        raise RuntimeError(f'received {start + len(dbin)} of {len(data)} bytes')
+                    self.touched.pop(xfer, None)
+                    self.received.pop(xfer, None)
+                    self.load(self.receiving.pop(xfer))
+                return json.dumps({'seq': seq}), b''
+            elif head['op'] == 'get':
+                if seq == 0:
+                    self.sending[xfer] = memoryview(self.dump())
+                view, size = self.sending[xfer], head['size']
+                total = max(math.ceil(len(view) / size), 1)
+                chunk = bytes(view[seq * size:(seq + 1) * size])
+                if seq == total - 1:
+                    self.touched.pop(xfer, None)
+                    del self.sending[xfer]
+                return json.dumps({'seq': seq, 'total': total, 'nbytes': len(view)}), chunk
+            else:
+                raise ValueError(f'unknown op {head["op"]}')
+        except Exception as e:
+            self.touched.pop(xfer, None)
+            self.sending.pop(xfer, None)
+            self.receiving.pop(xfer, None)
+            self.received.pop(xfer, None)
+            return json.dumps({'seq': seq, 'error': str(e)}), b''
+
+    def __expire(self, now: float):
+        for xfer in [xfer for xfer, touched in self.touched.items() if now - touched > self.ttl]:
+            del self.touched[xfer]
+            self.sending.pop(xfer, None)
+            self.receiving.pop(xfer, None)
+            self.received.pop(xfer, None)
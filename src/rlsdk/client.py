@@ -1,218 +1,436 @@
-import json
-import pathlib
-import pickle
-import shutil
-import tempfile
-from typing import Dict, List, Tuple
+from concurrent.futures import as_completed, ThreadPoolExecutor
+import hashlib
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
 
 import grpc
 import numpy as np  # noqa: F401
 
 from .configs import AnyDict, Service, Agent, Simenv
-
-from .protos import bff_pb2, bff_pb2_grpc
+from . import chunks
+from . import convert
+from . import fastjson
+from . import monitor
+from . import shm
+from .convert import CallTuple, Format
+from .metrics import Metrics, MetricsInterceptor
+from .pool import ChannelPool, default_pool
+from . import sync
+
+from .protos import agent_pb2_grpc, bff_pb2, bff_pb2_grpc, simenv_pb2, simenv_pb2_grpc
 from .protos import types_pb2
 
+ServiceStub = Union[agent_pb2_grpc.AgentStub, simenv_pb2_grpc.SimenvStub]
+
+
+class BatchError(RuntimeError):
+    """Some ids of a fanned-out request failed, results of the other ids are kept."""
+
+    def __init__(self, results: Dict[str, Any], errors: Dict[str, Exception]):
+        super().__init__(f'Request failed for {", ".join(errors.keys())}: {next(iter(errors.values()))}')
+        self.results = results
+        self.errors = errors
+
 
 class Client:
 
-    def __init__(self, address: str, max_msg_len=256):
+    def __init__(
+        self,
+        address: str,
+        max_msg_len=256,
+        pool: Optional[ChannelPool] = None,
+        direct=False,
+        fanout=0,
+        metrics: Optional[Metrics] = None,
+        use_shm=False,
+    ):
         self.address = address
-        try:
-            self.channel = grpc.insecure_channel(
-                address,
-                options=[
-                    ('grpc.max_send_message_length', max_msg_len * 1024 * 1024),
-                    ('grpc.max_receive_message_length', max_msg_len * 1024 * 1024),
-                ],
-            )
-            grpc.channel_ready_future(self.channel).result(timeout=3)
-        except (grpc.FutureTimeoutError, grpc.RpcError):
-            self.channel.close()
-            raise ConnectionError(f'Connection to {address} timed out, please check the address again.')
-        else:
-            self.stub = bff_pb2_grpc.BFFStub(self.channel)
-
-    def __del__(self):
-        self.channel.close()
+        self.pool = default_pool if pool is None else pool
+        self.options = [
+            ('grpc.max_send_message_length', max_msg_len * 1024 * 1024),
+            ('grpc.max_receive_message_length', max_msg_len * 1024 * 1024),
+        ]
+        self.metrics = metrics
+        self.channel = self.pool.acquire(address, options=self.options)
+        self.stub = bff_pb2_grpc.BFFStub(self.__intercept(self.channel))
+
+        self.direct = direct
+        self.routes: Dict[str, ServiceStub] = {}
+        self.route_channels: Dict[str, grpc.Channel] = {}
+
+        self.uploads: Dict[str, str] = {}
+
+        self.fanout = fanout
+        self.executor = ThreadPoolExecutor(max_workers=fanout) if fanout > 0 else None
+
+        self.use_shm = use_shm
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+        self.forget_routes()
+        if self.channel is not None:
+            self.pool.release(self.channel)
+            self.channel = None
+
+    def forget_routes(self, ids: List[str] = []):
+        for id in ids or list(self.routes.keys()):
+            self.routes.pop(id, None)
+            channel = self.route_channels.pop(id, None)
+            if channel is not None:
+                self.pool.release(channel)
+
+    def stats(self) -> AnyDict:
+        return self.metrics.snapshot() if self.metrics is not None else {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
 
     def reset_server(self):
+        self.uploads.clear()
         self.stub.ResetServer(types_pb2.CommonRequest())
 
     def register_service(self, services: Dict[str, Service]):
-        service_info_map = bff_pb2.ServiceInfoMap()
-        for id, service in services.items():
-            service_info_map.services[id].type = service.type
-            service_info_map.services[id].name = service.name
-            service_info_map.services[id].host = service.host
-            service_info_map.services[id].port = service.port
-            service_info_map.services[id].desc = service.desc
-        self.stub.RegisterService(service_info_map)
+        self.__forget(list(services.keys()))
+        self.stub.RegisterService(convert.encode_services(services))
 
     def unregister_service(self, ids: List[str] = []):
-        self.stub.UnRegisterService(bff_pb2.ServiceIdList(ids=ids))
+        self.__forget(ids)
+        self.stub.UnRegisterService(convert.encode_ids(ids))
 
     def get_service_info(self, ids: List[str] = []) -> Dict[str, Service]:
-        service_info_map = self.stub.GetServiceInfo(bff_pb2.ServiceIdList(ids=ids))
-        services = {}
-        for id, service in service_info_map.services.items():
-            services[id] = Service(
-                type=service.type,
-                name=service.name,
-                host=service.host,
-                port=service.port,
-                desc=service.desc,
-            )
-        return services
+        return convert.decode_services(self.stub.GetServiceInfo(convert.encode_ids(ids)))
 
     def set_service_info(self, services: Dict[str, Service]):
-        service_info_map = bff_pb2.ServiceInfoMap()
-        for id, service in services.items():
-            service_info_map.services[id].type = service.type
-            service_info_map.services[id].name = service.name
-            service_info_map.services[id].host = service.host
-            service_info_map.services[id].port = service.port
-            service_info_map.services[id].desc = service.desc
-        self.stub.SetServiceInfo(service_info_map)
+        self.__forget(list(services.keys()))
+        self.stub.SetServiceInfo(convert.encode_services(services))
 
     def reset_service(self, ids: List[str] = []):
-        self.stub.ResetService(bff_pb2.ServiceIdList(ids=ids))
+        self.__forget(ids, routes=False)
+        self.stub.ResetService(convert.encode_ids(ids))
 
     def query_service(self, ids: List[str] = []) -> Dict[str, bool]:
-        service_state_map = self.stub.QueryService(bff_pb2.ServiceIdList(ids=ids))
-        return {id: msg.state == types_pb2.ServiceState.State.INITED for id, msg in service_state_map.states.items()}
+        return convert.decode_states(self.stub.QueryService(convert.encode_ids(ids)))
 
     def get_agent_config(self, ids: List[str] = []) -> Dict[str, Agent]:
-        agent_config_map = self.stub.GetAgentConfig(bff_pb2.ServiceIdList(ids=ids))
-        agents = {}
-        for id, agent in agent_config_map.configs.items():
-            agents[id] = Agent(
-                name=agent.name,
-                hypers=json.loads(agent.hypers),
-                training=agent.training,
-                sifunc=agent.sifunc,
-                oafunc=agent.oafunc,
-                rewfunc=agent.rewfunc,
-                hooks=[{
-                    'name': hook.name,
-                    'args': json.loads(hook.args)
-                } for hook in agent.hooks],
-            )
-        return agents
+        return self.__serde('loads', 'config', convert.decode_agents, self.stub.GetAgentConfig(convert.encode_ids(ids)))
 
     def set_agent_config(self, agents: Dict[str, Agent]):
-        agent_config_map = bff_pb2.AgentConfigMap()
-        for id, agent in agents.items():
-            agent_config_map.configs[id].name = agent.name
-            agent_config_map.configs[id].hypers = json.dumps(agent.hypers)
-            agent_config_map.configs[id].training = agent.training
-            agent_config_map.configs[id].sifunc = agent.sifunc
-            agent_config_map.configs[id].oafunc = agent.oafunc
-            agent_config_map.configs[id].rewfunc = agent.rewfunc
-            for hook in agent.hooks:
-                pointer = agent_config_map.configs[id].hooks.add()
-                pointer.name = hook['name']
-                pointer.args = json.dumps(hook['args'])
-        self.stub.SetAgentConfig(agent_config_map)
+        self.stub.SetAgentConfig(self.__serde('dumps', 'config', convert.encode_agents, agents))
 
     def get_agent_mode(self, ids: List[str] = []) -> Dict[str, bool]:
-        agent_mode_map = self.stub.GetAgentMode(bff_pb2.ServiceIdList(ids=ids))
-        return {id: bool(msg.training) for id, msg in agent_mode_map.modes.items()}
+        return convert.decode_modes(self.stub.GetAgentMode(convert.encode_ids(ids)))
 
     def set_agent_mode(self, modes: Dict[str, bool]):
-        agent_mode_map = bff_pb2.AgentModeMap()
-        for id in modes:
-            agent_mode_map.modes[id].training = modes[id]
-        self.stub.SetAgentMode(agent_mode_map)
+        self.stub.SetAgentMode(convert.encode_modes(modes))
 
     def get_model_weights(self, ids: List[str] = []) -> AnyDict:
-        model_weights_map = self.stub.GetModelWeights(bff_pb2.ServiceIdList(ids=ids))
-        return {id: pickle.loads(msg.weights) for id, msg in model_weights_map.weights.items()}
-
-    def set_model_weights(self, weights: AnyDict):
+        if self.use_shm:
+            return self.__each(self.__ids('agent', ids), lambda id: self.__get_shm(id, 'weights'))
+        if self.direct or self.fanout > 0:
+            return self.__each(self.__ids('agent', ids), self.__get_weights)
+        return self.__serde('loads', 'weights', convert.decode_weights, self.stub.GetModelWeights(convert.encode_ids(ids)))
+
+    def set_model_weights(self, weights: AnyDict, format: Format = 'pickle'):
+        if self.use_shm:
+            ids = self.__ids('agent', list(weights.keys()))
+            self.__each(ids, lambda id: self.__set_shm(id, 'weights', self.__dumps('weights', weights[id], format)))
+            return
+        if self.direct or self.fanout > 0:
+            ids = self.__ids('agent', list(weights.keys()))
+            self.__each(ids, lambda id: self.__set_weights(id, self.__dumps('weights', weights[id], format)))
+            return
+        self.stub.SetModelWeights(self.__serde('dumps', 'weights', convert.encode_weights, weights, format))
+
+    def get_model_weights_bytes(self, ids: List[str] = []) -> Dict[str, bytes]:
+        if self.direct or self.fanout > 0:
+            return self.__each(self.__ids('agent', ids), self.__get_weights_bytes)
+        return {id: msg.weights for id, msg in self.stub.GetModelWeights(convert.encode_ids(ids)).weights.items()}
+
+    def set_model_weights_bytes(self, payloads: Dict[str, bytes]):
+        if self.direct or self.fanout > 0:
+            self.__each(self.__ids('agent', list(payloads.keys())), lambda id: self.__set_weights(id, payloads[id]))
+            return
         model_weights_map = bff_pb2.ModelWeightsMap()
-        for id in weights:
-            model_weights_map.weights[id].weights = pickle.dumps(weights[id])
+        for id, payload in payloads.items():
+            model_weights_map.weights[id].weights = payload
         self.stub.SetModelWeights(model_weights_map)
 
-    def get_model_buffer(self, ids: List[str] = []) -> AnyDict:
-        model_buffer_map = self.stub.GetModelBuffer(bff_pb2.ServiceIdList(ids=ids))
-        return {id: pickle.loads(msg.buffer) for id, msg in model_buffer_map.buffers.items()}
-
-    def set_model_buffer(self, buffers: AnyDict):
-        model_buffer_map = bff_pb2.ModelBufferMap()
-        for id in buffers:
-            model_buffer_map.buffers[id].buffer = pickle.dumps(buffers[id])
-        self.stub.SetModelBuffer(model_buffer_map)
+    def sync_model_weights(self, weights: AnyDict, state: sync.WeightSync, mode: sync.Mode = 'replace') -> Dict[str, int]:
+        heads = {id: sync.parse(res) for id, res in self.call({id: sync.query() for id in weights}).items()}
+        sent, patches = {}, {}
+        snapshots = state.snapshots({id: weights[id] for id in weights if heads[id] is not None})
+        for id in weights:
+            if heads[id] is None:
+                state.forget(id)
+                payload = self.__dumps('weights', weights[id])
+                self.__set_weights(id, payload)
+                sent[id] = len(payload)
+            else:
+                patches[id] = state.patch(id, snapshots[id], heads[id]['version'], mode)
+        if len(patches) > 0:
+            heads = {id: sync.parse(res) for id, res in self.call(patches).items()}
+        for id in patches:
+            if 'error' in heads[id]:
+                state.forget(id)
+                patches[id] = state.patch(id, snapshots[id], None, mode)
+                heads[id] = sync.parse(self.__call(id, patches[id]))
+                if 'error' in heads[id]:
+                    raise RuntimeError(f'Failed to sync weights of {id}: {heads[id]["error"]}.')
+            state.commit(id, heads[id]['version'])
+            sent[id] = len(patches[id][1]) + len(patches[id][2])
+        return sent
+
+    def get_model_buffer(self, ids: List[str] = [], chunk_size=0) -> AnyDict:
+        if chunk_size > 0:
+            return self.__each(self.__ids('agent', ids), lambda id: self.__get_buffer_chunked(id, chunk_size))
+        if self.use_shm:
+            return self.__each(self.__ids('agent', ids), lambda id: self.__get_shm(id, 'buffer'))
+        if self.direct or self.fanout > 0:
+            return self.__each(self.__ids('agent', ids), self.__get_buffer)
+        return self.__serde('loads', 'buffer', convert.decode_buffers, self.stub.GetModelBuffer(convert.encode_ids(ids)))
+
+    def set_model_buffer(self, buffers: AnyDict, format: Format = 'pickle', chunk_size=0):
+        if chunk_size > 0:
+            ids = self.__ids('agent', list(buffers.keys()))
+            self.__each(ids, lambda id: self.__set_buffer_chunked(id, self.__dumps('buffer', buffers[id], format), chunk_size))
+            return
+        if self.use_shm:
+            ids = self.__ids('agent', list(buffers.keys()))
+            self.__each(ids, lambda id: self.__set_shm(id, 'buffer', self.__dumps('buffer', buffers[id], format)))
+            return
+        if self.direct or self.fanout > 0:
+            ids = self.__ids('agent', list(buffers.keys()))
+            self.__each(ids, lambda id: self.__set_buffer(id, self.__dumps('buffer', buffers[id], format)))
+            return
+        self.stub.SetModelBuffer(self.__serde('dumps', 'buffer', convert.encode_buffers, buffers, format))
 
     def get_model_status(self, ids: List[str] = []) -> Dict[str, AnyDict]:
-        model_status_map = self.stub.GetModelStatus(bff_pb2.ServiceIdList(ids=ids))
-        return {id: json.loads(msg.status) for id, msg in model_status_map.status.items()}
+        if self.direct or self.fanout > 0:
+            return self.__each(self.__ids('agent', ids), self.__get_status)
+        return self.__serde('loads', 'status', convert.decode_status, self.stub.GetModelStatus(convert.encode_ids(ids)))
 
     def set_model_status(self, status: Dict[str, AnyDict]):
-        model_status_map = bff_pb2.ModelStatusMap()
-        for id in status:
-            model_status_map.status[id].status = json.dumps(status[id])
-        self.stub.SetModelStatus(model_status_map)
+        if self.direct or self.fanout > 0:
+            self.__each(self.__ids('agent', list(status.keys())), lambda id: self.__set_status(id, status[id]))
+            return
+        self.stub.SetModelStatus(self.__serde('dumps', 'status', convert.encode_status, status))
 
     def get_simenv_config(self, ids: List[str] = []) -> Dict[str, Simenv]:
-        simenv_config_map = self.stub.GetSimenvConfig(bff_pb2.ServiceIdList(ids=ids))
-        simenvs = {}
-        for id, simenv in simenv_config_map.configs.items():
-            simenvs[id] = Simenv(
-                name=simenv.name,
-                args=json.loads(simenv.args),
-            )
-        return simenvs
+        return self.__serde('loads', 'config', convert.decode_simenvs, self.stub.GetSimenvConfig(convert.encode_ids(ids)))
 
     def set_simenv_config(self, simenvs: Dict[str, Simenv]):
-        simenv_config_map = bff_pb2.SimenvConfigMap()
-        for id, simenv in simenvs.items():
-            simenv_config_map.configs[id].name = simenv.name
-            simenv_config_map.configs[id].args = json.dumps(simenv.args)
-        self.stub.SetSimenvConfig(simenv_config_map)
+        self.stub.SetSimenvConfig(self.__serde('dumps', 'config', convert.encode_simenvs, simenvs))
 
     def sim_control(self, cmds: Dict[str, str]):
-        sim_cmd_map = bff_pb2.SimCmdMap()
-        for id in cmds:
-            sim_cmd_map.cmds[id].type = cmds[id]
-        self.stub.SimControl(sim_cmd_map)
-
-    def sim_monitor(self, ids: List[str] = []) -> Dict[str, AnyDict]:
-        sim_info_map = self.stub.SimMonitor(bff_pb2.ServiceIdList(ids=ids))
-        return {
-            id: {
-                'state': msg.state,
-                'data': json.loads(msg.data),
-                'logs': json.loads(msg.logs),
-            } for id, msg in sim_info_map.infos.items()
-        }
-
-    def call(self, data: Dict[str, Tuple[str, str, bytes]]) -> Dict[str, Tuple[str, str, bytes]]:
-        req = bff_pb2.CallDataMap()
-        for id in data:
-            req.data[id].name = data[id][0]
-            req.data[id].dstr = data[id][1]
-            req.data[id].dbin = data[id][2]
-        res = self.stub.Call(req)
-        return {id: (msg.name, msg.dstr, msg.dbin) for id, msg in res.data.items()}
-
-    def upload_custom(self, ids: List[str], path: str):
-        tmp = tempfile.gettempdir()
-        tgt = pathlib.Path(path)
-        arch = shutil.make_archive(f'{tmp}/temp', 'zip', root_dir=tgt.parent, base_dir=tgt.name)
-        with open(arch, 'rb') as f:
-            file = f.read()
-
-        data = ('@custom', '', file)
-        self.call({id: data for id in ids})
-
-    def upload_custom_model(self, path: str):
-        services = self.get_service_info()
-        ids = [id for id, service in services.items() if service.type == 'agent']
-        self.upload_custom(ids, path)
+        self.stub.SimControl(convert.encode_cmds(cmds))
 
-    def upload_custom_engine(self, path: str):
+    def sim_monitor(self, ids: List[str] = [], lazy=False) -> Dict[str, AnyDict]:
+        if self.direct or self.fanout > 0:
+            return self.__each(
+                self.__ids('simenv', ids),
+                lambda id: self.__serde('loads', 'monitor', convert.decode_info, self.__monitor_msg(id), lazy),
+            )
+        return self.__serde('loads', 'monitor', convert.decode_infos, self.stub.SimMonitor(convert.encode_ids(ids)), lazy)
+
+    def watch_monitor(
+        self,
+        ids: List[str] = [],
+        min_interval=0.1,
+        max_interval=5.0,
+        duration: Optional[float] = None,
+    ) -> Iterator[Dict[str, AnyDict]]:
+        cursors: Dict[str, monitor.MonitorCursor] = {}
+        backoff = monitor.Backoff(min_interval, max_interval)
+        deadline = None if duration is None else time.monotonic() + duration
+        while True:
+            changes = monitor.updates(cursors, self.__monitor_msgs(ids))
+            if len(changes) > 0:
+                yield changes
+            interval = backoff.next(len(changes) > 0)
+            if deadline is not None:
+                if time.monotonic() + interval > deadline:
+                    return
+            time.sleep(interval)
+
+    def call(self, data: Dict[str, CallTuple]) -> Dict[str, CallTuple]:
+        if self.direct or self.fanout > 0:
+            return self.__each(self.__ids(None, list(data.keys())), lambda id: self.__call(id, data[id]))
+        return convert.decode_calls(self.stub.Call(convert.encode_calls(data)))
+
+    def upload_custom(self, ids: List[str], path: str, force=False) -> List[str]:
+        file = convert.pack_custom(path)
+        digest = hashlib.sha256(file).hexdigest()
+        ids = [id for id in ids if force or self.uploads.get(id) != digest]
+        if len(ids) > 0:
+            data = ('@custom', '', file)
+            try:
+                self.call({id: data for id in ids})
+            except BatchError as e:
+                self.uploads.update({id: digest for id in e.results})
+                raise
+            self.uploads.update({id: digest for id in ids})
+        return ids
+
+    def upload_custom_model(self, path: str, force=False) -> List[str]:
+        return self.upload_custom(self.__service_ids('agent'), path, force)
+
+    def upload_custom_engine(self, path: str, force=False) -> List[str]:
+        return self.upload_custom(self.__service_ids('simenv'), path, force)
+
+    def __service_ids(self, type: str) -> List[str]:
         services = self.get_service_info()
-        ids = [id for id, service in services.items() if service.type == 'simenv']
-        self.upload_custom(ids, path)
+        return [id for id, service in services.items() if service.type == type]
+
+    def __intercept(self, channel: grpc.Channel) -> grpc.Channel:
+        if self.metrics is None:
+            return channel
+        return grpc.intercept_channel(channel, MetricsInterceptor(self.metrics))
+
+    def __serde(self, op: str, kind: str, fn: Callable[..., Any], *args) -> Any:
+        if self.metrics is None:
+            return fn(*args)
+        return self.metrics.timed(op, kind, fn, *args)
+
+    def __dumps(self, kind: str, obj: Any, format: Format = 'pickle') -> bytes:
+        return self.__serde('dumps', kind, convert.dumps, obj, format)
+
+    def __forget(self, ids: List[str], routes=True):
+        if len(ids) == 0:
+            self.uploads.clear()
+        for id in ids:
+            self.uploads.pop(id, None)
+        if routes:
+            self.forget_routes(ids)
+
+    def __ids(self, type: Optional[str], ids: List[str]) -> List[str]:
+        if self.direct:
+            return list(self.__routes(type, ids).keys())
+        return ids or self.__service_ids(type)
+
+    def __routes(self, type: Optional[str], ids: List[str]) -> Dict[str, ServiceStub]:
+        if len(ids) == 0:
+            ids = self.__service_ids(type)
+        missing = [id for id in ids if id not in self.routes]
+        if len(missing) > 0:
+            services = self.get_service_info(missing)
+            for id in missing:
+                if id not in services:
+                    raise ValueError(f'Service {id} not registered.')
+                service = services[id]
+                if type is not None and service.type != type:
+                    raise ValueError(f'Service {id} is not a registered {type}.')
+                channel = self.pool.acquire(service.address, options=self.options)
+                self.route_channels[id] = channel
+                if service.type == 'agent':
+                    self.routes[id] = agent_pb2_grpc.AgentStub(self.__intercept(channel))
+                else:
+                    self.routes[id] = simenv_pb2_grpc.SimenvStub(self.__intercept(channel))
+        return {id: self.routes[id] for id in ids}
+
+    def __each(self, ids: List[str], fn: Callable[[str], Any]) -> Dict[str, Any]:
+        if self.executor is None:
+            return {id: fn(id) for id in ids}
+        futures = {self.executor.submit(fn, id): id for id in ids}
+        results, errors = {}, {}
+        for future in as_completed(futures):
+            id = futures[future]
+            try:
+                results[id] = future.result()
+            except Exception as e:
+                errors[id] = e
+        if len(errors) > 0:
+            raise BatchError(results, errors)
+        return {id: results[id] for id in ids}
+
+    def __get_weights(self, id: str) -> Any:
+        if self.direct:
+            msg = self.routes[id].GetModelWeights(types_pb2.CommonRequest())
+            return self.__serde('loads', 'weights', convert.loads, msg.weights)
+        return self.__serde('loads', 'weights', convert.decode_weights, self.stub.GetModelWeights(convert.encode_ids([id])))[id]
+
+    def __get_weights_bytes(self, id: str) -> bytes:
+        if self.direct:
+            return self.routes[id].GetModelWeights(types_pb2.CommonRequest()).weights
+        return self.stub.GetModelWeights(convert.encode_ids([id])).weights[id].weights
+
+    def __set_weights(self, id: str, payload: bytes):
+        model_weights_map = bff_pb2.ModelWeightsMap()
+        model_weights_map.weights[id].weights = payload
+        if self.direct:
+            self.__routes('agent', [id])[id].SetModelWeights(model_weights_map.weights[id])
+        else:
+            self.stub.SetModelWeights(model_weights_map)
+
+    def __get_buffer(self, id: str) -> Any:
+        if self.direct:
+            msg = self.routes[id].GetModelBuffer(types_pb2.CommonRequest())
+            return self.__serde('loads', 'buffer', convert.loads, msg.buffer)
+        return self.__serde('loads', 'buffer', convert.decode_buffers, self.stub.GetModelBuffer(convert.encode_ids([id])))[id]
+
+    def __set_buffer(self, id: str, payload: bytes):
+        model_buffer_map = bff_pb2.ModelBufferMap()
+        model_buffer_map.buffers[id].buffer = payload
+        if self.direct:
+            self.routes[id].SetModelBuffer(model_buffer_map.buffers[id])
+        else:
+            self.stub.SetModelBuffer(model_buffer_map)
+
+    def __get_status(self, id: str) -> AnyDict:
+        if self.direct:
+            msg = self.routes[id].GetModelStatus(types_pb2.CommonRequest())
+            return self.__serde('loads', 'status', fastjson.loads, msg.status)
+        return self.__serde('loads', 'status', convert.decode_status, self.stub.GetModelStatus(convert.encode_ids([id])))[id]
+
+    def __set_status(self, id: str, status: AnyDict):
+        model_status_map = self.__serde('dumps', 'status', convert.encode_status, {id: status})
+        if self.direct:
+            self.routes[id].SetModelStatus(model_status_map.status[id])
+        else:
+            self.stub.SetModelStatus(model_status_map)
+
+    def __monitor_msg(self, id: str) -> simenv_pb2.SimInfo:
+        if self.direct:
+            return self.routes[id].SimMonitor(types_pb2.CommonRequest())
+        return self.stub.SimMonitor(convert.encode_ids([id])).infos[id]
+
+    def __monitor_msgs(self, ids: List[str]) -> Dict[str, simenv_pb2.SimInfo]:
+        if self.direct or self.fanout > 0:
+            return self.__each(self.__ids('simenv', ids), self.__monitor_msg)
+        return dict(self.stub.SimMonitor(convert.encode_ids(ids)).infos)
+
+    def __call(self, id: str, data: CallTuple) -> CallTuple:
+        if self.direct:
+            msg = self.__routes(None, [id])[id].Call(types_pb2.CallData(name=data[0], dstr=data[1], dbin=data[2]))
+            return msg.name, msg.dstr, msg.dbin
+        return convert.decode_calls(self.stub.Call(convert.encode_calls({id: data})))[id]
+
+    def __get_buffer_chunked(self, id: str, chunk_size: int) -> Any:
+        assembler = chunks.Assembler(chunk_size)
+        req = assembler.request()
+        while req is not None:
+            req = assembler.feed(self.__call(id, req))
+        return self.__serde('loads', 'buffer', convert.loads, assembler.data)
+
+    def __set_buffer_chunked(self, id: str, payload: bytes, chunk_size: int):
+        for req in chunks.split(payload, chunk_size):
+            chunks.check(self.__call(id, req))
+
+    def __get_shm(self, id: str, kind: str) -> Any:
+        head = shm.check(self.__call(id, shm.request_get(kind)))
+        try:
+            data = shm.attach(head['seg'], head['nbytes'])
+        finally:
+            shm.unlink(head['seg'])
+        return self.__serde('loads', kind, convert.loads, data)
+
+    def __set_shm(self, id: str, kind: str, payload: bytes):
+        seg = shm.create(payload)
+        try:
+            shm.check(self.__call(id, shm.request_set(kind, seg, len(payload))))
+        finally:
+            shm.unlink(seg)
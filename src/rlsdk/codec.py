@@ -0,0 +1,176 @@
+"""Vectorized codec between `SimState`/`SimAction` messages and numpy structured arrays.
+
+A `SimCodec` is compiled from the `data` config of CQSIM engine, where `outputs` of each model are the params of its
+entities in `SimState` and `inputs` are the params of its entities in `SimAction`. Every model is decoded into one
+structured array with one row per entity and one field per param, filled column by column with cached accessors.
+"""
+from typing import Any, Dict, List, Mapping, Optional, Tuple, Union
+
+import numpy as np
+
+from .configs import AnyDict, Simenv
+from . import convert
+
+from .protos import types_pb2
+
+DTypeLike = Union[str, type, np.dtype]
+
+_KINDS = {
+    'vdouble': np.dtype('f8'),
+    'vint32': np.dtype('i4'),
+    'vbool': np.dtype('?'),
+}
+_EMPTY = types_pb2.SimParam()
+
+
+def _attr(dtype: np.dtype) -> Optional[str]:
+    if dtype == np.bool_:
+        return 'vbool'
+    elif np.issubdtype(dtype, np.integer):
+        return 'vint32'
+    elif np.issubdtype(dtype, np.floating):
+        return 'vdouble'
+    elif np.issubdtype(dtype, np.str_):
+        return 'vstring'
+    else:
+        return None
+
+
+class _Schema:
+    """Fields of entities of a model, with dtypes fixed explicitly or on first sight."""
+
+    def __init__(self, fields: List[str], dtypes: Mapping[str, DTypeLike]):
+        self.fields = fields
+        self.dtypes: Dict[str, np.dtype] = {f: np.dtype(dtypes[f]) for f in fields if f in dtypes}
+        self.dtype: Optional[np.dtype] = None
+        self.attrs: List[Tuple[str, Optional[str]]] = []
+        self.__compile()
+
+    def infer(self, entities: Any):
+        for field in self.fields:
+            if field in self.dtypes:
+                continue
+            for entity in entities:
+                param = entity.params.get(field)
+                if param is not None and param.WhichOneof('value') is not None:
+                    self.dtypes[field] = _KINDS.get(param.WhichOneof('value'), np.dtype('O'))
+                    break
+        self.__compile()
+
+    def __compile(self):
+        if all(field in self.dtypes for field in self.fields):
+            self.dtype = np.dtype([(field, self.dtypes[field]) for field in self.fields])
+            self.attrs = [(field, _attr(self.dtypes[field])) for field in self.fields]
+
+    def decode(self, model: types_pb2.SimModel) -> np.ndarray:
+        entities = model.entities
+        if self.dtype is None:
+            self.infer(entities)
+            if self.dtype is None:
+                if len(entities) > 0:
+                    self.dtypes.update({f: np.dtype('O') for f in self.fields if f not in self.dtypes})
+                    self.__compile()
+                else:
+                    return np.empty(0, dtype=[(field, 'O') for field in self.fields])
+        params = [entity.params for entity in entities]
+        arr = np.empty(len(params), dtype=self.dtype)
+        for field, attr in self.attrs:
+            if attr is None:
+                col = arr[field]
+                for i, p in enumerate(params):
+                    col[i] = convert.decode_param(p.get(field, _EMPTY))
+            else:
+                arr[field] = [getattr(p.get(field, _EMPTY), attr) for p in params]
+        return arr
+
+    def encode(self, model: types_pb2.SimModel, arr: Union[np.ndarray, Mapping[str, Any]]):
+        columns = {field: np.asarray(arr[field]) for field in self.fields if field in _names(arr)}
+        if len(columns) == 0:
+            return
+        n = len(next(iter(columns.values())))
+        params = [model.entities.add().params for _ in range(n)]
+        for field, col in columns.items():
+            attr = _attr(self.dtypes[field]) if field in self.dtypes else _attr(col.dtype)
+            if attr is None:
+                for p, v in zip(params, col.tolist()):
+                    convert.encode_param(p[field], v)
+            else:
+                for p, v in zip(params, col.tolist()):
+                    setattr(p[field], attr, v)
+
+
+def _names(arr: Union[np.ndarray, Mapping[str, Any]]) -> Tuple[str, ...]:
+    if isinstance(arr, np.ndarray):
+        return arr.dtype.names or ()
+    return tuple(arr.keys())
+
+
+class SimCodec:
+    """Codec of a simulation scenario compiled from CQSIM `data` config."""
+
+    @classmethod
+    def from_simenv(cls, simenv: Simenv, **kwargs):
+        """Create codec from a CQSIM simenv config.
+
+        Args:
+            simenv: simenv config.
+            kwargs: other arguments of `SimCodec`.
+        """
+        return cls(simenv.args['data'], **kwargs)
+
+    def __init__(
+        self,
+        data: Dict[str, AnyDict],
+        state_dtypes: Dict[str, Mapping[str, DTypeLike]] = {},
+        action_dtypes: Dict[str, Mapping[str, DTypeLike]] = {},
+    ):
+        """Init codec.
+
+        Args:
+            data: input and output data of models, with `inputs` and `outputs` param names of each model.
+            state_dtypes: dtypes of state fields by model, others are inferred from the first decoded state.
+            action_dtypes: dtypes of action fields by model, others are taken from encoded arrays.
+                Note: `f8`, `i4`, `?` and `U` dtypes map to `vdouble`, `vint32`, `vbool` and `vstring` params, any
+                other field is converted as a nested python value.
+        """
+        self.states = {name: _Schema(list(model['outputs']), state_dtypes.get(name, {})) for name, model in data.items()}
+        self.actions = {name: _Schema(list(model['inputs']), action_dtypes.get(name, {})) for name, model in data.items()}
+
+    def decode(self, sim_state: types_pb2.SimState) -> Dict[str, np.ndarray]:
+        """Decode states of all models.
+
+        Args:
+            sim_state: `SimState` message.
+
+        Returns:
+            Structured array of entities by model.
+        """
+        return {name: self.states[name].decode(model) for name, model in sim_state.states.items() if name in self.states}
+
+    def decode_state(self, sim_state: types_pb2.SimState) -> Tuple[Dict[str, np.ndarray], bool, bool, float]:
+        """Decode states of all models together with episode signals.
+
+        Args:
+            sim_state: `SimState` message.
+
+        Returns:
+            Structured array of entities by model.
+            Whether terminated.
+            Whether truncated.
+            Reward.
+        """
+        return self.decode(sim_state), sim_state.terminated, sim_state.truncated, sim_state.reward
+
+    def encode(self, actions: Dict[str, Union[np.ndarray, Mapping[str, Any]]]) -> types_pb2.SimAction:
+        """Encode actions of models.
+
+        Args:
+            actions: structured array, or mapping of field name to column, of entities by model.
+
+        Returns:
+            `SimAction` message.
+        """
+        sim_action = types_pb2.SimAction()
+        for name, arr in actions.items():
+            self.actions[name].encode(sim_action.actions[name], arr)
+        return sim_action
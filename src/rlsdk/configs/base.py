@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+import hashlib
 import json
 from typing import Any, Dict
 
@@ -66,6 +67,16 @@ class ServiceBase(ABC):
         """Init config."""
         ...
 
+    def digest(self) -> str:
+        """Get canonical hash of config, equal for configs with equal content regardless of key order.
+
+        Returns:
+            hex digest of config.
+        """
+        configs = {k: v for k, v in self.__dict__.items() if not k.startswith('_')}
+        text = json.dumps(configs, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+        return hashlib.sha256(text.encode()).hexdigest()
+
     @staticmethod
     def parse_refs(target: AnyDict, path: str, ref='refs.json'):
         """Parse refs to target.
@@ -16,6 +16,10 @@ class DoubleDQN(ConfigBase):
         gamma=0.99,
         buffer_size=1000000,
         batch_size=64,
+        prioritized=False,
+        alpha=0.6,
+        beta=0.4,
+        beta_anneal=0,
         epsilon_max=1.0,
         epsilon_min=0.1,
         epsilon_decay=0.9,
@@ -35,6 +39,11 @@ class DoubleDQN(ConfigBase):
             gamma: Discount factor.
             buffer_size: Maximum size of buffer.
             batch_size: Size of batch.
+            prioritized: Whether to replay transitions by priority, see `buffers.PrioritizedReplayBuffer`.
+                Note: alpha, beta and beta_anneal are only kept and dumped when prioritized.
+            alpha: Exponent of priorities, 0 for uniform sampling.
+            beta: Initial exponent of importance-sampling weights.
+            beta_anneal: Number of sampled batches over which beta grows to 1, 0 to keep it fixed.
             epsilon_max: Maximum value of epsilon.
             epsilon_min: Minimum value of epsilon.
             epsilon_decay: Decay rate of epsilon.
@@ -62,6 +71,12 @@ class DoubleDQN(ConfigBase):
             raise ValueError('buffer_size must be greater than 0')
         if batch_size < 1:
             raise ValueError('batch_size must be greater than 0')
+        if alpha < 0 or alpha > 1:
+            raise ValueError('alpha must be in [0, 1]')
+        if beta < 0 or beta > 1:
+            raise ValueError('beta must be in [0, 1]')
+        if beta_anneal < 0:
+            raise ValueError('beta_anneal must be greater than or equal to 0')
         if epsilon_max < 0 or epsilon_max > 1:
             raise ValueError('epsilon_max must be in [0, 1]')
         if epsilon_min < 0 or epsilon_min > 1:
@@ -86,6 +101,11 @@ class DoubleDQN(ConfigBase):
         self.gamma = gamma
         self.buffer_size = buffer_size
         self.batch_size = batch_size
+        if prioritized:
+            self.prioritized = prioritized
+            self.alpha = alpha
+            self.beta = beta
+            self.beta_anneal = beta_anneal
         self.epsilon_max = epsilon_max
         self.epsilon_min = epsilon_min
         self.epsilon_decay = epsilon_decay
@@ -20,6 +20,10 @@ class MADDPG(ConfigBase):
         tau=0.001,
         buffer_size=1000000,
         batch_size=64,
+        prioritized=False,
+        alpha=0.6,
+        beta=0.4,
+        beta_anneal=0,
         noise_type: Literal['normal', 'ou'] = 'normal',
         noise_sigma: Union[float, Iterable[float]] = 0.2,
         noise_theta: Union[float, Iterable[float]] = 0.15,
@@ -45,6 +49,11 @@ class MADDPG(ConfigBase):
             tau: Soft update factor.
             buffer_size: Maximum size of buffer.
             batch_size: Size of batch.
+            prioritized: Whether to replay transitions by priority, see `buffers.PrioritizedReplayBuffer`.
+                Note: alpha, beta and beta_anneal are only kept and dumped when prioritized.
+            alpha: Exponent of priorities, 0 for uniform sampling.
+            beta: Initial exponent of importance-sampling weights.
+            beta_anneal: Number of sampled batches over which beta grows to 1, 0 to keep it fixed.
             noise_type: Type of noise, `normal` or `ou`.
             noise_sigma: Sigma of noise.
             noise_theta: Theta of noise, `ou` only.
@@ -81,6 +90,12 @@ class MADDPG(ConfigBase):
             raise ValueError('buffer_size must be greater than 0')
         if batch_size < 1:
             raise ValueError('batch_size must be greater than 0')
+        if alpha < 0 or alpha > 1:
+            raise ValueError('alpha must be in [0, 1]')
+        if beta < 0 or beta > 1:
+            raise ValueError('beta must be in [0, 1]')
+        if beta_anneal < 0:
+            raise ValueError('beta_anneal must be greater than or equal to 0')
         if noise_type not in ['normal', 'ou']:
             raise ValueError('noise_type must be `normal` or `ou`')
         if isinstance(noise_sigma, Iterable):
@@ -127,6 +142,11 @@ class MADDPG(ConfigBase):
         self.tau = tau
         self.buffer_size = buffer_size
         self.batch_size = batch_size
+        if prioritized:
+            self.prioritized = prioritized
+            self.alpha = alpha
+            self.beta = beta
+            self.beta_anneal = beta_anneal
         self.noise_type = noise_type
         self.noise_sigma = noise_sigma
         self.noise_theta = noise_theta
@@ -17,8 +17,8 @@ class Service:
         Args:
             type: type of this service, agent or simenv.
             name: name of this service, optional.
-            host: host of this service, ip address or domain name.
-            port: port of this service, in range [0, 65535].
+            host: host of this service, ip address or domain name, or `unix:<path>` for a unix domain socket.
+            port: port of this service, in range [0, 65535], ignored for unix domain sockets.
             desc: description of this service, optional.
         """
         if type not in ['agent', 'simenv']:
@@ -31,3 +31,14 @@ class Service:
         self.host = host
         self.port = port
         self.desc = desc
+
+    @property
+    def address(self) -> str:
+        """Get address to connect this service directly.
+
+        Returns:
+            address in `host:port` form, or `unix:<path>` form for a unix domain socket.
+        """
+        if self.host.startswith(('unix:', 'unix-abstract:')):
+            return self.host
+        return f'{self.host}:{self.port}'
@@ -0,0 +1,311 @@
+import io
+import pathlib
+import pickle
+import zipfile
+from typing import Any, Dict, List, Literal, Tuple
+
+import numpy as np
+
+from .configs import AnyDict, Service, Agent, Simenv
+
+from .protos import agent_pb2, bff_pb2, simenv_pb2
+from .protos import types_pb2
+
+from .buffers import ReplayBuffer
+from . import fastjson
+from . import tensors
+
+CallTuple = Tuple[str, str, bytes]
+Format = Literal['pickle', 'tensor']
+Models = Dict[str, List[AnyDict]]
+
+_EPOCH = (1980, 1, 1, 0, 0, 0)
+
+
+def dumps(obj: Any, format: Format = 'pickle') -> bytes:
+    if isinstance(obj, ReplayBuffer):
+        obj = obj.to_dict()
+    if format == 'pickle':
+        return pickle.dumps(obj)
+    elif format == 'tensor':
+        return tensors.dumps(obj)
+    else:
+        raise ValueError(f'Unknown format {format}, must be pickle or tensor.')
+
+
+def loads(data: bytes) -> Any:
+    if tensors.is_tensors(data):
+        return tensors.loads(data)
+    else:
+        return pickle.loads(data)
+
+
+def encode_ids(ids: List[str]) -> bff_pb2.ServiceIdList:
+    return bff_pb2.ServiceIdList(ids=ids)
+
+
+def encode_service(msg: bff_pb2.ServiceInfo, service: Service):
+    msg.type = service.type
+    msg.name = service.name
+    msg.host = service.host
+    msg.port = service.port
+    msg.desc = service.desc
+
+
+def decode_service(msg: bff_pb2.ServiceInfo) -> Service:
+    return Service(
+        type=msg.type,
+        name=msg.name,
+        host=msg.host,
+        port=msg.port,
+        desc=msg.desc,
+    )
+
+
+def encode_services(services: Dict[str, Service]) -> bff_pb2.ServiceInfoMap:
+    service_info_map = bff_pb2.ServiceInfoMap()
+    for id, service in services.items():
+        encode_service(service_info_map.services[id], service)
+    return service_info_map
+
+
+def decode_services(service_info_map: bff_pb2.ServiceInfoMap) -> Dict[str, Service]:
+    return {id: decode_service(msg) for id, msg in service_info_map.services.items()}
+
+
+def decode_state(msg: types_pb2.ServiceState) -> bool:
+    return msg.state == types_pb2.ServiceState.State.INITED
+
+
+def decode_states(service_state_map: bff_pb2.ServiceStateMap) -> Dict[str, bool]:
+    return {id: decode_state(msg) for id, msg in service_state_map.states.items()}
+
+
+def encode_agent(msg: agent_pb2.AgentConfig, agent: Agent):
+    msg.name = agent.name
+    msg.hypers = fastjson.dumps(agent.hypers)
+    msg.training = agent.training
+    msg.sifunc = agent.sifunc
+    msg.oafunc = agent.oafunc
+    msg.rewfunc = agent.rewfunc
+    for hook in agent.hooks:
+        pointer = msg.hooks.add()
+        pointer.name = hook['name']
+        pointer.args = fastjson.dumps(hook['args'])
+
+
+def decode_agent(msg: agent_pb2.AgentConfig) -> Agent:
+    return Agent(
+        name=msg.name,
+        hypers=fastjson.loads(msg.hypers),
+        training=msg.training,
+        sifunc=msg.sifunc,
+        oafunc=msg.oafunc,
+        rewfunc=msg.rewfunc,
+        hooks=[{
+            'name': hook.name,
+            'args': fastjson.loads(hook.args)
+        } for hook in msg.hooks],
+    )
+
+
+def encode_agents(agents: Dict[str, Agent]) -> bff_pb2.AgentConfigMap:
+    agent_config_map = bff_pb2.AgentConfigMap()
+    for id, agent in agents.items():
+        encode_agent(agent_config_map.configs[id], agent)
+    return agent_config_map
+
+
+def decode_agents(agent_config_map: bff_pb2.AgentConfigMap) -> Dict[str, Agent]:
+    return {id: decode_agent(msg) for id, msg in agent_config_map.configs.items()}
+
+
+def encode_modes(modes: Dict[str, bool]) -> bff_pb2.AgentModeMap:
+    agent_mode_map = bff_pb2.AgentModeMap()
+    for id in modes:
+        agent_mode_map.modes[id].training = modes[id]
+    return agent_mode_map
+
+
+def decode_modes(agent_mode_map: bff_pb2.AgentModeMap) -> Dict[str, bool]:
+    return {id: bool(msg.training) for id, msg in agent_mode_map.modes.items()}
+
+
+def encode_weights(weights: AnyDict, format: Format = 'pickle') -> bff_pb2.ModelWeightsMap:
+    model_weights_map = bff_pb2.ModelWeightsMap()
+    for id in weights:
+        model_weights_map.weights[id].weights = dumps(weights[id], format)
+    return model_weights_map
+
+
+def decode_weights(model_weights_map: bff_pb2.ModelWeightsMap) -> AnyDict:
+    return {id: loads(msg.weights) for id, msg in model_weights_map.weights.items()}
+
+
+def encode_buffers(buffers: AnyDict, format: Format = 'pickle') -> bff_pb2.ModelBufferMap:
+    model_buffer_map = bff_pb2.ModelBufferMap()
+    for id in buffers:
+        model_buffer_map.buffers[id].buffer = dumps(buffers[id], format)
+    return model_buffer_map
+
+
+def decode_buffers(model_buffer_map: bff_pb2.ModelBufferMap) -> AnyDict:
+    return {id: loads(msg.buffer) for id, msg in model_buffer_map.buffers.items()}
+
+
+def encode_status(status: Dict[str, AnyDict]) -> bff_pb2.ModelStatusMap:
+    model_status_map = bff_pb2.ModelStatusMap()
+    for id in status:
+        model_status_map.status[id].status = fastjson.dumps(status[id])
+    return model_status_map
+
+
+def decode_status(model_status_map: bff_pb2.ModelStatusMap) -> Dict[str, AnyDict]:
+    return {id: fastjson.loads(msg.status) for id, msg in model_status_map.status.items()}
+
+
+def encode_simenv(msg: simenv_pb2.SimenvConfig, simenv: Simenv):
+    msg.name = simenv.name
+    msg.args = fastjson.dumps(simenv.args)
+
+
+def decode_simenv(msg: simenv_pb2.SimenvConfig) -> Simenv:
+    return Simenv(
+        name=msg.name,
+        args=fastjson.loads(msg.args),
+    )
+
+
+def encode_simenvs(simenvs: Dict[str, Simenv]) -> bff_pb2.SimenvConfigMap:
+    simenv_config_map = bff_pb2.SimenvConfigMap()
+    for id, simenv in simenvs.items():
+        encode_simenv(simenv_config_map.configs[id], simenv)
+    return simenv_config_map
+
+
+def decode_simenvs(simenv_config_map: bff_pb2.SimenvConfigMap) -> Dict[str, Simenv]:
+    return {id: decode_simenv(msg) for id, msg in simenv_config_map.configs.items()}
+
+
+def encode_cmds(cmds: Dict[str, str]) -> bff_pb2.SimCmdMap:
+    sim_cmd_map = bff_pb2.SimCmdMap()
+    for id in cmds:
+        sim_cmd_map.cmds[id].type = cmds[id]
+    return sim_cmd_map
+
+
+def decode_info(msg: simenv_pb2.SimInfo, lazy=False) -> AnyDict:
+    parse = fastjson.lazy if lazy else fastjson.loads
+    return {
+        'state': msg.state,
+        'data': parse(msg.data),
+        'logs': parse(msg.logs),
+    }
+
+
+def decode_infos(sim_info_map: bff_pb2.SimInfoMap, lazy=False) -> Dict[str, AnyDict]:
+    return {id: decode_info(msg, lazy) for id, msg in sim_info_map.infos.items()}
+
+
+def encode_calls(data: Dict[str, CallTuple]) -> bff_pb2.CallDataMap:
+    call_data_map = bff_pb2.CallDataMap()
+    for id in data:
+        call_data_map.data[id].name = data[id][0]
+        call_data_map.data[id].dstr = data[id][1]
+        call_data_map.data[id].dbin = data[id][2]
+    return call_data_map
+
+
+def decode_calls(call_data_map: bff_pb2.CallDataMap) -> Dict[str, CallTuple]:
+    return {id: (msg.name, msg.dstr, msg.dbin) for id, msg in call_data_map.data.items()}
+
+
+def encode_param(msg: types_pb2.SimParam, value: Any):
+    if isinstance(value, (bool, np.bool_)):
+        msg.vbool = bool(value)
+    elif isinstance(value, (int, np.integer)):
+        msg.vint32 = int(value)
+    elif isinstance(value, (float, np.floating)):
+        msg.vdouble = float(value)
+    elif isinstance(value, str):
+        msg.vstring = value
+    elif isinstance(value, dict):
+        msg.vstruct.SetInParent()
+        for k, v in value.items():
+            encode_param(msg.vstruct.fields[k], v)
+    elif isinstance(value, (list, tuple, np.ndarray)):
+        msg.varray.SetInParent()
+        for v in value:
+            encode_param(msg.varray.items.add(), v)
+    else:
+        raise TypeError(f'Value of type {type(value).__name__} can not be encoded as SimParam.')
+
+
+def decode_param(msg: types_pb2.SimParam) -> Any:
+    kind = msg.WhichOneof('value')
+    if kind == 'varray':
+        return [decode_param(item) for item in msg.varray.items]
+    elif kind == 'vstruct':
+        return {k: decode_param(v) for k, v in msg.vstruct.fields.items()}
+    elif kind is None:
+        return None
+    else:
+        return getattr(msg, kind)
+
+
+def encode_models(models_map: Any, models: Models):
+    for name, entities in models.items():
+        model = models_map[name]
+        for entity in entities:
+            params = model.entities.add().params
+            for k, v in entity.items():
+                encode_param(params[k], v)
+
+
+def decode_models(models_map: Any) -> Models:
+    return {
+        name: [{k: decode_param(v) for k, v in entity.params.items()} for entity in model.entities]
+        for name, model in models_map.items()
+    }
+
+
+def encode_sim_state(states: Models, terminated=False, truncated=False, reward=0.0) -> types_pb2.SimState:
+    sim_state = types_pb2.SimState(terminated=terminated, truncated=truncated, reward=reward)
+    encode_models(sim_state.states, states)
+    return sim_state
+
+
+def decode_sim_state(sim_state: types_pb2.SimState) -> Tuple[Models, bool, bool, float]:
+    return decode_models(sim_state.states), sim_state.terminated, sim_state.truncated, sim_state.reward
+
+
+def encode_sim_action(actions: Models) -> types_pb2.SimAction:
+    sim_action = types_pb2.SimAction()
+    encode_models(sim_action.actions, actions)
+    return sim_action
+
+
+def decode_sim_action(sim_action: types_pb2.SimAction) -> Models:
+    return decode_models(sim_action.actions)
+
+
+def pack_custom(path: str) -> bytes:
+    tgt = pathlib.Path(path)
+    if tgt.is_dir():
+        files = [tgt] + sorted(p for p in tgt.rglob('*') if '__pycache__' not in p.relative_to(tgt).parts)
+    else:
+        files = [tgt]
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, 'w', compression=zipfile.ZIP_DEFLATED) as zf:
+        for file in files:
+            name = file.relative_to(tgt.parent).as_posix()
+            if file.is_dir():
+                info = zipfile.ZipInfo(f'{name}/', date_time=_EPOCH)
+                info.external_attr = (0o40755 << 16) | 0x10
+                zf.writestr(info, b'')
+            else:
+                info = zipfile.ZipInfo(name, date_time=_EPOCH)
+                info.external_attr = 0o100644 << 16
+                info.compress_type = zipfile.ZIP_DEFLATED
+                zf.writestr(info, file.read_bytes())
+    return buf.getvalue()
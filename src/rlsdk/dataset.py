@@ -0,0 +1,278 @@
+"""Offline datasets of experience, written as append-only shards of columns with a json index.
+
+A dataset is a directory holding `dataset.json` and numbered shards:
+
+    dataset.json            columns with dtype and shape of one row, sources, and rows of every shard
+    shard-00000.npz         one uncompressed `.npy` per column, read back with `np.load`
+    shard-00001.arrow       or one Arrow IPC file per shard, when written with format `arrow` and pyarrow installed
+
+Every shard holds up to `shard_rows` transitions of the columns of `buffers.COLUMNS` or whatever columns the buffers
+hold, plus an `agent` column with the index of the source agent in `sources` of the manifest. Rows of many agents are
+merged into the same shards unless `merge` is off, in which case every shard holds rows of one agent only. Writing
+more to an existing dataset appends new shards, and the manifest is replaced atomically after every shard, so a
+dataset is always readable up to its last complete shard.
+
+Buffers are accepted in the canonical form of `buffers.ReplayBuffer`, whose rows are exported oldest first, or as
+dicts of arrays of equal length, optionally cut to an int `size` entry.
+"""
+import json
+import os
+from typing import Any, Dict, Iterator, List, Literal, Optional
+
+import numpy as np
+
+from .buffers import is_replay
+from .configs import AnyDict
+
+MANIFEST = 'dataset.json'
+VERSION = 1
+SOURCE = 'agent'
+
+DatasetFormat = Literal['npz', 'arrow']
+
+
+def _arrow() -> Any:
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError('Format arrow requires pyarrow, install it or use format npz.')
+    return pyarrow
+
+
+def segments(buffer: Any) -> List[Dict[str, np.ndarray]]:
+    """Get columns of transitions held by a buffer, without copying them.
+
+    Args:
+        buffer: canonical form of a replay buffer, or dict of arrays with transitions along the first axis.
+
+    Returns:
+        Views of all columns in one or two segments, whose rows are in order of insertion, empty if buffer is None.
+        Note: A full ring buffer is split at its cursor instead of being reordered into a copy.
+
+    Raises:
+        ValueError: When buffer holds no columns or columns of different lengths.
+    """
+    if buffer is None:
+        return []
+    if is_replay(buffer):
+        size, pos, columns = buffer['size'], buffer['pos'], buffer['columns']
+        if size == buffer['capacity'] and pos != 0:
+            return [
+                {name: column[pos:] for name, column in columns.items()},
+                {name: column[:pos] for name, column in columns.items()},
+            ]
+        return [{name: column[:size] for name, column in columns.items()}]
+    if not isinstance(buffer, dict):
+        raise ValueError(f'Buffer of type {type(buffer).__name__} holds no columns.')
+    columns = {str(k): v for k, v in buffer.items() if isinstance(v, np.ndarray) and v.ndim > 0}
+    if len(columns) == 0:
+        raise ValueError('Buffer holds no arrays.')
+    size = buffer.get('size')
+    if isinstance(size, (int, np.integer)):
+        columns = {name: column[:size] for name, column in columns.items()}
+    lengths = {len(column) for column in columns.values()}
+    if len(lengths) != 1:
+        raise ValueError(f'Columns of buffer have different lengths {sorted(lengths)}.')
+    return [columns]
+
+
+def read_manifest(path: str) -> Optional[AnyDict]:
+    """Read manifest of a dataset.
+
+    Args:
+        path: directory of dataset.
+
+    Returns:
+        Manifest, None if there is no dataset in `path`.
+    """
+    file = os.path.join(path, MANIFEST)
+    if not os.path.exists(file):
+        return None
+    with open(file, 'r') as f:
+        return json.load(f)
+
+
+def write_manifest(path: str, manifest: AnyDict):
+    """Replace manifest of a dataset atomically.
+
+    Args:
+        path: directory of dataset.
+        manifest: manifest to write.
+    """
+    file = os.path.join(path, MANIFEST)
+    with open(f'{file}.tmp', 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(f'{file}.tmp', file)
+
+
+def read_shard(path: str, manifest: AnyDict, index: int, columns: Optional[List[str]] = None) -> Dict[str, np.ndarray]:
+    """Read columns of one shard.
+
+    Args:
+        path: directory of dataset.
+        manifest: manifest of dataset.
+        index: index of shard in `shards` of manifest.
+        columns: names of columns to read, None for all.
+
+    Returns:
+        Arrays of columns.
+    """
+    file = os.path.join(path, manifest['shards'][index]['file'])
+    specs = manifest['columns']
+    if file.endswith('.arrow'):
+        pa = _arrow()
+        with pa.memory_map(file, 'r') as source:
+            table = pa.ipc.open_file(source).read_all()
+        result = {}
+        for name in columns or table.column_names:
+            column = table.column(name).combine_chunks()
+            shape = specs[name]['shape'] if name in specs else []
+            if len(shape) > 0:
+                column = column.flatten()
+            arr = column.to_numpy(zero_copy_only=False)
+            result[name] = arr.reshape(len(table), *shape)
+        return result
+    with np.load(file) as npz:
+        return {name: npz[name] for name in columns or npz.files}
+
+
+def iterate(path: str, columns: Optional[List[str]] = None) -> Iterator[Dict[str, np.ndarray]]:
+    """Read a dataset shard by shard.
+
+    Args:
+        path: directory of dataset.
+        columns: names of columns to read, None for all.
+
+    Returns:
+        Iterator of arrays of columns of every shard.
+    """
+    manifest = read_manifest(path)
+    if manifest is None:
+        raise FileNotFoundError(f'No dataset found in {path}.')
+    for index in range(len(manifest['shards'])):
+        yield read_shard(path, manifest, index, columns)
+
+
+class DatasetWriter:
+    """Append-only writer of a sharded dataset, holding at most one shard of rows in memory."""
+
+    def __init__(self, path: str, shard_rows=65536, format: DatasetFormat = 'npz', merge=True):
+        """Open dataset, appending to the one in `path` if there is any.
+
+        Args:
+            path: directory of dataset.
+            shard_rows: maximum number of rows of every shard.
+            format: file format of new shards, `npz` or `arrow`.
+            merge: whether rows of different agents may share a shard.
+        """
+        if shard_rows < 1:
+            raise ValueError('shard_rows must be greater than 0')
+        if format not in ['npz', 'arrow']:
+            raise ValueError(f'Unknown format {format}, must be npz or arrow.')
+        if format == 'arrow':
+            _arrow()
+        self.path = path
+        self.shard_rows = shard_rows
+        self.format = format
+        self.merge = merge
+        os.makedirs(path, exist_ok=True)
+        self.manifest = read_manifest(path) or {
+            'version': VERSION,
+            'columns': {},
+            'sources': [],
+            'rows': 0,
+            'shards': [],
+        }
+        self.pending: List[Dict[str, np.ndarray]] = []
+        self.pending_rows = 0
+        self.pending_sources: Dict[str, int] = {}
+
+    def write(self, id: str, columns: Dict[str, np.ndarray]):
+        """Append rows of one agent, writing every shard as soon as it is full.
+
+        Args:
+            id: id of source agent.
+            columns: arrays of all columns with rows along the first axis.
+        """
+        if len(columns) == 0:
+            return
+        self.__check(columns)
+        sources = self.manifest['sources']
+        if id not in sources:
+            sources.append(id)
+        source = sources.index(id)
+        if not self.merge and len(set(self.pending_sources) - {id}) > 0:
+            self.flush()
+        n = len(next(iter(columns.values())))
+        offset = 0
+        while offset < n:
+            take = min(self.shard_rows - self.pending_rows, n - offset)
+            part = {name: column[offset:offset + take] for name, column in columns.items()}
+            part[SOURCE] = np.full(take, source, dtype=np.int32)
+            self.pending.append(part)
+            self.pending_rows += take
+            self.pending_sources[id] = self.pending_sources.get(id, 0) + take
+            offset += take
+            if self.pending_rows == self.shard_rows:
+                self.flush()
+        self.pending = [{name: np.array(column) for name, column in part.items()} for part in self.pending]
+
+    def flush(self):
+        """Write pending rows as a new shard, even if it is not full."""
+        if self.pending_rows == 0:
+            return
+        names = list(self.pending[0])
+        data = {name: np.concatenate([part[name] for part in self.pending]) for name in names}
+        index = len(self.manifest['shards'])
+        file = f'shard-{index:05d}.{self.format}'
+        tmp = os.path.join(self.path, f'{file}.tmp')
+        if self.format == 'arrow':
+            self.__write_arrow(tmp, data)
+        else:
+            with open(tmp, 'wb') as f:
+                np.savez(f, **data)
+        os.replace(tmp, os.path.join(self.path, file))
+        self.manifest['shards'].append({'file': file, 'rows': self.pending_rows, 'sources': self.pending_sources})
+        self.manifest['rows'] += self.pending_rows
+        write_manifest(self.path, self.manifest)
+        self.pending, self.pending_rows, self.pending_sources = [], 0, {}
+
+    def close(self) -> AnyDict:
+        """Write pending rows and return final manifest."""
+        self.flush()
+        return self.manifest
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __check(self, columns: Dict[str, np.ndarray]):
+        specs = {
+            name: {'dtype': np.lib.format.dtype_to_descr(column.dtype), 'shape': list(column.shape[1:])}
+            for name, column in columns.items()
+        }
+        if SOURCE in specs:
+            raise ValueError(f'Column name {SOURCE} is reserved.')
+        lengths = {len(column) for column in columns.values()}
+        if len(lengths) != 1:
+            raise ValueError(f'Columns have different lengths {sorted(lengths)}.')
+        if not self.manifest['columns']:
+            self.manifest['columns'] = specs
+        elif self.manifest['columns'] != specs:
+            raise ValueError(f'Columns {specs} do not match columns of dataset {self.manifest["columns"]}.')
+
+    def __write_arrow(self, file: str, data: Dict[str, np.ndarray]):
+        pa = _arrow()
+        arrays = []
+        for column in data.values():
+            if column.ndim > 1:
+                values = pa.array(column.reshape(-1))
+                arrays.append(pa.FixedSizeListArray.from_arrays(values, int(np.prod(column.shape[1:]))))
+            else:
+                arrays.append(pa.array(column))
+        batch = pa.RecordBatch.from_arrays(arrays, names=list(data))
+        with pa.OSFile(file, 'wb') as sink:
+            with pa.ipc.new_file(sink, batch.schema) as writer:
+                writer.write_batch(batch)
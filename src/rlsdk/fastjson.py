@@ -0,0 +1,166 @@
+"""Json codec of status, monitor and config payloads with a pluggable decoding backend.
+
+The fastest installed backend of `orjson`, `ujson` and the standard library is selected at import, `use()` selects
+another one. Backends only decode, where payloads of megabytes are common, while encoding always goes through the
+standard library, which also encodes numpy arrays and scalars. `lazy()` defers parsing of large payloads until they
+are accessed.
+
+Services built on the standard library emit `NaN` and `Infinity`, which are not valid json, e.g. for a diverged loss.
+Fast backends reject them, so decoding falls back to the standard library whenever the selected backend raises, and
+encoding keeps them as the standard library does instead of turning them into `null` like `orjson`.
+"""
+import json
+from typing import Any, Callable, Iterator, Literal, Optional, Union
+
+import numpy as np
+
+Backend = Literal['orjson', 'ujson', 'json']
+
+_loads: Callable[[Union[str, bytes]], Any] = json.loads
+backend: Optional[Backend] = None
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    elif isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+
+
+def use(name: Optional[Backend] = None) -> Backend:
+    """Select json backend used for decoding.
+
+    Args:
+        name: `orjson`, `ujson` or `json`, None for the fastest installed one.
+
+    Returns:
+        Name of selected backend.
+
+    Raises:
+        ImportError: When requested backend is not installed.
+    """
+    global _loads, backend
+    for candidate in ['orjson', 'ujson', 'json'] if name is None else [name]:
+        if candidate == 'orjson':
+            try:
+                import orjson
+            except ImportError:
+                if name is None:
+                    continue
+                raise
+            _loads = orjson.loads
+        elif candidate == 'ujson':
+            try:
+                import ujson
+            except ImportError:
+                if name is None:
+                    continue
+                raise
+            _loads = ujson.loads
+        elif candidate == 'json':
+            _loads = json.loads
+        else:
+            raise ValueError(f'Unknown json backend {candidate}, must be orjson, ujson or json.')
+        backend = candidate
+        return candidate
+
+
+def dumps(obj: Any) -> str:
+    """Encode object into json string, numpy arrays and scalars are encoded as lists and numbers.
+
+    Args:
+        obj: object to encode.
+
+    Returns:
+        Json string.
+    """
+    return json.dumps(obj, default=_default)
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """Decode json string.
+
+    Args:
+        data: json string.
+
+    Returns:
+        Decoded object.
+    """
+    if backend == 'json':
+        return _loads(data)
+    try:
+        return _loads(data)
+    except ValueError:
+        return json.loads(data)
+
+
+class LazyJSON:
+    """Proxy of a json payload parsed on first access.
+
+    Item access, iteration, `len`, `in` and equality are forwarded to the parsed value, which is also available as
+    `value`.
+    """
+
+    __slots__ = ('raw', '_value', '_parsed')
+
+    def __init__(self, raw: Union[str, bytes]):
+        """Init proxy.
+
+        Args:
+            raw: json string.
+        """
+        self.raw = raw
+        self._value = None
+        self._parsed = False
+
+    @property
+    def value(self) -> Any:
+        if not self._parsed:
+            self._value = loads(self.raw)
+            self._parsed = True
+        return self._value
+
+    @property
+    def parsed(self) -> bool:
+        return self._parsed
+
+    def __getitem__(self, key: Any) -> Any:
+        return self.value[key]
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self.value)
+
+    def __len__(self) -> int:
+        return len(self.value)
+
+    def __contains__(self, item: Any) -> bool:
+        return item in self.value
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, LazyJSON):
+            return self.raw == other.raw or self.value == other.value
+        return self.value == other
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self.value, name)
+
+    def __repr__(self) -> str:
+        return repr(self.value) if self._parsed else f'LazyJSON({len(self.raw)} bytes)'
+
+
+def lazy(raw: Union[str, bytes]) -> LazyJSON:
+    """Wrap a json string into a proxy parsed on first access.
+
+    Args:
+        raw: json string.
+
+    Returns:
+        Lazy proxy.
+    """
+    return LazyJSON(raw)
+
+
+use()
@@ -0,0 +1,199 @@
+"""Orchestration of one experiment sharded across many BFF clusters.
+
+A `TaskGroup` holds one `Task` per BFF address, each owning a disjoint shard of services. Every operation is issued
+to all shards concurrently and per-service results are merged back into one dict keyed by service id:
+
+    group = TaskGroup.shard(['bff0:10000', 'bff1:10000'], services, agents, simenvs)
+    with group:
+        group.push(reset=True)
+        group.start()
+        infos = group.monitor()
+"""
+from concurrent.futures import as_completed, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from .client import BatchError
+from .configs import AnyDict, Service, Agent, Simenv
+from .sync import Mode
+from .task import Task
+
+
+class TaskGroup:
+    """Tasks on many BFF addresses driven as one."""
+
+    @classmethod
+    def shard(
+        cls,
+        addresses: List[str],
+        services: Dict[str, Service],
+        agents: Dict[str, Agent] = {},
+        simenvs: Dict[str, Simenv] = {},
+        placement: Optional[Dict[str, str]] = None,
+    ):
+        """Split services and their configs into one task per address.
+
+        Args:
+            addresses: addresses of BFF services.
+            services: all services.
+            agents: configs of all agents.
+            simenvs: configs of all simenvs.
+            placement: address of each service id, defaults to assigning services round-robin in order.
+                Note: Addresses without any service get no task.
+        """
+        if len(addresses) == 0:
+            raise ValueError('At least one address is required.')
+        if placement is None:
+            placement = {id: addresses[i % len(addresses)] for i, id in enumerate(services)}
+        for id in services:
+            if placement.get(id) not in addresses:
+                raise ValueError(f'Service {id} not placed on any of the addresses.')
+        tasks = {}
+        for address in addresses:
+            ids = [id for id in services if placement[id] == address]
+            if len(ids) == 0:
+                continue
+            tasks[address] = Task(
+                {id: services[id] for id in ids},
+                {id: agents[id] for id in ids if id in agents},
+                {id: simenvs[id] for id in ids if id in simenvs},
+            )
+        return cls(tasks)
+
+    def __init__(self, tasks: Dict[str, Task]):
+        """Init group.
+
+        Args:
+            tasks: tasks keyed by address of their BFF service, services of tasks must not overlap.
+        """
+        self.tasks = tasks
+        self.owners: Dict[str, str] = {}
+        self.__index()
+
+    def push(self, reset=False, direct=False, fanout=0, only_changed=False) -> Dict[str, List[str]]:
+        """Push every task to its address, see `Task.push`.
+
+        Returns:
+            Ids of reconfigured services keyed by address.
+        """
+        return self.__each(lambda address, task: task.push(address, reset, direct, fanout, only_changed))
+
+    def pull(self, reset=False, direct=False, fanout=0):
+        """Pull every task from its address, see `Task.pull`."""
+        self.__each(lambda address, task: task.pull(address, reset, direct, fanout))
+        self.__index()
+
+    def close(self):
+        for task in self.tasks.values():
+            task.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def inited(self) -> bool:
+        return len(self.tasks) > 0 and all(task.inited for task in self.tasks.values())
+
+    def details(self) -> Dict[str, AnyDict]:
+        return self.__merge(self.__each(lambda _, task: task.details()))
+
+    def switch_training(self) -> Dict[str, bool]:
+        return self.__each(lambda _, task: task.switch_training())
+
+    def init(self):
+        self.__each(lambda _, task: task.init())
+
+    def start(self):
+        self.__each(lambda _, task: task.start())
+
+    def pause(self):
+        self.__each(lambda _, task: task.pause())
+
+    def resume(self):
+        self.__each(lambda _, task: task.resume())
+
+    def stop(self):
+        self.__each(lambda _, task: task.stop())
+
+    def monitor(self, lazy=False) -> Dict[str, AnyDict]:
+        return self.__merge(self.__each(lambda _, task: task.monitor(lazy)))
+
+    def get_weights(self, ids: List[str] = []) -> Dict[str, Any]:
+        """Gather weights of agents from all shards.
+
+        Args:
+            ids: agent ids, defaults to all agents.
+
+        Returns:
+            Weights keyed by agent id.
+        """
+        shards = self.__shard(ids or [id for task in self.tasks.values() for id in task.agents])
+        return self.__merge(self.__each(lambda _, task: task.client.get_model_weights(shards[task]), shards))
+
+    def set_weights(self, weights: Dict[str, Any]):
+        """Scatter weights of agents to their shards.
+
+        Args:
+            weights: weights keyed by agent id.
+        """
+        shards = self.__shard(list(weights.keys()))
+        self.__each(lambda _, task: task.client.set_model_weights({id: weights[id] for id in shards[task]}), shards)
+
+    def sync_weights(self, src: str, dsts: List[str] = [], mode: Mode = 'replace') -> Dict[str, int]:
+        """Copy weights of one agent to other agents of any shard, see `Task.sync_weights`.
+
+        Args:
+            src: source agent id.
+            dsts: destination agent ids, defaults to all other agents.
+            mode: `replace`, `xor` or `sub` patching of changed arrays.
+
+        Returns:
+            Bytes sent keyed by destination agent id.
+        """
+        weights = self.get_weights([src])[src]
+        dsts = dsts or [id for task in self.tasks.values() for id in task.agents if id != src]
+        shards = self.__shard(dsts)
+        return self.__merge(self.__each(
+            lambda _, task: task.client.sync_model_weights({id: weights for id in shards[task]}, task.weight_sync, mode),
+            shards,
+        ))
+
+    def __index(self):
+        self.owners = {}
+        for address, task in self.tasks.items():
+            for id in task.services:
+                if id in self.owners:
+                    raise ValueError(f'Service {id} is in both {self.owners[id]} and {address}.')
+                self.owners[id] = address
+
+    def __shard(self, ids: List[str]) -> Dict[Task, List[str]]:
+        shards: Dict[Task, List[str]] = {}
+        for id in ids:
+            if id not in self.owners:
+                raise ValueError(f'Service {id} not in any task of group.')
+            shards.setdefault(self.tasks[self.owners[id]], []).append(id)
+        for task in shards:
+            if not task.inited:
+                raise RuntimeError('Task not inited, call push() or pull() first.')
+        return shards
+
+    def __each(self, fn: Callable[[str, Task], Any], only: Optional[Dict[Task, Any]] = None) -> Dict[str, Any]:
+        tasks = {address: task for address, task in self.tasks.items() if only is None or task in only}
+        if len(tasks) <= 1:
+            return {address: fn(address, task) for address, task in tasks.items()}
+        with ThreadPoolExecutor(max_workers=len(tasks)) as executor:
+            futures = {executor.submit(fn, address, task): address for address, task in tasks.items()}
+            results, errors = {}, {}
+            for future in as_completed(futures):
+                try:
+                    results[futures[future]] = future.result()
+                except Exception as e:
+                    errors[futures[future]] = e
+        if len(errors) > 0:
+            raise BatchError(results, errors)
+        return {address: results[address] for address in tasks}
+
+    def __merge(self, results: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        return {id: value for shard in results.values() for id, value in shard.items()}
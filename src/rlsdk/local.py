@@ -0,0 +1,278 @@
+"""In-process runner of a custom model and engine, for trying and profiling user code without deploying services.
+
+`LocalTask` loads custom model and engine packages in the same zip layout `Client.upload_custom` sends, then runs
+the interaction loop of an agent in a tight loop:
+
+    states -> sifunc -> react -> oafunc -> engine step -> sifunc -> rewfunc -> store -> train
+
+Custom packages import their base classes relatively, as `from .base import RLModelBase` or `from ..base import
+SimEngineBase`, so each one is extracted into a private parent package holding a copy of the given base module.
+
+Engines are stepped through `SimEngineBase.control` and read through `SimEngineBase.monitor`:
+
+    control(CommandType.EPISODE, {})                  starts a new episode
+    control(CommandType.STEP, {'actions': actions})   advances one step with actions of model
+    monitor() -> ({'states': ..., 'reward': ..., 'terminated': ..., 'truncated': ...}, logs)
+
+`reward`, `terminated` and `truncated` are optional and default to 0.0, False and False.
+"""
+import importlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+from types import ModuleType
+from typing import Any, Callable, List, Optional, Union
+import uuid
+import zipfile
+
+from .configs import AnyDict, Agent, Simenv
+from . import convert
+from .metrics import Histogram, LATENCY_BUCKETS
+
+STAGES = ('sifunc', 'react', 'oafunc', 'engine', 'rewfunc', 'store', 'train')
+STAGE_BUCKETS = (1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4) + LATENCY_BUCKETS
+
+
+def load_func(code: str) -> Optional[Callable[..., Any]]:
+    """Compile a sifunc, oafunc or rewfunc the way agent services do.
+
+    Args:
+        code: python code defining `func`, which may keep state in global `caches`.
+
+    Returns:
+        Compiled function, None if code is empty.
+    """
+    if not code.strip():
+        return None
+    scope = {'caches': {}}
+    exec(compile(code, '<func>', 'exec'), scope)
+    if 'func' not in scope:
+        raise ValueError('Function code must define `func`.')
+    return scope['func']
+
+
+class CustomPackage:
+    """Custom package extracted into a private parent package and imported."""
+
+    def __init__(self, custom: Union[str, bytes], base: Optional[str] = None):
+        """Extract and import package.
+
+        Args:
+            custom: path of custom module or package, or zip file made by `convert.pack_custom`.
+            base: path of base module imported relatively by custom package, e.g. the `base.py` of the service.
+        """
+        file = custom if isinstance(custom, bytes) else convert.pack_custom(custom)
+        self.dir = tempfile.mkdtemp(prefix='rlsdk-local-')
+        self.parent = f'rlsdk_local_{uuid.uuid4().hex}'
+        root = os.path.join(self.dir, self.parent)
+        os.makedirs(root)
+        with open(os.path.join(root, '__init__.py'), 'w'):
+            pass
+        if base is not None:
+            shutil.copyfile(base, os.path.join(root, 'base.py'))
+        with zipfile.ZipFile(io.BytesIO(file)) as zf:
+            names = zf.namelist()
+            zf.extractall(root)
+        tops = {name.split('/', 1)[0] for name in names}
+        if len(tops) != 1:
+            raise ValueError(f'Custom package must hold exactly one module or package, got {", ".join(sorted(tops))}.')
+        top = tops.pop()
+        self.name = top[:-3] if top.endswith('.py') else top
+        sys.path.insert(0, self.dir)
+        try:
+            self.module: ModuleType = importlib.import_module(f'{self.parent}.{self.name}')
+            self.base: Optional[ModuleType] = importlib.import_module(f'{self.parent}.base') if base else None
+        except Exception:
+            self.close()
+            raise
+
+    def close(self):
+        """Unload package and remove extracted files."""
+        if self.dir in sys.path:
+            sys.path.remove(self.dir)
+        for name in [name for name in sys.modules if name == self.parent or name.startswith(f'{self.parent}.')]:
+            del sys.modules[name]
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+
+class LocalTask:
+    """One custom model interacting with one custom engine in process."""
+
+    def __init__(
+        self,
+        agent: Agent,
+        simenv: Simenv,
+        model: Union[str, bytes],
+        engine: Union[str, bytes],
+        model_base: Optional[str] = None,
+        engine_base: Optional[str] = None,
+        train_every=1,
+    ):
+        """Load packages and create model and engine.
+
+        Args:
+            agent: agent config, `name` is the model class in custom package and `hypers` its keyword arguments.
+            simenv: simenv config, `name` is the engine class in custom package and `args` its keyword arguments.
+            model: custom model package, see `CustomPackage`.
+            engine: custom engine package, see `CustomPackage`.
+            model_base: path of base module of models.
+            engine_base: path of base module of engines, which also defines `CommandType`.
+            train_every: steps between `train` calls when agent is training.
+        """
+        self.agent = agent
+        self.simenv = simenv
+        self.train_every = train_every
+        self.packages: List[CustomPackage] = []
+
+        model_package = self.__load(model, model_base)
+        engine_package = self.__load(engine, engine_base)
+        self.model = getattr(model_package.module, agent.name)(agent.training, **agent.hypers)
+        self.engine = getattr(engine_package.module, simenv.name)(**simenv.args)
+        self.CommandType = getattr(engine_package.base or engine_package.module, 'CommandType')
+
+        self.sifunc = load_func(agent.sifunc)
+        self.oafunc = load_func(agent.oafunc)
+        self.rewfunc = load_func(agent.rewfunc)
+
+        self.timings = {stage: Histogram(STAGE_BUCKETS) for stage in STAGES}
+        self.steps = 0
+        self.episodes = 0
+        self.seconds = 0.0
+        self.rewards: List[float] = []
+        self.states: Any = None
+        self.inputs: Any = None
+
+    def close(self):
+        self.model = None
+        self.engine = None
+        for package in self.packages:
+            package.close()
+        self.packages = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def reset(self) -> Any:
+        """Start a new episode.
+
+        Returns:
+            Initial states of episode.
+        """
+        self.engine.control(self.CommandType.EPISODE, {})
+        self.states = self.__observe()['states']
+        self.inputs = self.__timed('sifunc', self.sifunc, self.states)
+        self.episodes += 1
+        self.rewards.append(0.0)
+        return self.states
+
+    def step(self) -> AnyDict:
+        """Run one step of interaction, starting a new episode first if none is running.
+
+        Returns:
+            Transition of the step, with `states`, `actions`, `next_states`, `reward`, `terminated` and `truncated`.
+        """
+        if self.states is None:
+            self.reset()
+        start = time.perf_counter()
+        states, inputs = self.states, self.inputs
+        outputs = self.__timed('react', self.model.react, inputs)
+        actions = self.__timed('oafunc', self.oafunc, outputs)
+        data = self.__timed('engine', self.__advance, actions)
+        next_states = data['states']
+        terminated, truncated = bool(data.get('terminated', False)), bool(data.get('truncated', False))
+        next_inputs = self.__timed('sifunc', self.sifunc, next_states)
+        reward = data.get('reward', 0.0)
+        if self.rewfunc is not None:
+            args = (states, inputs, actions, outputs, next_states, next_inputs, terminated, truncated, reward)
+            reward = self.__timed('rewfunc', self.rewfunc, *args)
+        if self.model.training:
+            self.__timed('store', self.model.store, inputs, outputs, next_inputs, reward, terminated, truncated)
+            if (self.steps + 1) % self.train_every == 0:
+                self.__timed('train', self.model.train)
+        self.steps += 1
+        self.rewards[-1] += float(reward) if not isinstance(reward, dict) else float(sum(reward.values()))
+        self.states = None if terminated or truncated else next_states
+        self.inputs = next_inputs
+        self.seconds += time.perf_counter() - start
+        return {
+            'states': states,
+            'actions': actions,
+            'next_states': next_states,
+            'reward': reward,
+            'terminated': terminated,
+            'truncated': truncated,
+        }
+
+    def run(self, steps: Optional[int] = None, episodes: Optional[int] = None) -> AnyDict:
+        """Run steps until either limit is reached.
+
+        Args:
+            steps: number of steps to run.
+            episodes: number of episodes to finish.
+
+        Returns:
+            Report of all steps so far, see `report`.
+        """
+        if steps is None and episodes is None:
+            raise ValueError('Either steps or episodes must be given.')
+        done_steps, done_episodes = 0, 0
+        while (steps is None or done_steps < steps) and (episodes is None or done_episodes < episodes):
+            transition = self.step()
+            done_steps += 1
+            if transition['terminated'] or transition['truncated']:
+                done_episodes += 1
+        return self.report()
+
+    def report(self) -> AnyDict:
+        """Throughput and per-stage timing of all steps so far.
+
+        Returns:
+            Counts of steps and episodes, steps per second, episode rewards, and stats of each stage in seconds.
+        """
+        stages = {}
+        for stage, hist in self.timings.items():
+            if hist.count > 0:
+                stages[stage] = {
+                    'count': hist.count,
+                    'total': hist.sum,
+                    'mean': hist.sum / hist.count,
+                    'p50': hist.quantile(0.5),
+                    'p95': hist.quantile(0.95),
+                }
+        return {
+            'steps': self.steps,
+            'episodes': self.episodes,
+            'seconds': self.seconds,
+            'steps_per_sec': self.steps / self.seconds if self.seconds > 0 else 0.0,
+            'rewards': list(self.rewards),
+            'stages': stages,
+        }
+
+    def __load(self, custom: Union[str, bytes], base: Optional[str]) -> CustomPackage:
+        package = CustomPackage(custom, base)
+        self.packages.append(package)
+        return package
+
+    def __advance(self, actions: Any) -> AnyDict:
+        self.engine.control(self.CommandType.STEP, {'actions': actions})
+        return self.__observe()
+
+    def __observe(self) -> AnyDict:
+        data, _ = self.engine.monitor()
+        if not isinstance(data, dict) or 'states' not in data:
+            raise RuntimeError('Engine must report `states` in data of monitor to run locally.')
+        return data
+
+    def __timed(self, stage: str, fn: Optional[Callable[..., Any]], *args) -> Any:
+        if fn is None:
+            return args[0]
+        start = time.perf_counter()
+        result = fn(*args)
+        self.timings[stage].observe(time.perf_counter() - start)
+        return result
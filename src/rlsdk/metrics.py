@@ -0,0 +1,279 @@
+"""Client side instrumentation of RPCs and payload serialization.
+
+`MetricsInterceptor` records latency, message sizes and status codes of every unary RPC sent through an intercepted
+channel, while serialization and deserialization steps are timed by the client. All figures are kept in a thread-safe
+`Metrics` registry, which can be read as a dict or exported in Prometheus text format or as json lines.
+"""
+import bisect
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import grpc
+
+from .configs import AnyDict
+from . import fastjson
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class Histogram:
+    """Cumulative histogram with fixed upper bounds."""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        """Init histogram.
+
+        Args:
+            buckets: sorted upper bounds, an implicit `+Inf` bucket is appended.
+        """
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile by linear interpolation inside its bucket.
+
+        Args:
+            q: quantile in [0, 1].
+
+        Returns:
+            Estimated value, nan if empty.
+        """
+        if self.count == 0:
+            return float('nan')
+        rank, seen = q * self.count, 0
+        for i, n in enumerate(self.counts):
+            if n > 0 and seen + n >= rank:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+                return lower + (upper - lower) * (rank - seen) / n
+            seen += n
+        return self.buckets[-1]
+
+    def to_dict(self) -> AnyDict:
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'buckets': dict(zip([*map(str, self.buckets), '+Inf'], self.counts)),
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+            'p99': self.quantile(0.99),
+        }
+
+
+class _RPCStats:
+
+    def __init__(self):
+        self.latency = Histogram()
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.errors: Dict[str, int] = {}
+
+
+class _SerdeStats:
+
+    def __init__(self):
+        self.seconds = Histogram()
+        self.bytes = 0
+
+
+class Metrics:
+    """Registry of RPC and serialization metrics."""
+
+    def __init__(self):
+        """Init empty registry."""
+        self.rpcs: Dict[Tuple[str, str], _RPCStats] = {}
+        self.serdes: Dict[Tuple[str, str], _SerdeStats] = {}
+        self.lock = threading.Lock()
+
+    def observe_rpc(
+        self,
+        service: str,
+        method: str,
+        seconds: float,
+        request_bytes: int,
+        response_bytes: int,
+        code: Optional[str] = None,
+    ):
+        """Record a finished RPC.
+
+        Args:
+            service: service name, e.g. `BFF`.
+            method: method name.
+            seconds: latency.
+            request_bytes: serialized size of request.
+            response_bytes: serialized size of response, 0 on error.
+            code: status code name on error, None on success.
+        """
+        with self.lock:
+            stats = self.rpcs.setdefault((service, method), _RPCStats())
+            stats.latency.observe(seconds)
+            stats.request_bytes += request_bytes
+            stats.response_bytes += response_bytes
+            if code is not None:
+                stats.errors[code] = stats.errors.get(code, 0) + 1
+
+    def observe_serde(self, op: str, kind: str, seconds: float, nbytes=0):
+        """Record a serialization step.
+
+        Args:
+            op: `dumps` or `loads`.
+            kind: payload kind, e.g. `weights` or `status`.
+            seconds: time spent.
+            nbytes: size of serialized payload if known.
+        """
+        with self.lock:
+            stats = self.serdes.setdefault((op, kind), _SerdeStats())
+            stats.seconds.observe(seconds)
+            stats.bytes += nbytes
+
+    def timed(self, op: str, kind: str, fn: Callable[..., Any], *args) -> Any:
+        """Run a serialization step and record its duration.
+
+        Args:
+            op: `dumps` or `loads`.
+            kind: payload kind.
+            fn: function doing the step.
+            args: arguments of function.
+
+        Returns:
+            Result of function.
+        """
+        start = time.perf_counter()
+        result = fn(*args)
+        seconds = time.perf_counter() - start
+        payload = result if op == 'dumps' else args[0] if len(args) > 0 else None
+        if isinstance(payload, (bytes, bytearray, str)):
+            nbytes = len(payload)
+        elif hasattr(payload, 'ByteSize'):
+            nbytes = payload.ByteSize()
+        else:
+            nbytes = 0
+        self.observe_serde(op, kind, seconds, nbytes)
+        return result
+
+    def reset(self):
+        """Drop all recorded figures."""
+        with self.lock:
+            self.rpcs.clear()
+            self.serdes.clear()
+
+    def snapshot(self) -> AnyDict:
+        """Current figures as plain dict.
+
+        Returns:
+            Stats of RPCs keyed by `service/method` and of serialization keyed by `op/kind`.
+        """
+        with self.lock:
+            return {
+                'rpc': {
+                    f'{service}/{method}': {
+                        'latency': stats.latency.to_dict(),
+                        'request_bytes': stats.request_bytes,
+                        'response_bytes': stats.response_bytes,
+                        'errors': dict(stats.errors),
+                    } for (service, method), stats in self.rpcs.items()
+                },
+                'serde': {
+                    f'{op}/{kind}': {
+                        'seconds': stats.seconds.to_dict(),
+                        'bytes': stats.bytes,
+                    } for (op, kind), stats in self.serdes.items()
+                },
+            }
+
+    def to_prometheus(self, prefix='rlsdk') -> str:
+        """Export figures in Prometheus text exposition format.
+
+        Args:
+            prefix: prefix of metric names.
+
+        Returns:
+            Exposition text.
+        """
+        lines: List[str] = []
+        with self.lock:
+            rpcs = [({'service': s, 'method': m}, stats) for (s, m), stats in sorted(self.rpcs.items())]
+            serdes = [({'op': o, 'kind': k}, stats) for (o, k), stats in sorted(self.serdes.items())]
+            _histogram(lines, f'{prefix}_rpc_latency_seconds', 'Latency of RPCs.', [(lb, s.latency) for lb, s in rpcs])
+            _counter(lines, f'{prefix}_rpc_request_bytes_total', 'Serialized bytes of requests.',
+                     [(lb, s.request_bytes) for lb, s in rpcs])
+            _counter(lines, f'{prefix}_rpc_response_bytes_total', 'Serialized bytes of responses.',
+                     [(lb, s.response_bytes) for lb, s in rpcs])
+            _counter(lines, f'{prefix}_rpc_errors_total', 'Failed RPCs by status code.',
+                     [({**lb, 'code': code}, n) for lb, s in rpcs for code, n in sorted(s.errors.items())])
+            _histogram(lines, f'{prefix}_serde_seconds', 'Time of payload serialization steps.',
+                       [(lb, s.seconds) for lb, s in serdes])
+        return '\n'.join(lines) + '\n'
+
+    def write_jsonl(self, path: str):
+        """Append a timestamped snapshot as one json line.
+
+        Args:
+            path: path of jsonl file.
+        """
+        line = fastjson.dumps({'time': time.time(), **self.snapshot()})
+        with open(path, 'a') as f:
+            f.write(line + '\n')
+
+
+def _labels(labels: Dict[str, str]) -> str:
+    return ','.join(f'{k}="{v}"' for k, v in labels.items())
+
+
+def _counter(lines: List[str], name: str, help: str, samples: List[Tuple[Dict[str, str], int]]):
+    lines.append(f'# HELP {name} {help}')
+    lines.append(f'# TYPE {name} counter')
+    for labels, value in samples:
+        lines.append(f'{name}{{{_labels(labels)}}} {value}')
+
+
+def _histogram(lines: List[str], name: str, help: str, samples: List[Tuple[Dict[str, str], Histogram]]):
+    lines.append(f'# HELP {name} {help}')
+    lines.append(f'# TYPE {name} histogram')
+    for labels, hist in samples:
+        cumulative = 0
+        for bound, n in zip([*map(str, hist.buckets), '+Inf'], hist.counts):
+            cumulative += n
+            lines.append(f'{name}_bucket{{{_labels({**labels, "le": bound})}}} {cumulative}')
+        lines.append(f'{name}_sum{{{_labels(labels)}}} {hist.sum}')
+        lines.append(f'{name}_count{{{_labels(labels)}}} {hist.count}')
+
+
+class MetricsInterceptor(grpc.UnaryUnaryClientInterceptor):
+    """Client interceptor recording unary RPCs into a `Metrics` registry."""
+
+    def __init__(self, metrics: Metrics):
+        """Init interceptor.
+
+        Args:
+            metrics: registry to record into.
+        """
+        self.metrics = metrics
+
+    def intercept_unary_unary(self, continuation, client_call_details, request):
+        path = client_call_details.method
+        path = path.decode() if isinstance(path, bytes) else path
+        service, method = path.lstrip('/').rsplit('/', 1)
+        service = service.rsplit('.', 1)[-1]
+        request_bytes = request.ByteSize()
+        start = time.perf_counter()
+        outcome = continuation(client_call_details, request)
+
+        def done(future):
+            seconds = time.perf_counter() - start
+            error = future.exception()
+            if error is None:
+                self.metrics.observe_rpc(service, method, seconds, request_bytes, future.result().ByteSize())
+            else:
+                code = error.code().name if isinstance(error, grpc.Call) else type(error).__name__
+                self.metrics.observe_rpc(service, method, seconds, request_bytes, 0, code)
+
+        outcome.add_done_callback(done)
+        return outcome
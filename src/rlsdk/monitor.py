@@ -0,0 +1,128 @@
+"""Incremental view of `SimMonitor` snapshots.
+
+A `MonitorCursor` remembers the last snapshot of a simenv and turns the next one into an update holding only what
+changed:
+
+    {"state": <state>, "data": {<changed or added entries>}, "removed": [<removed keys>], "logs": [<new lines>]}
+
+Raw json strings are compared before parsing, so an identical snapshot costs a string comparison, and a log array
+that only grew is parsed from its new tail. Helpers are sans-io and shared by `Client` and `AsyncClient` watchers.
+"""
+from typing import Any, Dict, List, Optional
+
+from .configs import AnyDict
+from . import fastjson
+
+from .protos import simenv_pb2
+
+
+class MonitorCursor:
+    """Cursor over successive monitor snapshots of a simenv."""
+
+    def __init__(self):
+        """Init cursor, the first snapshot is reported in full."""
+        self.state: Optional[str] = None
+        self.raw_data: Optional[str] = None
+        self.raw_logs: Optional[str] = None
+        self.data: Any = None
+        self.seen = 0
+        self.last: Any = None
+
+    def feed(self, msg: simenv_pb2.SimInfo) -> Optional[AnyDict]:
+        """Consume a snapshot.
+
+        Args:
+            msg: `SimInfo` message.
+
+        Returns:
+            Update since last snapshot, None if nothing changed.
+        """
+        if msg.state == self.state and msg.data == self.raw_data and msg.logs == self.raw_logs:
+            return None
+        update = {'state': msg.state, 'data': {}, 'removed': [], 'logs': []}
+        if msg.data != self.raw_data:
+            data = fastjson.loads(msg.data)
+            if isinstance(data, dict) and isinstance(self.data, dict):
+                update['data'] = {k: v for k, v in data.items() if k not in self.data or self.data[k] != v}
+                update['removed'] = [k for k in self.data if k not in data]
+            else:
+                update['data'] = data
+            self.data = data
+        if msg.logs != self.raw_logs:
+            update['logs'] = self.__new_logs(msg.logs)
+        self.state, self.raw_data, self.raw_logs = msg.state, msg.data, msg.logs
+        return update
+
+    def __new_logs(self, raw: str) -> List[Any]:
+        old = (self.raw_logs or '').rstrip()
+        if self.seen > 0 and old.endswith(']') and raw.startswith(old[:-1]):
+            tail = raw[len(old) - 1:].lstrip()
+            if tail.startswith(','):
+                lines = fastjson.loads('[' + tail[1:])
+                self.seen += len(lines)
+                self.last = lines[-1] if len(lines) > 0 else self.last
+                return lines
+        logs = fastjson.loads(raw)
+        if not isinstance(logs, list):
+            logs = [logs]
+        start = 0
+        if self.seen > 0:
+            if self.seen <= len(logs) and logs[self.seen - 1] == self.last:
+                start = self.seen
+            else:
+                start = next((i + 1 for i in range(len(logs) - 1, -1, -1) if logs[i] == self.last), 0)
+        self.seen = len(logs)
+        self.last = logs[-1] if len(logs) > 0 else None
+        return logs[start:]
+
+
+class Backoff:
+    """Adaptive polling interval, reset on changes and stretched while idle."""
+
+    def __init__(self, min_interval=0.1, max_interval=5.0, factor=2.0):
+        """Init backoff.
+
+        Args:
+            min_interval: seconds between polls while snapshots keep changing.
+            max_interval: upper bound of seconds between polls while idle.
+            factor: growth of interval after each idle poll.
+        """
+        if min_interval <= 0 or max_interval < min_interval:
+            raise ValueError('Intervals must satisfy 0 < min_interval <= max_interval.')
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.factor = factor
+        self.interval = min_interval
+
+    def next(self, changed: bool) -> float:
+        """Interval before the next poll.
+
+        Args:
+            changed: whether the last poll saw any change.
+
+        Returns:
+            Seconds to wait.
+        """
+        if changed:
+            self.interval = self.min_interval
+        else:
+            self.interval = min(self.interval * self.factor, self.max_interval)
+        return self.interval
+
+
+def updates(cursors: Dict[str, MonitorCursor], msgs: Dict[str, simenv_pb2.SimInfo]) -> Dict[str, AnyDict]:
+    """Feed snapshots of several simenvs to their cursors.
+
+    Args:
+        cursors: cursors by simenv id, created on first sight.
+        msgs: `SimInfo` messages by simenv id.
+
+    Returns:
+        Updates of simenvs that changed.
+    """
+    result = {}
+    for id, msg in msgs.items():
+        update = cursors.setdefault(id, MonitorCursor()).feed(msg)
+        if update is not None:
+            result[id] = update
+    return result
@@ -0,0 +1,119 @@
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import grpc
+
+ChannelOptions = Tuple[Tuple[str, int], ...]
+ChannelKey = Tuple[str, ChannelOptions]
+
+
+class _Entry:
+
+    def __init__(self, channel: grpc.Channel):
+        self.channel = channel
+        self.refs = 0
+        self.last_used = time.monotonic()
+
+
+class ChannelPool:
+    """Reference-counted pool of gRPC channels keyed by address and options."""
+
+    def __init__(self, idle_timeout=300.0):
+        """Init pool.
+
+        Args:
+            idle_timeout: seconds an unreferenced channel is kept open before eviction.
+        """
+        self.idle_timeout = idle_timeout
+        self.entries: Dict[ChannelKey, _Entry] = {}
+        self.keys: Dict[int, ChannelKey] = {}
+        self.lock = threading.Lock()
+
+    def acquire(self, address: str, options: List[Tuple[str, int]] = [], timeout=3.0) -> grpc.Channel:
+        """Get a channel to address, creating and connecting it if not pooled yet.
+
+        Args:
+            address: target address.
+            options: channel options.
+            timeout: seconds to wait for a new channel to be ready.
+
+        Returns:
+            Pooled channel, must be given back by `release()`.
+
+        Raises:
+            ConnectionError: When a new channel is not ready within timeout.
+        """
+        key = (address, tuple(sorted(options)))
+        with self.lock:
+            self.__evict(time.monotonic())
+            entry = self.entries.get(key)
+            if entry is not None:
+                return self.__ref(entry)
+
+        channel = grpc.insecure_channel(address, options=list(key[1]))
+        try:
+            grpc.channel_ready_future(channel).result(timeout=timeout)
+        except (grpc.FutureTimeoutError, grpc.RpcError):
+            channel.close()
+            raise ConnectionError(f'Connection to {address} timed out, please check the address again.')
+
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                channel.close()
+            else:
+                entry = self.entries[key] = _Entry(channel)
+                self.keys[id(channel)] = key
+            return self.__ref(entry)
+
+    def release(self, channel: grpc.Channel):
+        """Give back a channel got by `acquire()`.
+
+        Args:
+            channel: pooled channel.
+        """
+        with self.lock:
+            key = self.keys.get(id(channel))
+            if key is not None:
+                entry = self.entries[key]
+                entry.refs = max(entry.refs - 1, 0)
+                entry.last_used = time.monotonic()
+            self.__evict(time.monotonic())
+
+    def evict(self, idle_timeout: Optional[float] = None):
+        """Close unreferenced channels idle for longer than timeout.
+
+        Args:
+            idle_timeout: seconds of idleness, defaults to pool's `idle_timeout`.
+        """
+        with self.lock:
+            self.__evict(time.monotonic(), idle_timeout)
+
+    def close(self):
+        """Close all channels, including referenced ones."""
+        with self.lock:
+            for entry in self.entries.values():
+                entry.channel.close()
+            self.entries.clear()
+            self.keys.clear()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __ref(self, entry: _Entry) -> grpc.Channel:
+        entry.refs += 1
+        entry.last_used = time.monotonic()
+        return entry.channel
+
+    def __evict(self, now: float, idle_timeout: Optional[float] = None):
+        idle_timeout = self.idle_timeout if idle_timeout is None else idle_timeout
+        for key in list(self.entries.keys()):
+            entry = self.entries[key]
+            if entry.refs == 0 and now - entry.last_used >= idle_timeout:
+                entry.channel.close()
+                del self.entries[key]
+                del self.keys[id(entry.channel)]
+
+
+default_pool = ChannelPool()
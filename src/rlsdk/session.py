@@ -0,0 +1,229 @@
+from collections import deque
+from concurrent.futures import Future
+import queue
+import threading
+import time
+from typing import Deque, List, Optional, Sequence, Union
+
+import numpy as np
+
+from .client import Client
+from .configs import AnyDict
+from . import convert
+from .pool import ChannelPool, default_pool
+
+from .protos import agent_pb2_grpc
+from .protos import types_pb2
+
+StateLike = Union[types_pb2.SimState, convert.Models]
+
+
+class AgentSession:
+    """Client side driver of the `GetAction` stream of an agent service.
+
+    States are pipelined onto a single bidirectional stream and every action is matched to its state in order, so
+    several states may be in flight at once:
+
+        with AgentSession.from_service(client, 'agent') as session:
+            futures = [session.submit(state) for state in states]
+            actions = [future.result() for future in futures]
+    """
+
+    @classmethod
+    def from_service(cls, client: Client, id: str, **kwargs):
+        """Open a session to an agent registered in BFF.
+
+        Args:
+            client: client of BFF service.
+            id: agent id.
+            kwargs: other arguments of `AgentSession`.
+        """
+        services = client.get_service_info([id])
+        if id not in services or services[id].type != 'agent':
+            raise ValueError(f'Service {id} is not a registered agent.')
+        return cls(services[id].address, **kwargs)
+
+    def __init__(self, address: str, max_msg_len=256, pool: Optional[ChannelPool] = None):
+        """Init session and open the stream.
+
+        Args:
+            address: address of agent service.
+            max_msg_len: maximum length of messages in MB.
+            pool: channel pool, defaults to process-wide pool.
+        """
+        self.address = address
+        self.pool = default_pool if pool is None else pool
+        self.channel = self.pool.acquire(
+            address,
+            options=[
+                ('grpc.max_send_message_length', max_msg_len * 1024 * 1024),
+                ('grpc.max_receive_message_length', max_msg_len * 1024 * 1024),
+            ],
+        )
+        self.stub = agent_pb2_grpc.AgentStub(self.channel)
+
+        self.requests: queue.SimpleQueue = queue.SimpleQueue()
+        self.pending: Deque[Future] = deque()
+        self.lock = threading.Lock()
+        self.error: Optional[Exception] = None
+
+        self.responses = self.stub.GetAction(iter(self.requests.get, None))
+        self.reader = threading.Thread(target=self.__read, daemon=True)
+        self.reader.start()
+
+    def submit(self, state: StateLike) -> Future:
+        """Send a state without waiting for its action.
+
+        Args:
+            state: `SimState` message or states of models.
+
+        Returns:
+            Future resolved with the `SimAction` message.
+        """
+        if not isinstance(state, types_pb2.SimState):
+            state = convert.encode_sim_state(state)
+        future = Future()
+        with self.lock:
+            if self.error is not None:
+                raise RuntimeError(f'Session to {self.address} is closed.') from self.error
+            self.pending.append(future)
+            self.requests.put(state)
+        return future
+
+    def act(self, state: StateLike, timeout: Optional[float] = None) -> types_pb2.SimAction:
+        """Send a state and wait for its action.
+
+        Args:
+            state: `SimState` message or states of models.
+            timeout: seconds to wait.
+
+        Returns:
+            `SimAction` message.
+        """
+        return self.submit(state).result(timeout)
+
+    def close(self, timeout: Optional[float] = 5.0):
+        """Finish the stream and give back the channel.
+
+        Args:
+            timeout: seconds to wait for pending actions before the stream is cancelled, None to wait forever.
+        """
+        if self.channel is None:
+            return
+        self.requests.put(None)
+        self.reader.join(timeout)
+        if self.reader.is_alive():
+            self.responses.cancel()
+            self.reader.join(timeout)
+        self.pool.release(self.channel)
+        self.channel = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __read(self):
+        try:
+            for action in self.responses:
+                with self.lock:
+                    if len(self.pending) == 0:
+                        raise RuntimeError(f'Agent {self.address} replied an action without pending state.')
+                    future = self.pending.popleft()
+                if future.set_running_or_notify_cancel():
+                    future.set_result(action)
+            error = RuntimeError('Stream finished.')
+        except Exception as e:
+            error = e
+            self.responses.cancel()
+        with self.lock:
+            self.error = error
+            while len(self.pending) > 0:
+                future = self.pending.popleft()
+                if future.set_running_or_notify_cancel():
+                    future.set_exception(error)
+
+
+def load_test(
+    address: str,
+    states: Sequence[StateLike],
+    streams=1,
+    rate=0.0,
+    duration=10.0,
+    depth=1,
+) -> AnyDict:
+    """Drive concurrent `GetAction` streams of an agent and measure latency and throughput.
+
+    Args:
+        address: address of agent service.
+        states: states sent in round robin.
+        streams: number of concurrent streams.
+        rate: target total requests per second, 0 for as fast as possible.
+        duration: seconds to run.
+        depth: maximum in-flight requests per stream.
+
+    Returns:
+        Number of requests and errors, achieved throughput in requests per second, and mean, p50, p95 and p99
+        latency in milliseconds.
+    """
+    if streams < 1:
+        raise ValueError('streams must be positive.')
+    if depth < 1:
+        raise ValueError('depth must be positive.')
+    states = [s if isinstance(s, types_pb2.SimState) else convert.encode_sim_state(s) for s in states]
+    interval = streams / rate if rate > 0 else 0.0
+    latencies: List[List[float]] = [[] for _ in range(streams)]
+    errors = [0] * streams
+
+    def run(i: int, start: float):
+        slots = threading.Semaphore(depth)
+
+        def done(future: Future, sent: float):
+            if future.exception() is None:
+                latencies[i].append(time.perf_counter() - sent)
+            else:
+                errors[i] += 1
+            slots.release()
+
+        with AgentSession(address) as session:
+            k = 0
+            while True:
+                due = start + k * interval + i * interval / streams
+                now = time.perf_counter()
+                if due - start >= duration or now - start >= duration:
+                    break
+                if due > now:
+                    time.sleep(due - now)
+                slots.acquire()
+                sent = time.perf_counter()
+                try:
+                    future = session.submit(states[k % len(states)])
+                except RuntimeError:
+                    errors[i] += 1
+                    slots.release()
+                    break
+                future.add_done_callback(lambda f, sent=sent: done(f, sent))
+                k += 1
+            for _ in range(depth):
+                slots.acquire()
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=run, args=(i, start)) for i in range(streams)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    samples = np.array([x for lat in latencies for x in lat]) * 1000
+    report = {
+        'requests': len(samples),
+        'errors': sum(errors),
+        'duration': elapsed,
+        'throughput': len(samples) / elapsed,
+    }
+    for name, q in [('p50', 50), ('p95', 95), ('p99', 99)]:
+        report[name] = float(np.percentile(samples, q)) if len(samples) > 0 else float('nan')
+    report['mean'] = float(samples.mean()) if len(samples) > 0 else float('nan')
+    return report
@@ -0,0 +1,169 @@
+"""Shared-memory side channel for weights and buffers of services running on the same host as the client.
+
+Instead of carrying serialized data, `@shm` calls carry a json handle in `CallData.dstr` naming a shared-memory
+segment, and both sides map the segment into memory:
+
+    set: {"op": "set", "kind": "weights" | "buffer", "seg": <name>, "nbytes": N} -> service replies {}
+    get: {"op": "get", "kind": "weights" | "buffer"} -> service replies {"seg": <name>, "nbytes": N}
+
+Segments are files in `SHM_DIR`, which is the POSIX shared memory mount `/dev/shm` on Linux. The client creates
+segments of `set` transfers, and unlinks segments of both transfers when done, so a service never unlinks. Data in
+tensor format is decoded as views over the mapped segment, so it is never copied after serialization.
+"""
+import json
+import mmap
+import os
+import tempfile
+import uuid
+from typing import Any, Callable, Dict, Tuple, Union
+
+NAME = '@shm'
+
+SHM_DIR = '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+PREFIX = 'rlsdk-'
+
+CallTuple = Tuple[str, str, bytes]
+Target = Tuple[Callable[[], bytes], Callable[[Union[bytes, mmap.mmap]], Any]]
+
+
+def _path(seg: str) -> str:
+    if not seg.startswith(PREFIX) or os.path.basename(seg) != seg:
+        raise ValueError(f'Invalid segment name {seg}.')
+    return os.path.join(SHM_DIR, seg)
+
+
+def create(payload: bytes) -> str:
+    """Create a segment holding a serialized payload.
+
+    Args:
+        payload: serialized weights or buffer.
+
+    Returns:
+        Name of segment.
+    """
+    seg = PREFIX + uuid.uuid4().hex
+    fd = os.open(_path(seg), os.O_RDWR | os.O_CREAT | os.O_EXCL, 0o600)
+    try:
+        os.ftruncate(fd, len(payload))
+        if len(payload) > 0:
+            with mmap.mmap(fd, len(payload)) as m:
+                m[:] = payload
+    finally:
+        os.close(fd)
+    return seg
+
+
+def attach(seg: str, nbytes: int) -> Union[bytes, mmap.mmap]:
+    """Map a segment into memory.
+
+    Args:
+        seg: name of segment.
+        nbytes: size of segment.
+
+    Returns:
+        Read-only mapping of segment, which stays valid after the segment is unlinked.
+    """
+    if nbytes == 0:
+        return b''
+    fd = os.open(_path(seg), os.O_RDONLY)
+    try:
+        return mmap.mmap(fd, nbytes, access=mmap.ACCESS_READ)
+    finally:
+        os.close(fd)
+
+
+def unlink(seg: str):
+    """Remove a segment, memory is freed once all its mappings are gone.
+
+    Args:
+        seg: name of segment.
+    """
+    try:
+        os.unlink(_path(seg))
+    except FileNotFoundError:
+        pass
+
+
+def request_set(kind: str, seg: str, nbytes: int) -> CallTuple:
+    """Get call data handing a segment over to service.
+
+    Args:
+        kind: `weights` or `buffer`.
+        seg: name of segment.
+        nbytes: size of segment.
+
+    Returns:
+        Call data of the transfer.
+    """
+    return NAME, json.dumps({'op': 'set', 'kind': kind, 'seg': seg, 'nbytes': nbytes}), b''
+
+
+def request_get(kind: str) -> CallTuple:
+    """Get call data asking service for a segment.
+
+    Args:
+        kind: `weights` or `buffer`.
+
+    Returns:
+        Call data of the transfer.
+    """
+    return NAME, json.dumps({'op': 'get', 'kind': kind}), b''
+
+
+def check(res: CallTuple) -> Dict[str, Any]:
+    """Check reply of a shared-memory call.
+
+    Args:
+        res: call data replied by service.
+
+    Returns:
+        Control header of the reply.
+
+    Raises:
+        RuntimeError: When service does not support shared-memory transfer or reports an error.
+    """
+    name, dstr, _ = res
+    if name != NAME or not dstr:
+        raise RuntimeError('Service does not support shared-memory transfer.')
+    head = json.loads(dstr)
+    if 'error' in head:
+        raise RuntimeError(f'Shared-memory transfer failed: {head["error"]}.')
+    return head
+
+
+class ShmHandler:
+    """Service side of the shared-memory transfer protocol."""
+
+    def __init__(self, targets: Dict[str, Target]):
+        """Init handler.
+
+        Args:
+            targets: functions serializing current data and applying received data, keyed by kind.
+        """
+        self.targets = targets
+
+    def __call__(self, dstr: str, dbin: bytes) -> Tuple[str, bytes]:
+        """Handle a shared-memory call.
+
+        Args:
+            dstr: control header of the call.
+            dbin: unused.
+
+        Returns:
+            Control header and empty data of the reply.
+        """
+        head = json.loads(dstr)
+        try:
+            if head['kind'] not in self.targets:
+                raise ValueError(f'unknown kind {head["kind"]}')
+            dump, load = self.targets[head['kind']]
+            if head['op'] == 'set':
+                load(attach(head['seg'], head['nbytes']))
+                return json.dumps({}), b''
+            elif head['op'] == 'get':
+                payload = dump()
+                return json.dumps({'seg': create(payload), 'nbytes': len(payload)}), b''
+            else:
+                raise ValueError(f'unknown op {head["op"]}')
+        except Exception as e:
+            return json.dumps({'error': str(e)}), b''
@@ -0,0 +1,255 @@
+"""Versioned delta synchronization of model weights over the `Call` RPC.
+
+The sender keeps, for every peer, the version token and per-tensor content hashes of the weights it last delivered,
+and transmits only tensors whose hash changed since then. Each `@weights-delta` call carries a json header in
+`CallData.dstr` and a tensor container of changed tensors in `CallData.dbin`:
+
+    version: {"op": "version"} -> {"version": <token or null>}
+    patch:   {"op": "patch", "base": <token or null>, "version": <token>, "tree": ..., "names": [...], "deltas": {...}}
+             -> {"version": <token>} or {"error": ...}
+
+Tensors listed in `deltas` are sent as `xor` of their bit patterns or `sub` of their values against the previous
+version instead of plainly. A patch with a null base carries every tensor and is accepted regardless of the peer's
+version, which is how a peer with unknown version is brought back in sync.
+"""
+import hashlib
+import json
+from typing import Any, Callable, Dict, List, Literal, Optional, Tuple
+import uuid
+
+import numpy as np
+
+from . import tensors
+
+NAME = '@weights-delta'
+
+CallTuple = Tuple[str, str, bytes]
+Mode = Literal['replace', 'xor', 'sub']
+
+
+def query() -> CallTuple:
+    """Call data asking a peer for its weights version."""
+    return NAME, json.dumps({'op': 'version'}), b''
+
+
+def parse(res: CallTuple) -> Optional[Dict[str, Any]]:
+    """Parse reply of a sync call.
+
+    Args:
+        res: call data replied by peer.
+
+    Returns:
+        Control header of the reply, None if the peer does not support delta synchronization.
+    """
+    name, dstr, _ = res
+    if name != NAME or not dstr:
+        return None
+    return json.loads(dstr)
+
+
+def digest(arr: np.ndarray) -> str:
+    """Content hash of an array, including its dtype and shape.
+
+    Args:
+        arr: array to hash.
+
+    Returns:
+        Hex digest.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f'{arr.dtype.str}{arr.shape}'.encode())
+    h.update(np.ascontiguousarray(arr).reshape(-1).view(np.uint8))
+    return h.hexdigest()
+
+
+def _bits(arr: np.ndarray) -> np.ndarray:
+    return arr.view(f'u{arr.dtype.itemsize}')
+
+
+def _apply(delta: str, base: np.ndarray, arr: np.ndarray) -> np.ndarray:
+    if delta == 'xor':
+        return (_bits(base) ^ _bits(arr)).view(base.dtype)
+    else:
+        return base + arr
+
+
+class PeerState:
+    """Weights last delivered to a peer."""
+
+    def __init__(self, version: str, hashes: Dict[str, str], values: Dict[str, np.ndarray]):
+        self.version = version
+        self.hashes = hashes
+        self.values = values
+
+
+class Snapshot:
+    """Weights flattened and hashed once, shared by patches to any number of peers.
+
+    Peers brought to the same snapshot share its version token, so patches from one base version to the snapshot are
+    identical for all peers and are encoded only once.
+    """
+
+    def __init__(self, weights: Any):
+        """Flatten and hash weights.
+
+        Args:
+            weights: nested structure of numpy arrays.
+        """
+        self.tree, named = tensors.flatten(weights)
+        self.names = [name for name, _ in named]
+        self.arrays = dict(named)
+        self.hashes = {name: digest(arr) for name, arr in named}
+        self.version = uuid.uuid4().hex
+        self.patches: Dict[Tuple[Optional[str], str], Tuple[CallTuple, Dict[str, np.ndarray]]] = {}
+
+
+class WeightSync:
+    """Sender side of delta weight synchronization."""
+
+    def __init__(self):
+        """Init sync state, no peer is known yet."""
+        self.peers: Dict[str, PeerState] = {}
+        self.pending: Dict[str, PeerState] = {}
+
+    def forget(self, id: Optional[str] = None):
+        """Forget what was delivered to a peer so that the next sync is a full transfer.
+
+        Args:
+            id: peer id, None for all peers.
+        """
+        if id is None:
+            self.peers.clear()
+        else:
+            self.peers.pop(id, None)
+
+    def snapshots(self, weights: Dict[str, Any]) -> Dict[str, Snapshot]:
+        """Snapshot weights of many peers, flattening and hashing every distinct weights object once.
+
+        Args:
+            weights: weights keyed by peer id, typically the same object for all peers.
+
+        Returns:
+            Snapshots keyed by peer id.
+        """
+        snapshots: Dict[int, Snapshot] = {}
+        for obj in weights.values():
+            if id(obj) not in snapshots:
+                snapshots[id(obj)] = obj if isinstance(obj, Snapshot) else Snapshot(obj)
+        return {key: snapshots[id(obj)] for key, obj in weights.items()}
+
+    def patch(self, id: str, weights: Any, version: Optional[str], mode: Mode = 'replace') -> CallTuple:
+        """Build a patch bringing a peer to `weights`.
+
+        Args:
+            id: peer id.
+            weights: nested structure of numpy arrays to deliver, or its `Snapshot` shared with other peers.
+            version: version reported by the peer, None if unknown.
+            mode: how changed tensors are sent, `replace`, `xor` or `sub`.
+                Note: `sub` only applies to floating tensors, others are replaced.
+
+        Returns:
+            Call data of the patch.
+        """
+        if mode not in ['replace', 'xor', 'sub']:
+            raise ValueError('mode must be replace, xor or sub.')
+        snapshot = weights if isinstance(weights, Snapshot) else Snapshot(weights)
+        peer = self.peers.get(id)
+        if peer is None or peer.version != version:
+            peer = None
+
+        key = (peer.version if peer is not None else None, mode)
+        if key not in snapshot.patches:
+            snapshot.patches[key] = self.__build(snapshot, peer, mode)
+        call, values = snapshot.patches[key]
+        self.pending[id] = PeerState(snapshot.version, snapshot.hashes, values)
+        return call
+
+    def __build(self, snapshot: Snapshot, peer: Optional[PeerState], mode: Mode) -> Tuple[CallTuple, Dict[str, np.ndarray]]:
+        changed, deltas, values = {}, {}, {}
+        for name in snapshot.names:
+            arr = snapshot.arrays[name]
+            if peer is not None and peer.hashes.get(name) == snapshot.hashes[name]:
+                if name in peer.values:
+                    values[name] = peer.values[name]
+                continue
+            base = peer.values.get(name) if peer is not None else None
+            if mode != 'replace' and base is not None and base.dtype == arr.dtype and base.shape == arr.shape:
+                if mode == 'xor':
+                    deltas[name], changed[name] = 'xor', (_bits(base) ^ _bits(arr)).view(arr.dtype)
+                elif np.issubdtype(arr.dtype, np.floating):
+                    deltas[name], changed[name] = 'sub', arr - base
+                else:
+                    changed[name] = arr
+            else:
+                changed[name] = arr
+            if mode != 'replace':
+                values[name] = _apply(deltas[name], base, changed[name]) if name in deltas else arr.copy()
+
+        head = {
+            'op': 'patch',
+            'base': peer.version if peer is not None else None,
+            'version': snapshot.version,
+            'tree': snapshot.tree,
+            'names': snapshot.names,
+            'deltas': deltas,
+        }
+        return (NAME, json.dumps(head), tensors.dumps(changed)), values
+
+    def commit(self, id: str, version: str):
+        """Record that the last patch built for a peer was applied.
+
+        Args:
+            id: peer id.
+            version: version acknowledged by the peer.
+        """
+        state = self.pending.pop(id, None)
+        if state is not None and state.version == version:
+            self.peers[id] = state
+
+
+class WeightPatcher:
+    """Receiver side of delta weight synchronization."""
+
+    def __init__(self, set_weights: Callable[[Any], Any]):
+        """Init patcher.
+
+        Args:
+            set_weights: function applying patched weights to the model.
+        """
+        self.set_weights = set_weights
+        self.version: Optional[str] = None
+        self.values: Dict[str, np.ndarray] = {}
+
+    def reset(self):
+        """Mark version unknown, e.g. after weights were set by other means."""
+        self.version = None
+        self.values = {}
+
+    def __call__(self, dstr: str, dbin: bytes) -> Tuple[str, bytes]:
+        """Handle a sync call.
+
+        Args:
+            dstr: control header of the call.
+            dbin: tensor container of the call.
+
+        Returns:
+            Control header and binary data of the reply.
+        """
+        head = json.loads(dstr)
+        if head['op'] == 'version':
+            return json.dumps({'version': self.version}), b''
+        if head['base'] is not None and head['base'] != self.version:
+            return json.dumps({'error': f'base version {head["base"]} mismatch'}), b''
+        changed = tensors.loads(dbin) if dbin else {}
+        arrays: List[np.ndarray] = []
+        for name in head['names']:
+            if name not in changed:
+                arrays.append(self.values[name])
+            elif name in head['deltas']:
+                arrays.append(_apply(head['deltas'][name], self.values[name], changed[name]))
+            else:
+                arrays.append(changed[name])
+        self.set_weights(tensors.unflatten(head['tree'], arrays))
+        self.values = dict(zip(head['names'], arrays))
+        self.version = head['version']
+        return json.dumps({'version': self.version}), b''
@@ -1,8 +1,17 @@
+from concurrent.futures import ThreadPoolExecutor
 import json
-from typing import Any, Dict
+from typing import Any, Callable, Dict, Iterator, List, Optional
 
-from .configs import AnyDict, Service, Agent, Simenv
+import numpy as np
+
+from .configs import AnyDict, Service, ServiceBase, Agent, Simenv
+from . import checkpoint
 from .client import Client
+from .convert import Format
+from . import dataset
+from .dataset import DatasetFormat
+from .sync import Mode, WeightSync
+from . import tensors
 
 
 class Task:
@@ -20,6 +29,14 @@ class Task:
                 simenvs[id] = Simenv.from_files(f'{path}/{id}')
         return cls(services, agents, simenvs)
 
+    @classmethod
+    def from_checkpoint(cls, path: str):
+        manifest = checkpoint.read_manifest(path)
+        if manifest is None:
+            raise FileNotFoundError(f'No checkpoint found in {path}.')
+        configs = checkpoint.decode_configs(manifest)
+        return cls(configs['services'], configs['agents'], configs['simenvs'])
+
     def __init__(
         self,
         services: Dict[str, Service] = {},
@@ -36,42 +53,76 @@ class Task:
 
         self.address = ''
         self.client = None
+        self.weight_sync = WeightSync()
 
         self.inited = False
 
-    def push(self, address: str, reset=False):
+    def push(self, address: str, reset=False, direct=False, fanout=0, only_changed=False) -> List[str]:
+        self.close()
         self.address = address
-        self.client = Client(address)
+        self.client = Client(address, direct=direct, fanout=fanout)
+        self.weight_sync.forget()
 
         if len(self.services) == 0 or len(self.agents) == 0 and len(self.simenvs) == 0:
             raise RuntimeError('Task not configured.')
 
-        to_register = {}
+        ids = list(self.services.keys())
         services = self.client.get_service_info()
-        for id in self.services:
-            if id not in services:
-                to_register[id] = self.services[id]
+        to_register = {id: self.services[id] for id in ids if id not in services}
+        to_update = {}
+        if only_changed:
+            for id in ids:
+                if id in services and vars(services[id]) != vars(self.services[id]):
+                    to_update[id] = self.services[id]
+        calls = []
         if len(to_register) > 0:
-            self.client.register_service(to_register)
-
-        if reset:
-            self.client.reset_service(list(self.services.keys()))
+            calls.append(lambda: self.client.register_service(to_register))
+        if len(to_update) > 0:
+            calls.append(lambda: self.client.set_service_info(to_update))
+        self.__concurrently(calls)
+
+        if only_changed:
+            states = self.client.query_service(ids)
+            inited = [id for id in ids if states.get(id, False)]
+            agents, simenvs = self.__concurrently([
+                lambda: self.__remote_digests([id for id in inited if id in self.agents], self.client.get_agent_config),
+                lambda: self.__remote_digests([id for id in inited if id in self.simenvs], self.client.get_simenv_config),
+            ])
+            remotes = {**agents, **simenvs}
+            configs = {**self.agents, **self.simenvs}
+            changed = [id for id in ids if id in to_update or remotes.get(id) != configs[id].digest()]
+            to_reset = [id for id in changed if id in inited]
+            if len(to_reset) > 0:
+                if not reset:
+                    raise RuntimeError(f'Service {to_reset[0]} already inited.')
+                self.client.reset_service(to_reset)
         else:
-            states = self.client.query_service(list(self.services.keys()))
-            for id in states:
-                if states[id]:
-                    raise RuntimeError(f'Service {id} already inited.')
-
-        if len(self.agents) > 0:
-            self.client.set_agent_config(self.agents)
-        if len(self.simenvs) > 0:
-            self.client.set_simenv_config(self.simenvs)
+            changed = ids
+            if reset:
+                self.client.reset_service(ids)
+            else:
+                states = self.client.query_service(ids)
+                for id in states:
+                    if states[id]:
+                        raise RuntimeError(f'Service {id} already inited.')
+
+        to_agents = {id: self.agents[id] for id in changed if id in self.agents}
+        to_simenvs = {id: self.simenvs[id] for id in changed if id in self.simenvs}
+        calls = []
+        if len(to_agents) > 0:
+            calls.append(lambda: self.client.set_agent_config(to_agents))
+        if len(to_simenvs) > 0:
+            calls.append(lambda: self.client.set_simenv_config(to_simenvs))
+        self.__concurrently(calls)
 
         self.inited = True
+        return changed
 
-    def pull(self, address: str, reset=False):
+    def pull(self, address: str, reset=False, direct=False, fanout=0):
+        self.close()
         self.address = address
-        self.client = Client(address)
+        self.client = Client(address, direct=direct, fanout=fanout)
+        self.weight_sync.forget()
 
         registered = {}
         states = self.client.query_service()
@@ -101,6 +152,18 @@ class Task:
 
         self.inited = True
 
+    def close(self):
+        if self.client is not None:
+            self.client.close()
+            self.client = None
+        self.inited = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
     def details(self) -> Dict[str, AnyDict]:
         self.__check_inited()
         details = {}
@@ -134,13 +197,18 @@ class Task:
         self.__check_inited()
         return self.client.get_model_weights([id])[id]
 
-    def set_buffer(self, id: str, buffer: Any):
+    def sync_weights(self, src: str, dsts: List[str], mode: Mode = 'replace') -> Dict[str, int]:
+        self.__check_inited()
+        weights = self.get_weights(src)
+        return self.client.sync_model_weights({id: weights for id in dsts}, self.weight_sync, mode)
+
+    def set_buffer(self, id: str, buffer: Any, chunk_size=0):
         self.__check_inited()
-        self.client.set_model_buffer({id: buffer})
+        self.client.set_model_buffer({id: buffer}, chunk_size=chunk_size)
 
-    def get_buffer(self, id: str) -> Any:
+    def get_buffer(self, id: str, chunk_size=0) -> Any:
         self.__check_inited()
-        return self.client.get_model_buffer([id])[id]
+        return self.client.get_model_buffer([id], chunk_size=chunk_size)[id]
 
     def set_status(self, id: str, status: AnyDict):
         self.__check_inited()
@@ -150,6 +218,62 @@ class Task:
         self.__check_inited()
         return self.client.get_model_status([id])[id]
 
+    def checkpoint(self, path: str, incremental=True, chunk_size=0) -> AnyDict:
+        self.__check_inited()
+        previous = checkpoint.read_manifest(path) if incremental else None
+        olds = previous['states'] if previous is not None else {}
+        manifest = checkpoint.new_manifest(self.services, self.agents, self.simenvs)
+        checkpoint.write_manifest(path, manifest)
+        for id in self.agents:
+            old = olds.get(id, {})
+            state = manifest['states'][id] = {}
+            state['weights'] = checkpoint.save(f'{path}/{id}/weights', self.get_weights(id), old.get('weights'))
+            checkpoint.write_manifest(path, manifest)
+            state['buffer'] = checkpoint.save(f'{path}/{id}/buffer', self.get_buffer(id, chunk_size), old.get('buffer'))
+            state['status'] = self.get_status(id)
+            checkpoint.write_manifest(path, manifest)
+        manifest['complete'] = True
+        checkpoint.write_manifest(path, manifest)
+        return manifest
+
+    def restore(self, path: str, weights=True, buffer=True, status=True, chunk_size=0, format: Format = 'pickle'):
+        self.__check_inited()
+        manifest = checkpoint.read_manifest(path)
+        if manifest is None:
+            raise FileNotFoundError(f'No checkpoint found in {path}.')
+        if not manifest['complete']:
+            raise RuntimeError(f'Checkpoint in {path} is incomplete.')
+        for id, state in manifest['states'].items():
+            if id not in self.agents:
+                continue
+            if weights:
+                data = self.__load(f'{path}/{id}/weights', state['weights'])
+                self.client.set_model_weights({id: data}, format=format)
+            if buffer:
+                data = self.__load(f'{path}/{id}/buffer', state['buffer'])
+                self.client.set_model_buffer({id: data}, format=format, chunk_size=chunk_size)
+            if status:
+                self.set_status(id, state['status'])
+
+    def export_dataset(
+        self,
+        ids: List[str],
+        path: str,
+        shard_rows=65536,
+        format: DatasetFormat = 'npz',
+        merge=True,
+        chunk_size=0,
+    ) -> AnyDict:
+        self.__check_inited()
+        for id in ids:
+            if id not in self.agents:
+                raise ValueError(f'Agent {id} not in task.')
+        with dataset.DatasetWriter(path, shard_rows=shard_rows, format=format, merge=merge) as writer:
+            for id in ids or list(self.agents):
+                for columns in dataset.segments(self.get_buffer(id, chunk_size)):
+                    writer.write(id, columns)
+        return writer.manifest
+
     def init(self):
         self.__check_inited()
         self.client.sim_control(self.__gen_cmds('init'))
@@ -170,9 +294,32 @@ class Task:
         self.__check_inited()
         self.client.sim_control(self.__gen_cmds('stop'))
 
-    def monitor(self) -> Dict[str, AnyDict]:
+    def monitor(self, lazy=False) -> Dict[str, AnyDict]:
+        self.__check_inited()
+        return self.client.sim_monitor(lazy=lazy)
+
+    def watch(self, min_interval=0.1, max_interval=5.0, duration: Optional[float] = None) -> Iterator[Dict[str, AnyDict]]:
         self.__check_inited()
-        return self.client.sim_monitor()
+        return self.client.watch_monitor(list(self.simenvs.keys()), min_interval, max_interval, duration)
+
+    def __remote_digests(self, ids: List[str], get_config: Callable[[List[str]], Dict[str, ServiceBase]]) -> Dict[str, str]:
+        if len(ids) == 0:
+            return {}
+        return {id: config.digest() for id, config in get_config(ids).items()}
+
+    def __concurrently(self, fns: List[Callable[[], Any]]) -> List[Any]:
+        if len(fns) <= 1:
+            return [fn() for fn in fns]
+        with ThreadPoolExecutor(max_workers=len(fns)) as executor:
+            futures = [executor.submit(fn) for fn in fns]
+            return [future.result() for future in futures]
+
+    def __load(self, path: str, entry: AnyDict) -> Any:
+        data = checkpoint.load(path, entry)
+        if entry['format'] != 'npy':
+            return data
+        tree, named = tensors.flatten(data)
+        return tensors.unflatten(tree, [np.asarray(arr) for _, arr in named])
 
     def __gen_cmds(self, cmd):
         return {id: cmd for id in self.simenvs}
@@ -0,0 +1,174 @@
+"""Self-describing binary container for nested structures of numpy arrays.
+
+Layout of an encoded container:
+
+    MAGIC (8 bytes) | header length (uint64, little endian) | header (utf-8 json) | padding | data
+
+The json header holds a `tensors` table with `name`, `dtype`, `shape`, `offset` and `nbytes` of every array, and a
+`tree` describing how arrays and plain json values are nested in dicts, lists and tuples. Offsets are relative to the
+start of the data section, and every array starts on an `ALIGN`-byte boundary, so decoding is done by `np.frombuffer`
+views over the received bytes without copying.
+"""
+import json
+import struct
+from typing import Any, List, Tuple
+
+import numpy as np
+
+MAGIC = b'RLTENSOR'
+ALIGN = 64
+
+_PREFIX = struct.Struct('<8sQ')
+
+
+def _align(n: int) -> int:
+    return (n + ALIGN - 1) // ALIGN * ALIGN
+
+
+def _flatten(obj: Any, path: str, tensors: List[Tuple[str, np.ndarray]]) -> Any:
+    if isinstance(obj, (np.ndarray, np.generic)):
+        arr = np.asarray(obj)
+        if arr.dtype.hasobject:
+            raise TypeError(f'Array `{path}` with object dtype can not be encoded.')
+        tensors.append((path, arr if arr.flags.c_contiguous else arr.copy(order='C')))
+        if isinstance(obj, np.generic):
+            return {'t': len(tensors) - 1, 's': True}
+        return {'t': len(tensors) - 1}
+    elif isinstance(obj, dict):
+        items = []
+        for k, v in obj.items():
+            if not isinstance(k, (str, int, float, bool)) and k is not None:
+                raise TypeError(f'Key `{k}` of `{path}` must be a json scalar.')
+            items.append([k, _flatten(v, f'{path}/{k}', tensors)])
+        return {'m': items}
+    elif isinstance(obj, list):
+        return {'l': [_flatten(v, f'{path}/{i}', tensors) for i, v in enumerate(obj)]}
+    elif isinstance(obj, tuple):
+        return {'u': [_flatten(v, f'{path}/{i}', tensors) for i, v in enumerate(obj)]}
+    elif isinstance(obj, (str, int, float, bool)) or obj is None:
+        return {'v': obj}
+    else:
+        raise TypeError(f'Value `{path}` of type {type(obj).__name__} can not be encoded.')
+
+
+def _unflatten(node: Any, arrays: List[np.ndarray]) -> Any:
+    if 't' in node:
+        arr = arrays[node['t']]
+        return arr[()] if node.get('s', False) else arr
+    elif 'm' in node:
+        return {k: _unflatten(v, arrays) for k, v in node['m']}
+    elif 'l' in node:
+        return [_unflatten(v, arrays) for v in node['l']]
+    elif 'u' in node:
+        return tuple(_unflatten(v, arrays) for v in node['u'])
+    else:
+        return node['v']
+
+
+def flatten(obj: Any) -> Tuple[Any, List[Tuple[str, np.ndarray]]]:
+    """Split a nested structure into its json tree and the arrays it holds.
+
+    Args:
+        obj: nested dicts, lists and tuples of numpy arrays and json scalars.
+
+    Returns:
+        Json tree of the structure.
+        Names and arrays in order of their index in the tree.
+    """
+    tensors = []
+    tree = _flatten(obj, '', tensors)
+    return tree, tensors
+
+
+def unflatten(tree: Any, arrays: List[np.ndarray]) -> Any:
+    """Rebuild the structure flattened by `flatten`.
+
+    Args:
+        tree: json tree of the structure.
+        arrays: arrays in order of their index in the tree.
+
+    Returns:
+        Nested structure.
+    """
+    return _unflatten(tree, arrays)
+
+
+def dumps(obj: Any) -> bytes:
+    """Encode a nested structure of numpy arrays into a container.
+
+    Args:
+        obj: nested dicts, lists and tuples of numpy arrays and json scalars.
+
+    Returns:
+        Encoded container.
+
+    Raises:
+        TypeError: When the structure holds values that can not be encoded.
+    """
+    tree, tensors = flatten(obj)
+
+    table, offset = [], 0
+    for name, arr in tensors:
+        table.append({
+            'name': name,
+            'dtype': np.lib.format.dtype_to_descr(arr.dtype),
+            'shape': list(arr.shape),
+            'offset': offset,
+            'nbytes': arr.nbytes,
+        })
+        offset = _align(offset + arr.nbytes)
+    header = json.dumps({'tensors': table, 'tree': tree}).encode()
+
+    start = _align(_PREFIX.size + len(header))
+    parts = [_PREFIX.pack(MAGIC, len(header)), header, bytes(start - _PREFIX.size - len(header))]
+    for i, (_, arr) in enumerate(tensors):
+        parts.append(arr.reshape(-1).view(np.uint8))
+        if i < len(tensors) - 1:
+            parts.append(bytes(_align(arr.nbytes) - arr.nbytes))
+    return b''.join(parts)
+
+
+def loads(data: bytes, copy=False) -> Any:
+    """Decode a container into its nested structure.
+
+    Args:
+        data: encoded container.
+        copy: whether to copy arrays out of `data`.
+            Note: Arrays are read-only views over `data` when not copied.
+
+    Returns:
+        Nested structure.
+
+    Raises:
+        ValueError: When `data` is not a container.
+    """
+    if not is_tensors(data):
+        raise ValueError('Data is not a tensor container.')
+    _, size = _PREFIX.unpack_from(data)
+    header = json.loads(bytes(memoryview(data)[_PREFIX.size:_PREFIX.size + size]))
+    start = _align(_PREFIX.size + size)
+
+    arrays = []
+    for info in header['tensors']:
+        dtype = np.lib.format.descr_to_dtype(info['dtype'])
+        if info['nbytes'] == 0:
+            arr = np.empty(info['shape'], dtype=dtype)
+        else:
+            count = info['nbytes'] // dtype.itemsize
+            arr = np.frombuffer(data, dtype=dtype, count=count, offset=start + info['offset']).reshape(info['shape'])
+            if copy:
+                arr = arr.copy()
+        arrays.append(arr)
+    return unflatten(header['tree'], arrays)
+
+
+def is_tensors(data: bytes) -> bool:
+    """Check whether data is a container.
+
+    Args:
+        data: data to check.
+
+    Returns:
+        True if `data` starts with the container magic.
+    """
+    return len(data) >= _PREFIX.size and bytes(memoryview(data)[:len(MAGIC)]) == MAGIC
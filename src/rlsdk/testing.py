@@ -0,0 +1,583 @@
+"""In-process stand-in services for testing and benchmarking the SDK without a deployed cluster.
+
+`StandInModel` and `StandInEngine` mimic `RLModelBase` and `SimEngineBase` with configurable latency and payload
+size. `AgentStandIn` and `SimenvStandIn` serve them over the agent and simenv protocols, and `BFFStandIn` routes BFF
+requests either to in-memory services or, like the real BFF, to registered services over gRPC. `StandInCluster`
+starts a BFF with any number of agents and simenvs on local ports:
+
+    with StandInCluster(agents=4, simenvs=1, latency=0.001, payload_size=1 << 20) as cluster:
+        client = Client(cluster.address)
+"""
+from concurrent import futures
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import grpc
+import numpy as np
+
+from . import broadcast
+from . import chunks
+from .configs import AnyDict, Service
+from . import convert
+from . import fastjson
+from . import shm
+from . import sync
+
+from .protos import agent_pb2, agent_pb2_grpc, bff_pb2, bff_pb2_grpc, simenv_pb2, simenv_pb2_grpc
+from .protos import types_pb2
+
+Servicer = Union[bff_pb2_grpc.BFFServicer, agent_pb2_grpc.AgentServicer, simenv_pb2_grpc.SimenvServicer]
+
+
+def _payload(payload_size: int) -> Optional[Dict[str, np.ndarray]]:
+    if payload_size <= 0:
+        return None
+    return {'w': np.zeros(payload_size // 4, dtype=np.float32)}
+
+
+def _service_state(inited: bool) -> types_pb2.ServiceState:
+    State = types_pb2.ServiceState.State
+    return types_pb2.ServiceState(state=State.INITED if inited else State.UNINITED)
+
+
+class StandInModel:
+    """In-memory stand-in of a reinforcement learning model."""
+
+    def __init__(
+        self,
+        weights: Any = None,
+        buffer: Any = None,
+        status: Optional[Dict[str, Any]] = None,
+        latency=0.0,
+        payload_size=0,
+        training=False,
+    ):
+        """Init model.
+
+        Args:
+            weights: initial weights, defaults to a float32 array of `payload_size` bytes.
+            buffer: initial buffer, defaults to a float32 array of `payload_size` bytes.
+            status: initial status.
+            latency: seconds spent in every model operation.
+            payload_size: bytes of default weights and buffer.
+            training: whether model is used for `train` or `infer`.
+        """
+        self.weights = weights if weights is not None else _payload(payload_size)
+        self.buffer = buffer if buffer is not None else _payload(payload_size)
+        self.status = status or {}
+        self.latency = latency
+        self.training = training
+        self.stored = 0
+        self.trained = 0
+        self.chunks = chunks.ChunkHandler(
+            dump=lambda: convert.dumps(self.get_buffer()),
+            load=self.set_buffer_bytes,
+        )
+        self.patcher = sync.WeightPatcher(self.patch_weights)
+        self.shm = shm.ShmHandler({
+            'weights': (lambda: convert.dumps(self.get_weights()), lambda data: self.set_weights(convert.loads(data))),
+            'buffer': (lambda: convert.dumps(self.get_buffer()), self.set_buffer_bytes),
+        })
+        self.relay = broadcast.RelayHandler(lambda data: self.set_weights(convert.loads(data)))
+
+    def react(self, state: types_pb2.SimState) -> types_pb2.SimAction:
+        self.__delay()
+        sim_action = types_pb2.SimAction()
+        for name, model in state.states.items():
+            sim_action.actions[name].CopyFrom(model)
+        return sim_action
+
+    def store(self, states: Any, actions: Any, next_states: Any, reward: Any, terminated: bool, truncated: bool):
+        self.__delay()
+        self.stored += 1
+
+    def train(self) -> AnyDict:
+        self.__delay()
+        self.trained += 1
+        return {'trained': self.trained}
+
+    def get_weights(self) -> Any:
+        self.__delay()
+        return self.weights
+
+    def set_weights(self, weights: Any):
+        self.__delay()
+        self.weights = weights
+        self.patcher.reset()
+
+    def patch_weights(self, weights: Any):
+        self.weights = weights
+
+    def get_buffer(self) -> Any:
+        self.__delay()
+        return self.buffer
+
+    def set_buffer(self, buffer: Any):
+        self.__delay()
+        self.buffer = buffer
+
+    def set_buffer_bytes(self, data: bytes):
+        self.set_buffer(convert.loads(data))
+
+    def get_status(self) -> AnyDict:
+        return self.status
+
+    def set_status(self, status: AnyDict):
+        self.status = status
+
+    def call(self, name: str, dstr='', dbin=b'') -> Tuple[str, str, bytes]:
+        if name == chunks.NAME:
+            dstr, dbin = self.chunks(dstr, dbin)
+            return name, dstr, dbin
+        elif name == sync.NAME:
+            dstr, dbin = self.patcher(dstr, dbin)
+            return name, dstr, dbin
+        elif name == shm.NAME:
+            dstr, dbin = self.shm(dstr, dbin)
+            return name, dstr, dbin
+        elif name == broadcast.NAME:
+            dstr, dbin = self.relay(dstr, dbin)
+            return name, dstr, dbin
+        return name, '', b''
+
+    def __delay(self):
+        if self.latency > 0:
+            time.sleep(self.latency)
+
+
+class StandInEngine:
+    """In-memory stand-in of a simulation engine, advancing one step per monitor while running."""
+
+    TRANSITIONS = {
+        'init': ('UNINITED', 'STOPPED'),
+        'start': ('STOPPED', 'RUNNING'),
+        'pause': ('RUNNING', 'SUSPENDED'),
+        'resume': ('SUSPENDED', 'RUNNING'),
+    }
+
+    def __init__(self, latency=0.0, payload_size=0, max_logs=100):
+        """Init engine.
+
+        Args:
+            latency: seconds spent in every engine operation.
+            payload_size: bytes of padding in monitor data.
+            max_logs: number of recent log lines reported by monitor.
+        """
+        self.latency = latency
+        self.payload_size = payload_size
+        self.max_logs = max_logs
+        self.state = 'UNINITED'
+        self.steps = 0
+        self.logs: List[str] = []
+
+    def control(self, type: str, params: AnyDict = {}) -> bool:
+        self.__delay()
+        if type == 'stop':
+            self.state = 'STOPPED' if self.state != 'UNINITED' else self.state
+        elif type in ['step', 'episode']:
+            self.steps += 1
+        elif type in self.TRANSITIONS:
+            src, dst = self.TRANSITIONS[type]
+            if self.state != src:
+                return False
+            self.state = dst
+        self.logs.append(f'{type} {fastjson.dumps(params)}')
+        return True
+
+    def monitor(self) -> Tuple[AnyDict, List[str]]:
+        self.__delay()
+        if self.state == 'RUNNING':
+            self.steps += 1
+            self.logs.append(f'step {self.steps}')
+        self.logs = self.logs[-self.max_logs:]
+        return {'steps': self.steps, 'payload': 'x' * self.payload_size}, list(self.logs)
+
+    def call(self, name: str, dstr='', dbin=b'') -> Tuple[str, str, bytes]:
+        return name, '', b''
+
+    def reset(self):
+        self.state = 'UNINITED'
+        self.steps = 0
+        self.logs = []
+
+    def __delay(self):
+        if self.latency > 0:
+            time.sleep(self.latency)
+
+
+class AgentStandIn(agent_pb2_grpc.AgentServicer):
+    """In-process stand-in of agent service serving a single in-memory model."""
+
+    def __init__(self, model: StandInModel):
+        """Init servicer.
+
+        Args:
+            model: model served.
+        """
+        self.model = model
+        self.config: Optional[agent_pb2.AgentConfig] = None
+
+    def ResetService(self, request, context):
+        self.config = None
+        self.model.patcher.reset()
+        return types_pb2.CommonResponse()
+
+    def QueryService(self, request, context):
+        return _service_state(self.config is not None)
+
+    def GetAgentConfig(self, request, context):
+        return self.config or agent_pb2.AgentConfig()
+
+    def SetAgentConfig(self, request, context):
+        self.config = request
+        self.model.training = request.training
+        return types_pb2.CommonResponse()
+
+    def GetAgentMode(self, request, context):
+        return agent_pb2.AgentMode(training=self.model.training)
+
+    def SetAgentMode(self, request, context):
+        self.model.training = request.training
+        return types_pb2.CommonResponse()
+
+    def GetModelWeights(self, request, context):
+        return agent_pb2.ModelWeights(weights=convert.dumps(self.model.get_weights()))
+
+    def SetModelWeights(self, request, context):
+        self.model.set_weights(convert.loads(request.weights))
+        return types_pb2.CommonResponse()
+
+    def GetModelBuffer(self, request, context):
+        return agent_pb2.ModelBuffer(buffer=convert.dumps(self.model.get_buffer()))
+
+    def SetModelBuffer(self, request, context):
+        self.model.set_buffer_bytes(request.buffer)
+        return types_pb2.CommonResponse()
+
+    def GetModelStatus(self, request, context):
+        return agent_pb2.ModelStatus(status=fastjson.dumps(self.model.get_status()))
+
+    def SetModelStatus(self, request, context):
+        self.model.set_status(fastjson.loads(request.status))
+        return types_pb2.CommonResponse()
+
+    def GetAction(self, request_iterator, context):
+        for state in request_iterator:
+            yield self.model.react(state)
+
+    def Call(self, request, context):
+        name, dstr, dbin = self.model.call(request.name, request.dstr, request.dbin)
+        return types_pb2.CallData(name=name, dstr=dstr, dbin=dbin)
+
+
+class SimenvStandIn(simenv_pb2_grpc.SimenvServicer):
+    """In-process stand-in of simenv service serving a single in-memory engine."""
+
+    def __init__(self, engine: StandInEngine):
+        """Init servicer.
+
+        Args:
+            engine: engine served.
+        """
+        self.engine = engine
+        self.config: Optional[simenv_pb2.SimenvConfig] = None
+
+    def ResetService(self, request, context):
+        self.config = None
+        self.engine.reset()
+        return types_pb2.CommonResponse()
+
+    def QueryService(self, request, context):
+        return _service_state(self.config is not None)
+
+    def GetSimenvConfig(self, request, context):
+        return self.config or simenv_pb2.SimenvConfig()
+
+    def SetSimenvConfig(self, request, context):
+        self.config = request
+        return types_pb2.CommonResponse()
+
+    def SimControl(self, request, context):
+        self.engine.control(request.type, fastjson.loads(request.params) if request.params else {})
+        return types_pb2.CommonResponse()
+
+    def SimMonitor(self, request, context):
+        data, logs = self.engine.monitor()
+        return simenv_pb2.SimInfo(state=self.engine.state, data=fastjson.dumps(data), logs=fastjson.dumps(logs))
+
+    def Call(self, request, context):
+        name, dstr, dbin = self.engine.call(request.name, request.dstr, request.dbin)
+        return types_pb2.CallData(name=name, dstr=dstr, dbin=dbin)
+
+
+class _Local:
+    """Stub-like view of an in-process servicer."""
+
+    def __init__(self, servicer: Servicer):
+        self.servicer = servicer
+
+    def __getattr__(self, name: str):
+        method = getattr(self.servicer, name)
+        return lambda request: method(request, None)
+
+
+class BFFStandIn(bff_pb2_grpc.BFFServicer):
+    """In-process stand-in of BFF service.
+
+    Requests to services backed by in-memory models or engines are handled in process, requests to other registered
+    services are forwarded over gRPC to their addresses, as the real BFF does.
+    """
+
+    def __init__(
+        self,
+        models: Dict[str, StandInModel] = {},
+        services: Optional[Dict[str, Service]] = None,
+        engines: Dict[str, StandInEngine] = {},
+        max_msg_len=256,
+    ):
+        """Init servicer.
+
+        Args:
+            models: in-memory models keyed by agent id.
+            services: registered services, defaults to in-memory models and engines on localhost.
+            engines: in-memory engines keyed by simenv id.
+            max_msg_len: maximum length of forwarded messages in MB.
+        """
+        self.models = models
+        self.engines = engines
+        self.local: Dict[str, _Local] = {
+            **{id: _Local(AgentStandIn(model)) for id, model in models.items()},
+            **{id: _Local(SimenvStandIn(engine)) for id, engine in engines.items()},
+        }
+        if services is None:
+            services = {
+                **{id: Service('agent', id, 'localhost', 0, '') for id in models},
+                **{id: Service('simenv', id, 'localhost', 0, '') for id in engines},
+            }
+        self.services = dict(services)
+        self.options = [
+            ('grpc.max_send_message_length', max_msg_len * 1024 * 1024),
+            ('grpc.max_receive_message_length', max_msg_len * 1024 * 1024),
+        ]
+        self.remotes: Dict[str, Tuple[grpc.Channel, Any]] = {}
+        self.lock = threading.Lock()
+
+    def close(self):
+        """Close channels of forwarded services."""
+        with self.lock:
+            for channel, _ in self.remotes.values():
+                channel.close()
+            self.remotes.clear()
+
+    def ResetServer(self, request, context):
+        self.close()
+        self.services.clear()
+        return types_pb2.CommonResponse()
+
+    def RegisterService(self, request, context):
+        self.__update(convert.decode_services(request))
+        return types_pb2.CommonResponse()
+
+    def UnRegisterService(self, request, context):
+        for id in request.ids or list(self.services.keys()):
+            self.services.pop(id, None)
+            self.__drop(id)
+        return types_pb2.CommonResponse()
+
+    def GetServiceInfo(self, request, context):
+        return convert.encode_services({id: self.services[id] for id in request.ids or self.services if id in self.services})
+
+    def SetServiceInfo(self, request, context):
+        self.__update(convert.decode_services(request))
+        return types_pb2.CommonResponse()
+
+    def ResetService(self, request, context):
+        for id in self.__ids(request):
+            self.__backend(id, context).ResetService(types_pb2.CommonRequest())
+        return types_pb2.CommonResponse()
+
+    def QueryService(self, request, context):
+        return self.__get(request, context, None, 'QueryService', bff_pb2.ServiceStateMap(), 'states')
+
+    def GetSimenvConfig(self, request, context):
+        return self.__get(request, context, 'simenv', 'GetSimenvConfig', bff_pb2.SimenvConfigMap(), 'configs')
+
+    def SetSimenvConfig(self, request, context):
+        return self.__set(request.configs, context, 'SetSimenvConfig')
+
+    def SimControl(self, request, context):
+        return self.__set(request.cmds, context, 'SimControl')
+
+    def SimMonitor(self, request, context):
+        return self.__get(request, context, 'simenv', 'SimMonitor', bff_pb2.SimInfoMap(), 'infos')
+
+    def GetAgentConfig(self, request, context):
+        return self.__get(request, context, 'agent', 'GetAgentConfig', bff_pb2.AgentConfigMap(), 'configs')
+
+    def SetAgentConfig(self, request, context):
+        return self.__set(request.configs, context, 'SetAgentConfig')
+
+    def GetAgentMode(self, request, context):
+        return self.__get(request, context, 'agent', 'GetAgentMode', bff_pb2.AgentModeMap(), 'modes')
+
+    def SetAgentMode(self, request, context):
+        return self.__set(request.modes, context, 'SetAgentMode')
+
+    def GetModelWeights(self, request, context):
+        return self.__get(request, context, 'agent', 'GetModelWeights', bff_pb2.ModelWeightsMap(), 'weights')
+
+    def SetModelWeights(self, request, context):
+        return self.__set(request.weights, context, 'SetModelWeights')
+
+    def GetModelBuffer(self, request, context):
+        return self.__get(request, context, 'agent', 'GetModelBuffer', bff_pb2.ModelBufferMap(), 'buffers')
+
+    def SetModelBuffer(self, request, context):
+        return self.__set(request.buffers, context, 'SetModelBuffer')
+
+    def GetModelStatus(self, request, context):
+        return self.__get(request, context, 'agent', 'GetModelStatus', bff_pb2.ModelStatusMap(), 'status')
+
+    def SetModelStatus(self, request, context):
+        return self.__set(request.status, context, 'SetModelStatus')
+
+    def Call(self, request, context):
+        call_data_map = bff_pb2.CallDataMap()
+        for id, msg in request.data.items():
+            call_data_map.data[id].CopyFrom(self.__backend(id, context).Call(msg))
+        return call_data_map
+
+    def __update(self, services: Dict[str, Service]):
+        for id, service in services.items():
+            self.services[id] = service
+            self.__drop(id)
+
+    def __drop(self, id: str):
+        with self.lock:
+            remote = self.remotes.pop(id, None)
+        if remote is not None:
+            remote[0].close()
+
+    def __ids(self, request: bff_pb2.ServiceIdList, type: Optional[str] = None) -> List[str]:
+        if len(request.ids) > 0:
+            return list(request.ids)
+        return [id for id, service in self.services.items() if type is None or service.type == type]
+
+    def __backend(self, id: str, context) -> Any:
+        if id not in self.services:
+            context.abort(grpc.StatusCode.NOT_FOUND, f'Service {id} not registered.')
+        if id in self.local:
+            return self.local[id]
+        with self.lock:
+            if id not in self.remotes:
+                service = self.services[id]
+                channel = grpc.insecure_channel(service.address, options=self.options)
+                if service.type == 'agent':
+                    self.remotes[id] = channel, agent_pb2_grpc.AgentStub(channel)
+                else:
+                    self.remotes[id] = channel, simenv_pb2_grpc.SimenvStub(channel)
+            return self.remotes[id][1]
+
+    def __get(self, request, context, type: Optional[str], method: str, res: Any, field: str) -> Any:
+        for id in self.__ids(request, type):
+            getattr(res, field)[id].CopyFrom(getattr(self.__backend(id, context), method)(types_pb2.CommonRequest()))
+        return res
+
+    def __set(self, msgs: Any, context, method: str) -> types_pb2.CommonResponse:
+        for id, msg in msgs.items():
+            getattr(self.__backend(id, context), method)(msg)
+        return types_pb2.CommonResponse()
+
+
+def serve(servicer: Servicer, address='localhost:0', max_msg_len=256, workers=8) -> Tuple[grpc.Server, str]:
+    """Start a server for stand-in servicer.
+
+    Args:
+        servicer: BFF, agent or simenv servicer to serve.
+        address: address to bind, port 0 picks a free port, or `unix:<path>` for a unix domain socket.
+        max_msg_len: maximum length of messages in MB.
+        workers: number of worker threads.
+
+    Returns:
+        Started server, call `stop()` to shut it down.
+        Address the server is listening on.
+    """
+    server = grpc.server(
+        futures.ThreadPoolExecutor(max_workers=workers),
+        options=[
+            ('grpc.max_send_message_length', max_msg_len * 1024 * 1024),
+            ('grpc.max_receive_message_length', max_msg_len * 1024 * 1024),
+        ],
+    )
+    if isinstance(servicer, bff_pb2_grpc.BFFServicer):
+        bff_pb2_grpc.add_BFFServicer_to_server(servicer, server)
+    elif isinstance(servicer, agent_pb2_grpc.AgentServicer):
+        agent_pb2_grpc.add_AgentServicer_to_server(servicer, server)
+    else:
+        simenv_pb2_grpc.add_SimenvServicer_to_server(servicer, server)
+    port = server.add_insecure_port(address)
+    server.start()
+    if address.startswith('unix:'):
+        return server, address
+    host = address.rsplit(':', 1)[0]
+    return server, f'{host}:{port}'
+
+
+class StandInCluster:
+    """Stand-in BFF together with agent and simenv services, each served on its own local port."""
+
+    def __init__(
+        self,
+        agents=1,
+        simenvs=0,
+        latency=0.0,
+        payload_size=0,
+        host='localhost',
+        max_msg_len=256,
+        workers=8,
+    ):
+        """Start servers.
+
+        Args:
+            agents: number of agents, with ids `agent0`, `agent1`, ...
+            simenvs: number of simenvs, with ids `simenv0`, `simenv1`, ...
+            latency: seconds spent in every model or engine operation.
+            payload_size: bytes of weights, buffers and monitor data.
+            host: host to bind, or `unix:<dir>` to listen on unix domain sockets `<dir>/<id>.sock` and `<dir>/bff.sock`.
+            max_msg_len: maximum length of messages in MB.
+            workers: number of worker threads of each server.
+        """
+        self.models = {f'agent{i}': StandInModel(latency=latency, payload_size=payload_size) for i in range(agents)}
+        self.engines = {f'simenv{i}': StandInEngine(latency=latency, payload_size=payload_size) for i in range(simenvs)}
+        self.servers: List[grpc.Server] = []
+        self.services: Dict[str, Service] = {}
+        servicers: List[Tuple[str, Servicer]] = [
+            *[(id, AgentStandIn(model)) for id, model in self.models.items()],
+            *[(id, SimenvStandIn(engine)) for id, engine in self.engines.items()],
+        ]
+        unix = host.startswith('unix:')
+        for id, servicer in servicers:
+            server, address = serve(servicer, f'{host}/{id}.sock' if unix else f'{host}:0', max_msg_len, workers)
+            self.servers.append(server)
+            type = 'agent' if isinstance(servicer, AgentStandIn) else 'simenv'
+            if unix:
+                self.services[id] = Service(type, id, address, 0, '')
+            else:
+                self.services[id] = Service(type, id, host, int(address.rsplit(':', 1)[1]), '')
+        self.bff = BFFStandIn(services=self.services, max_msg_len=max_msg_len)
+        server, self.address = serve(self.bff, f'{host}/bff.sock' if unix else f'{host}:0', max_msg_len, workers)
+        self.servers.append(server)
+
+    def stop(self):
+        """Stop all servers."""
+        for server in self.servers:
+            server.stop(None)
+        self.servers = []
+        self.bff.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,336 @@
+"""Vectorized stepping of many custom engine instances kept in worker processes.
+
+Every worker loads the custom engine package like `LocalTask` does, and steps its engine instance through the same
+`CommandType.EPISODE` / `CommandType.STEP` contract. The sifunc, oafunc and rewfunc of an agent run inside workers
+too, so the main process only sees model inputs and outputs. Inputs of all engines are written by workers into
+one shared-memory array of shape `(num_envs, *input_shape)`, with rewards and termination flags next to it, and only
+small control messages go through pipes. Engines are reset automatically once terminated or truncated, and the
+inputs of the final step are passed back in `infos`:
+
+    with VectorEnv(simenv, 'path/to/engine', 8, engine_base='path/to/base.py', agent=agent) as envs:
+        report = envs.run(react=model.react, steps=10000)
+"""
+import multiprocessing as mp
+from multiprocessing import connection
+from multiprocessing.shared_memory import SharedMemory
+import time
+import traceback
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .configs import AnyDict, Agent, Simenv
+from . import convert
+from .local import CustomPackage, load_func, STAGE_BUCKETS
+from .metrics import Histogram
+
+React = Callable[[np.ndarray], Sequence[Any]]
+
+
+def _arrays(shm: SharedMemory, num_envs: int, shape: Tuple[int, ...], dtype: str) -> Tuple[np.ndarray, ...]:
+    rewards = np.ndarray((num_envs,), dtype=np.float64, buffer=shm.buf)
+    obs = np.ndarray((num_envs, *shape), dtype=dtype, buffer=shm.buf, offset=rewards.nbytes)
+    offset = rewards.nbytes + obs.nbytes
+    terminated = np.ndarray((num_envs,), dtype=np.bool_, buffer=shm.buf, offset=offset)
+    truncated = np.ndarray((num_envs,), dtype=np.bool_, buffer=shm.buf, offset=offset + num_envs)
+    return obs, rewards, terminated, truncated
+
+
+def _nbytes(num_envs: int, shape: Tuple[int, ...], dtype: str) -> int:
+    return num_envs * (int(np.prod(shape)) * np.dtype(dtype).itemsize + 8 + 2)
+
+
+def _worker(
+    index: int,
+    conn: connection.Connection,
+    simenv: Simenv,
+    engine: bytes,
+    engine_base: Optional[str],
+    funcs: Tuple[str, str, str],
+):
+    package, shm = None, None
+    try:
+        package = CustomPackage(engine, engine_base)
+        env = getattr(package.module, simenv.name)(**simenv.args)
+        CommandType = getattr(package.base or package.module, 'CommandType')
+        sifunc, oafunc, rewfunc = [load_func(code) for code in funcs]
+
+        def observe() -> AnyDict:
+            data, _ = env.monitor()
+            if not isinstance(data, dict) or 'states' not in data:
+                raise RuntimeError('Engine must report `states` in data of monitor to run locally.')
+            return data
+
+        def reset() -> Tuple[Any, np.ndarray]:
+            env.control(CommandType.EPISODE, {})
+            states = observe()['states']
+            return states, np.asarray(sifunc(states) if sifunc is not None else states)
+
+        states, inputs = reset()
+        conn.send(('ok', (inputs.shape, inputs.dtype.str)))
+        name, num_envs = conn.recv()
+        shm = SharedMemory(name)
+        obs, rewards, terminated, truncated = _arrays(shm, num_envs, inputs.shape, inputs.dtype.str)
+        obs[index] = inputs
+        conn.send(('ok', None))
+
+        while True:
+            cmd, outputs = conn.recv()
+            if cmd == 'close':
+                break
+            elif cmd == 'reset':
+                states, inputs = reset()
+                obs[index] = inputs
+                rewards[index], terminated[index], truncated[index] = 0.0, False, False
+                conn.send(('ok', {}))
+                continue
+            start = time.perf_counter()
+            actions = oafunc(outputs) if oafunc is not None else outputs
+            env.control(CommandType.STEP, {'actions': actions})
+            data = observe()
+            next_states = data['states']
+            next_inputs = np.asarray(sifunc(next_states) if sifunc is not None else next_states)
+            term, trunc = bool(data.get('terminated', False)), bool(data.get('truncated', False))
+            reward = data.get('reward', 0.0)
+            if rewfunc is not None:
+                reward = rewfunc(states, inputs, actions, outputs, next_states, next_inputs, term, trunc, reward)
+            info = {}
+            if term or trunc:
+                info['final_obs'] = next_inputs
+                states, inputs = reset()
+            else:
+                states, inputs = next_states, next_inputs
+            obs[index] = inputs
+            rewards[index] = float(reward) if not isinstance(reward, dict) else float(sum(reward.values()))
+            terminated[index], truncated[index] = term, trunc
+            info['seconds'] = time.perf_counter() - start
+            conn.send(('ok', info))
+    except Exception:
+        conn.send(('error', traceback.format_exc()))
+    finally:
+        if shm is not None:
+            del obs, rewards, terminated, truncated
+            shm.close()
+        if package is not None:
+            package.close()
+        conn.close()
+
+
+class VectorEnv:
+    """Custom engine instances stepped in worker processes, with model inputs batched in shared memory."""
+
+    def __init__(
+        self,
+        simenv: Simenv,
+        engine: Union[str, bytes],
+        num_envs: int,
+        engine_base: Optional[str] = None,
+        agent: Optional[Agent] = None,
+        context='spawn',
+    ):
+        """Start workers and reset all engines.
+
+        Args:
+            simenv: simenv config, `name` is the engine class in custom package and `args` its keyword arguments.
+            engine: custom engine package, see `CustomPackage`.
+            num_envs: number of engine instances, each in its own process.
+            engine_base: path of base module of engines, which also defines `CommandType`.
+            agent: agent config whose sifunc, oafunc and rewfunc are applied in workers, None to use raw states.
+            context: start method of worker processes.
+        """
+        if num_envs <= 0:
+            raise ValueError('num_envs must be positive.')
+        self.num_envs = num_envs
+        file = engine if isinstance(engine, bytes) else convert.pack_custom(engine)
+        funcs = (agent.sifunc, agent.oafunc, agent.rewfunc) if agent is not None else ('', '', '')
+
+        ctx = mp.get_context(context)
+        self.conns: List[connection.Connection] = []
+        self.procs: List[mp.process.BaseProcess] = []
+        self.shm: Optional[SharedMemory] = None
+        try:
+            for i in range(num_envs):
+                parent, child = ctx.Pipe()
+                proc = ctx.Process(target=_worker, args=(i, child, simenv, file, engine_base, funcs), daemon=True)
+                proc.start()
+                child.close()
+                self.conns.append(parent)
+                self.procs.append(proc)
+            specs = [self.__recv(i) for i in range(num_envs)]
+            shape, dtype = specs[0]
+            for spec in specs[1:]:
+                if spec != (shape, dtype):
+                    raise RuntimeError(f'Engines report inputs of different shapes or dtypes: {specs[0]} and {spec}.')
+            self.shm = SharedMemory(create=True, size=max(_nbytes(num_envs, shape, dtype), 1))
+            self.obs, self.rewards, self.terminated, self.truncated = _arrays(self.shm, num_envs, shape, dtype)
+            self.rewards[:], self.terminated[:], self.truncated[:] = 0.0, False, False
+            for conn in self.conns:
+                conn.send((self.shm.name, num_envs))
+            for i in range(num_envs):
+                self.__recv(i)
+        except Exception:
+            self.close()
+            raise
+
+        self.pending: Dict[int, float] = {}
+        self.latency = Histogram(STAGE_BUCKETS)
+        self.react_latency = Histogram(STAGE_BUCKETS)
+        self.env_steps = 0
+        self.episodes = 0
+        self.returns: List[float] = []
+        self.running_returns = np.zeros(num_envs)
+        self.seconds = 0.0
+
+    def close(self):
+        for conn, proc in zip(self.conns, self.procs):
+            try:
+                conn.send(('close', None))
+            except (BrokenPipeError, OSError):
+                pass
+            proc.join(timeout=5)
+            if proc.is_alive():
+                proc.terminate()
+            conn.close()
+        self.conns, self.procs = [], []
+        if self.shm is not None:
+            self.obs = self.rewards = self.terminated = self.truncated = None
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def reset(self) -> np.ndarray:
+        """Start new episodes of all engines.
+
+        Returns:
+            Inputs of all engines, a view of shared memory overwritten by later steps.
+        """
+        self.__check_idle()
+        for conn in self.conns:
+            conn.send(('reset', None))
+        for i in range(self.num_envs):
+            self.__recv(i)
+        self.running_returns[:] = 0.0
+        return self.obs
+
+    def step(self, outputs: Sequence[Any]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, List[AnyDict]]:
+        """Step all engines in lockstep.
+
+        Args:
+            outputs: model outputs of every engine.
+
+        Returns:
+            Inputs, rewards, terminated and truncated flags of all engines, views of shared memory.
+            Infos of all engines, with `final_obs` of engines that were reset.
+        """
+        if len(outputs) != self.num_envs:
+            raise ValueError(f'{self.num_envs} outputs expected, got {len(outputs)}.')
+        self.step_async({i: output for i, output in enumerate(outputs)})
+        infos = self.step_wait(self.num_envs)
+        return self.obs, self.rewards, self.terminated, self.truncated, [infos[i] for i in range(self.num_envs)]
+
+    def step_async(self, outputs: Dict[int, Any]):
+        """Send model outputs to some idle engines without waiting.
+
+        Args:
+            outputs: model outputs keyed by index of engine.
+        """
+        now = time.perf_counter()
+        for i, output in outputs.items():
+            if i in self.pending:
+                raise RuntimeError(f'Engine {i} is still stepping.')
+            self.conns[i].send(('step', output))
+            self.pending[i] = now
+
+    def step_wait(self, min_ready=1, timeout: Optional[float] = None) -> Dict[int, AnyDict]:
+        """Wait for stepping engines.
+
+        Args:
+            min_ready: number of engines to wait for, capped by number of stepping engines.
+            timeout: seconds to wait, None to wait forever.
+
+        Returns:
+            Infos keyed by index of finished engines, whose rows of shared arrays are up to date.
+        """
+        min_ready = min(min_ready, len(self.pending))
+        deadline = None if timeout is None else time.monotonic() + timeout
+        infos: Dict[int, AnyDict] = {}
+        index = {id(self.conns[i]): i for i in self.pending}
+        while len(infos) < min_ready or len(infos) == 0 and len(self.pending) > 0:
+            left = None if deadline is None else max(deadline - time.monotonic(), 0)
+            ready = connection.wait([self.conns[i] for i in self.pending], timeout=left)
+            if len(ready) == 0:
+                break
+            for conn in ready:
+                i = index[id(conn)]
+                infos[i] = self.__recv(i)
+                self.latency.observe(time.perf_counter() - self.pending.pop(i))
+                self.env_steps += 1
+                self.running_returns[i] += self.rewards[i]
+                if self.terminated[i] or self.truncated[i]:
+                    self.episodes += 1
+                    self.returns.append(float(self.running_returns[i]))
+                    self.running_returns[i] = 0.0
+        return infos
+
+    def run(self, react: React, steps: int, asynchronous=False, min_ready=1) -> AnyDict:
+        """Drive all engines with a batched model.
+
+        Args:
+            react: function mapping a batch of inputs to a sequence of outputs, e.g. `react` of a batched model.
+            steps: number of engine steps to run in total.
+            asynchronous: whether to react on engines as soon as `min_ready` of them finished, instead of lockstep.
+            min_ready: minimum batch size in asynchronous mode.
+
+        Returns:
+            Report of all steps so far, see `report`.
+        """
+        start, target = time.perf_counter(), self.env_steps + steps
+        idle = list(range(self.num_envs))
+        while True:
+            budget = target - self.env_steps - len(self.pending)
+            batch = idle[:budget] if budget > 0 else []
+            if len(batch) > 0:
+                t = time.perf_counter()
+                outputs = react(self.obs[batch])
+                self.react_latency.observe(time.perf_counter() - t)
+                self.step_async({i: output for i, output in zip(batch, outputs)})
+            idle = idle[len(batch):]
+            if len(self.pending) == 0:
+                break
+            infos = self.step_wait(min_ready if asynchronous else len(self.pending))
+            idle.extend(sorted(infos))
+        self.seconds += time.perf_counter() - start
+        return self.report()
+
+    def report(self) -> AnyDict:
+        """Throughput and latency of all steps so far.
+
+        Returns:
+            Counts of engine steps and episodes, steps per second, episode returns, and latencies in seconds.
+        """
+        return {
+            'num_envs': self.num_envs,
+            'env_steps': self.env_steps,
+            'episodes': self.episodes,
+            'seconds': self.seconds,
+            'steps_per_sec': self.env_steps / self.seconds if self.seconds > 0 else 0.0,
+            'returns': list(self.returns),
+            'step_latency': self.latency.to_dict(),
+            'react_latency': self.react_latency.to_dict(),
+        }
+
+    def __recv(self, i: int) -> Any:
+        status, payload = self.conns[i].recv()
+        if status == 'error':
+            raise RuntimeError(f'Engine {i} failed:\n{payload}')
+        return payload
+
+    def __check_idle(self):
+        if len(self.pending) > 0:
+            raise RuntimeError('Some engines are still stepping, call step_wait() first.')
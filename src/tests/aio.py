@@ -0,0 +1,56 @@
+import asyncio
+import json
+import unittest
+
+from src.rlsdk.configs import Service, Agent, Simenv
+from src.rlsdk.aio import AsyncClient
+
+
+class AsyncClientTestCase(unittest.IsolatedAsyncioTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.address = 'localhost:10000'
+        cls.path = 'src/tests/examples'
+
+    async def asyncSetUp(self):
+        self.client = AsyncClient(self.address)
+        await self.client.connect()
+
+    async def asyncTearDown(self):
+        await self.client.close()
+
+    async def test_00_registerservice(self):
+        with open(f'{self.path}/services.json', 'r') as f:
+            services = json.load(f)
+        services = {id: Service(**services[id]) for id in services}
+        await self.client.register_service(services=services)
+        services = await self.client.get_service_info(ids=[])
+        self.assertIn('agent', services)
+        self.assertIn('simenv', services)
+
+    async def test_01_configs(self):
+        await self.client.reset_service(ids=[])
+        agents = {'agent': Agent.from_files(f'{self.path}/agent')}
+        simenvs = {'simenv': Simenv.from_files(f'{self.path}/simenv')}
+        await asyncio.gather(
+            self.client.set_agent_config(agents=agents),
+            self.client.set_simenv_config(simenvs=simenvs),
+        )
+        agents, simenvs = await asyncio.gather(
+            self.client.get_agent_config(ids=[]),
+            self.client.get_simenv_config(ids=[]),
+        )
+        self.assertIn('agent', agents)
+        self.assertIn('simenv', simenvs)
+
+    async def test_02_concurrent(self):
+        results = await asyncio.gather(*[self.client.get_model_weights(ids=['agent']) for _ in range(16)])
+        for weights in results:
+            self.assertIn('agent', weights)
+        infos = await self.client.sim_monitor(ids=[])
+        self.assertIn('simenv', infos)
+
+    async def test_03_call(self):
+        data = await self.client.call(data={'simenv': ('test', '', b'')})
+        self.assertEqual(data['simenv'][0], 'test')
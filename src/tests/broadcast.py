@@ -0,0 +1,79 @@
+import time
+import unittest
+
+import numpy as np
+
+from src.rlsdk import broadcast
+from src.rlsdk import testing
+from src.rlsdk.configs import Agent
+from src.rlsdk.task import Task
+
+
+class BroadcastTestCase(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.cluster = testing.StandInCluster(agents=6)
+        agent = Agent.from_files('src/tests/examples/agent')
+        cls.task = Task(dict(cls.cluster.services), {id: agent for id in cls.cluster.services})
+        cls.task.push(cls.cluster.address, reset=True)
+        cls.followers = [f'agent{i}' for i in range(1, 6)]
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.task.close()
+        cls.cluster.stop()
+
+    def setUp(self):
+        for id in self.followers:
+            self.cluster.models[id].weights = None
+
+    def assertFollowers(self, value: float):
+        for id in self.followers:
+            np.testing.assert_array_equal(self.cluster.models[id].weights['w'], np.full(3, value))
+
+    def test_00_tree(self):
+        roots = broadcast.relay_tree([(f'a{i}', '') for i in range(7)], 2)
+        self.assertEqual([root['id'] for root in roots], ['a0', 'a1'])
+        self.assertEqual([child['id'] for child in roots[0]['children']], ['a2', 'a3'])
+        self.assertEqual([child['id'] for child in roots[1]['children']], ['a4', 'a5'])
+        self.assertEqual([child['id'] for child in roots[0]['children'][0]['children']], ['a6'])
+
+    def test_01_broadcast(self):
+        self.task.set_weights('agent0', {'w': np.full(3, 1.0)})
+        with broadcast.WeightBroadcaster(self.task, 'agent0', interval=60) as broadcaster:
+            pass
+        self.assertEqual(broadcaster.broadcasts, 1)
+        self.assertFollowers(1.0)
+
+    def test_02_relay(self):
+        self.task.set_weights('agent0', {'w': np.full(3, 2.0)})
+        broadcaster = broadcast.WeightBroadcaster(self.task, 'agent0', interval=60, relay=2)
+        self.assertEqual(broadcaster.broadcast(), {})
+        broadcaster.close()
+        self.assertFollowers(2.0)
+
+    def test_03_steps(self):
+        self.task.set_weights('agent0', {'w': np.full(3, 3.0)})
+        self.task.set_status('agent0', {'steps': 0})
+        broadcaster = broadcast.WeightBroadcaster(self.task, 'agent0', every=10)
+        self.assertTrue(broadcaster.due())
+        broadcaster.broadcast()
+        self.task.set_status('agent0', {'steps': 5})
+        self.assertFalse(broadcaster.due())
+        self.task.set_status('agent0', {'steps': 12})
+        self.assertTrue(broadcaster.due())
+        stats = broadcaster.stats()
+        self.assertEqual(stats['staleness_steps'], 12)
+        payload = self.task.client.get_model_weights_bytes(['agent0'])['agent0']
+        self.assertEqual(stats['bytes'], 5 * len(payload))
+        broadcaster.close()
+        self.assertFollowers(3.0)
+
+    def test_04_background(self):
+        self.task.set_weights('agent0', {'w': np.full(3, 4.0)})
+        with broadcast.WeightBroadcaster(self.task, 'agent0', interval=0.01, poll_interval=0.01) as broadcaster:
+            time.sleep(0.2)
+        self.assertGreater(broadcaster.stats()['broadcasts'], 1)
+        self.assertEqual(broadcaster.stats()['failures'], 0)
+        self.assertFollowers(4.0)
@@ -0,0 +1,149 @@
+import tempfile
+import unittest
+
+import numpy as np
+
+from src.rlsdk import buffers
+from src.rlsdk import convert
+from src.rlsdk import tensors
+from src.rlsdk.buffers import MinTree, PrioritizedReplayBuffer, ReplayBuffer, SumTree, is_replay
+from src.rlsdk.configs.models import DQN
+
+
+def transition(i: int):
+    return np.full(4, i, dtype=np.float32), i % 2, np.full(4, i + 1, dtype=np.float32), float(i), i % 5 == 4, False
+
+
+class ReplayBufferTestCase(unittest.TestCase):
+
+    def test_00_ring(self):
+        buffer = ReplayBuffer(8, seed=0)
+        for i in range(10):
+            self.assertEqual(buffer.add(*transition(i)), i % 8)
+        self.assertTrue(buffer.full)
+        self.assertEqual(len(buffer), 8)
+        self.assertEqual(buffer.pos, 2)
+        np.testing.assert_array_equal(buffer.columns['reward'], [8, 9, 2, 3, 4, 5, 6, 7])
+        self.assertEqual(buffer.columns['states'].dtype, np.float32)
+        self.assertEqual(buffer.columns['states'].shape, (8, 4))
+
+        batch = buffer.sample(32)
+        self.assertEqual(batch['states'].shape, (32, 4))
+        np.testing.assert_array_equal(batch['states'][:, 0], batch['reward'])
+        np.testing.assert_array_equal(batch['next_states'][:, 0], batch['reward'] + 1)
+
+    def test_01_extend(self):
+        buffer = ReplayBuffer(8)
+        batch = {name: np.stack(values) for name, values in zip(
+            ('states', 'actions', 'next_states', 'reward', 'terminated', 'truncated'),
+            zip(*[transition(i) for i in range(11)]),
+        )}
+        buffer.add(*transition(100))
+        indices = buffer.extend(batch)
+        np.testing.assert_array_equal(indices, [4, 5, 6, 7, 0, 1, 2, 3])
+        np.testing.assert_array_equal(buffer.columns['reward'], [7, 8, 9, 10, 3, 4, 5, 6])
+        self.assertEqual(buffer.pos, 4)
+        with self.assertRaises(ValueError):
+            buffer.extend({'states': batch['states']})
+
+    def test_02_serialize(self):
+        buffer = ReplayBuffer(8)
+        for i in range(10):
+            buffer.add(*transition(i))
+        data = convert.dumps(buffer, format='tensor')
+        self.assertTrue(tensors.is_tensors(data))
+        self.assertTrue(is_replay(convert.loads(data)))
+        self.assertFalse(tensors.is_tensors(convert.dumps(buffer)))
+        self.assertEqual(convert.loads(convert.dumps(buffer))['size'], 8)
+
+        copy = ReplayBuffer.from_dict(convert.loads(data))
+        self.assertEqual((copy.pos, copy.size), (2, 8))
+        np.testing.assert_array_equal(copy.columns['states'], buffer.columns['states'])
+
+        bigger = ReplayBuffer(16)
+        bigger.load_dict(convert.loads(data))
+        np.testing.assert_array_equal(bigger.columns['reward'][:8], np.arange(2, 10))
+        self.assertEqual(bigger.pos, 8)
+        with self.assertRaises(ValueError):
+            ReplayBuffer(4).load_dict(buffer.to_dict())
+
+    def test_03_dtype(self):
+        buffer = ReplayBuffer(8)
+        with self.assertRaises(TypeError):
+            buffer.add({'pos': 0}, 1, {'pos': 1}, 0.0, False, False)
+        self.assertEqual(buffer.columns, {})
+        with self.assertRaises(TypeError):
+            ReplayBuffer(8, specs={name: ((), 'U4') for name in buffers.COLUMNS})
+
+    def test_04_memmap(self):
+        with tempfile.TemporaryDirectory() as path:
+            with ReplayBuffer(8, path=path) as buffer:
+                for i in range(5):
+                    buffer.add(*transition(i))
+                self.assertIsInstance(buffer.columns['states'], np.memmap)
+            with ReplayBuffer(8, path=path) as buffer:
+                self.assertEqual((buffer.pos, buffer.size), (5, 5))
+                np.testing.assert_array_equal(buffer.columns['reward'][:5], np.arange(5))
+                buffer.add(*transition(5))
+            with self.assertRaises(ValueError):
+                ReplayBuffer(16, path=path)
+            buffer = ReplayBuffer(8, path=path)
+            self.assertEqual(len(buffer), 6)
+            buffer.close()
+
+
+class PrioritizedReplayBufferTestCase(unittest.TestCase):
+
+    def test_00_trees(self):
+        sums, mins = SumTree(5), MinTree(5)
+        sums.update([0, 1, 2, 3, 4], [1.0, 2.0, 3.0, 4.0, 0.0])
+        mins.update([0, 1, 2, 3, 4], [1.0, 2.0, 3.0, 4.0, 0.5])
+        self.assertEqual(sums.root, 10.0)
+        self.assertEqual(mins.root, 0.5)
+        np.testing.assert_array_equal(sums.find([0.0, 0.99, 1.0, 2.5, 3.0, 6.0, 9.99]), [0, 0, 1, 1, 2, 3, 3])
+        sums.update([1, 1], [5.0, 0.0])
+        self.assertEqual(sums.root, 8.0)
+        single = SumTree(1)
+        single.update([0], [2.0])
+        np.testing.assert_array_equal(single.find([0.0, 1.9]), [0, 0])
+
+    def test_01_sample(self):
+        buffer = PrioritizedReplayBuffer(8, seed=0, alpha=1.0, beta=0.5, beta_anneal=10)
+        for i in range(6):
+            buffer.add(*transition(i))
+        batch = buffer.sample(6)
+        self.assertEqual(set(batch['indices']), set(range(6)))
+        np.testing.assert_allclose(batch['weights'], np.ones(6))
+
+        buffer.update_priorities(np.arange(6), [0, 0, 0, 0, 0, 9])
+        batch = buffer.sample(100)
+        self.assertGreater(np.mean(batch['indices'] == 5), 0.99)
+        self.assertTrue(np.all(batch['weights'] <= 1.0))
+        self.assertLess(batch['weights'].min(), 1e-2)
+        np.testing.assert_array_equal(batch['reward'], batch['indices'].astype(float))
+        self.assertAlmostEqual(buffer.beta, 0.6)
+
+        self.assertEqual(buffer.add(*transition(6)), 6)
+        self.assertAlmostEqual(buffer.sums.get([6])[0], 9.0, places=4)
+
+    def test_02_serialize(self):
+        buffer = PrioritizedReplayBuffer(8, alpha=0.5)
+        for i in range(4):
+            buffer.add(*transition(i))
+        buffer.update_priorities([2], [4.0])
+        copy = PrioritizedReplayBuffer.from_dict(convert.loads(convert.dumps(buffer)), seed=0)
+        self.assertEqual(copy.sums.root, buffer.sums.root)
+        self.assertEqual(copy.max_priority, buffer.max_priority)
+        uniform = ReplayBuffer.from_dict(convert.loads(convert.dumps(buffer)))
+        self.assertEqual(len(uniform), 4)
+
+    def test_03_config(self):
+        config = DQN(obs_dim=4, act_num=2, buffer_size=16, prioritized=True, beta=0.5, beta_anneal=100)
+        buffer = buffers.from_config(config)
+        self.assertIsInstance(buffer, PrioritizedReplayBuffer)
+        self.assertEqual((buffer.capacity, buffer.beta), (16, 0.5))
+        self.assertNotIsInstance(buffers.from_config(DQN(obs_dim=4, act_num=2)), PrioritizedReplayBuffer)
+        self.assertEqual(config.dump()['beta_anneal'], 100)
+        self.assertFalse({'prioritized', 'alpha', 'beta', 'beta_anneal'} & set(DQN(obs_dim=4, act_num=2).dump()))
+        with self.assertRaises(ValueError):
+            DQN(obs_dim=4, act_num=2, alpha=2.0)
@@ -0,0 +1,90 @@
+import collections
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from src.rlsdk import checkpoint
+from src.rlsdk import tensors
+from src.rlsdk import testing
+from src.rlsdk.configs import Agent, Simenv
+from src.rlsdk.task import Task
+
+
+class CheckpointTestCase(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.cluster = testing.StandInCluster(agents=2, simenvs=1)
+        agent = Agent.from_files('src/tests/examples/agent')
+        simenv = Simenv.from_files('src/tests/examples/simenv')
+        cls.task = Task(dict(cls.cluster.services), {'agent0': agent, 'agent1': agent}, {'simenv0': simenv})
+        cls.task.push(cls.cluster.address, reset=True)
+        cls.tmpdir = tempfile.TemporaryDirectory()
+        cls.path = cls.tmpdir.name
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.task.close()
+        cls.cluster.stop()
+        cls.tmpdir.cleanup()
+
+    def test_00_save_load(self):
+        obj = {'a': np.arange(6.0).reshape(2, 3), 'b': [np.int64(3), 'x', np.zeros(0)], 'c': (1.5, None)}
+        entry = checkpoint.save(f'{self.path}/obj', obj)
+        self.assertEqual(entry['format'], 'npy')
+        loaded = checkpoint.load(f'{self.path}/obj', entry)
+        self.assertIsInstance(loaded['a'], np.memmap)
+        np.testing.assert_array_equal(loaded['a'], obj['a'])
+        self.assertEqual(loaded['b'][:2], [3, 'x'])
+        self.assertEqual(loaded['c'], (1.5, None))
+        entry = checkpoint.save(f'{self.path}/obj', collections.deque([1, 2]), entry)
+        self.assertEqual(entry['format'], 'pickle')
+        self.assertEqual(os.listdir(f'{self.path}/obj'), ['data.pkl'])
+        self.assertEqual(checkpoint.load(f'{self.path}/obj', entry), collections.deque([1, 2]))
+
+    def test_01_checkpoint(self):
+        self.task.set_weights('agent0', {'w': np.arange(8.0), 'b': np.ones(2)})
+        self.task.set_buffer('agent0', {'obs': np.zeros((4, 2)), 'size': 4})
+        self.task.set_status('agent0', {'steps': 100})
+        manifest = self.task.checkpoint(self.path)
+        self.assertTrue(manifest['complete'])
+        self.assertEqual(manifest['states']['agent0']['status'], {'steps': 100})
+        self.assertEqual(checkpoint.read_manifest(self.path), manifest)
+
+    def test_02_incremental(self):
+        files = [f'{self.path}/agent0/weights/{i}.npy' for i in range(2)]
+        mtimes = [os.stat(file).st_mtime_ns for file in files]
+        self.task.set_weights('agent0', {'w': np.arange(8.0), 'b': np.zeros(2)})
+        self.task.checkpoint(self.path)
+        self.assertEqual(os.stat(files[0]).st_mtime_ns, mtimes[0])
+        self.assertNotEqual(os.stat(files[1]).st_mtime_ns, mtimes[1])
+
+    def test_03_restore(self):
+        self.task.set_weights('agent0', {'w': np.zeros(1)})
+        self.task.set_status('agent0', {})
+        self.task.restore(self.path)
+        self.assertIs(type(self.cluster.models['agent0'].weights['b']), np.ndarray)
+        self.assertIs(type(self.cluster.models['agent0'].buffer['obs']), np.ndarray)
+        np.testing.assert_array_equal(self.task.get_weights('agent0')['b'], np.zeros(2))
+        np.testing.assert_array_equal(self.task.get_buffer('agent0')['obs'], np.zeros((4, 2)))
+        self.assertEqual(self.task.get_status('agent0'), {'steps': 100})
+        task = Task.from_checkpoint(self.path)
+        self.assertEqual(set(task.services), {'agent0', 'agent1', 'simenv0'})
+        self.assertEqual(task.agents['agent1'].digest(), self.task.agents['agent1'].digest())
+        with self.assertRaises(FileNotFoundError):
+            Task.from_checkpoint(f'{self.path}/missing')
+
+    def test_04_restore_format(self):
+        model = self.cluster.models['agent0']
+        payloads = []
+        model.set_buffer_bytes = lambda data: payloads.append(data) or type(model).set_buffer_bytes(model, data)
+        try:
+            self.task.restore(self.path, weights=False, status=False)
+            self.task.restore(self.path, weights=False, status=False, format='tensor')
+        finally:
+            del model.set_buffer_bytes
+        self.assertFalse(tensors.is_tensors(payloads[0]))
+        self.assertTrue(tensors.is_tensors(payloads[1]))
+        np.testing.assert_array_equal(self.task.get_buffer('agent0')['obs'], np.zeros((4, 2)))
@@ -0,0 +1,105 @@
+import asyncio
+import json
+import time
+import unittest
+
+import grpc
+import numpy as np
+
+from src.rlsdk import chunks
+from src.rlsdk import testing
+from src.rlsdk.aio import AsyncClient
+from src.rlsdk.client import Client
+
+
+class ChunksTestCase(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.buffer = {'ptr': 7, 'states': np.random.rand(5 * 1024 * 1024 // 8)}
+        cls.models = {'agent': testing.StandInModel(buffer=cls.buffer), 'legacy': testing.StandInModel()}
+        cls.models['legacy'].call = lambda name, dstr='', dbin=b'': (name, '', b'')
+        cls.server, cls.address = testing.serve(testing.BFFStandIn(cls.models), max_msg_len=64)
+        cls.client = Client(cls.address, max_msg_len=1)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop(None)
+
+    def test_00_split(self):
+        payload = bytes(range(256)) * 10
+        reqs = list(chunks.split(payload, 1000))
+        self.assertEqual(len(reqs), 3)
+        self.assertEqual(b''.join(req[2] for req in reqs), payload)
+        self.assertEqual(len(list(chunks.split(b'', 1000))), 1)
+
+    def test_01_toolarge(self):
+        with self.assertRaises(grpc.RpcError):
+            self.client.get_model_buffer(ids=['agent'])
+
+    def test_02_getbuffer(self):
+        buffers = self.client.get_model_buffer(ids=['agent'], chunk_size=256 * 1024)
+        self.assertEqual(buffers['agent']['ptr'], 7)
+        np.testing.assert_array_equal(buffers['agent']['states'], self.buffer['states'])
+
+    def test_03_setbuffer(self):
+        buffer = {'ptr': 8, 'states': np.random.rand(3 * 1024 * 1024 // 8)}
+        for format in ['pickle', 'tensor']:
+            self.client.set_model_buffer({'agent': buffer}, format=format, chunk_size=300 * 1024)
+            np.testing.assert_array_equal(self.models['agent'].buffer['states'], buffer['states'])
+        self.models['agent'].buffer = self.buffer
+
+    def test_04_unsupported(self):
+        with self.assertRaises(RuntimeError):
+            self.client.get_model_buffer(ids=['legacy'], chunk_size=1024)
+
+    def test_05_async(self):
+
+        async def roundtrip():
+            async with AsyncClient(self.address, max_msg_len=1) as client:
+                buffers = await client.get_model_buffer(ids=['agent'], chunk_size=512 * 1024)
+                await client.set_model_buffer(buffers, chunk_size=512 * 1024)
+                return buffers
+
+        buffers = asyncio.run(roundtrip())
+        np.testing.assert_array_equal(buffers['agent']['states'], self.buffer['states'])
+
+    def test_06_expire(self):
+        handler = chunks.ChunkHandler(lambda: bytes(100), lambda data: None, ttl=0.05)
+        handler(json.dumps({'op': 'set', 'xfer': 'dead', 'seq': 0, 'size': 10, 'total': 2, 'nbytes': 20}), bytes(10))
+        handler(json.dumps({'op': 'get', 'xfer': 'idle', 'seq': 0, 'size': 10}), b'')
+        self.assertIn('dead', handler.receiving)
+        self.assertIn('idle', handler.sending)
+
+        time.sleep(0.1)
+        dstr, _ = handler(json.dumps({'op': 'get', 'xfer': 'live', 'seq': 0, 'size': 10}), b'')
+        self.assertNotIn('error', json.loads(dstr))
+        self.assertEqual(list(handler.sending), ['live'])
+        self.assertEqual(list(handler.receiving), [])
+        dstr, _ = handler(json.dumps({'op': 'get', 'xfer': 'idle', 'seq': 1, 'size': 10}), b'')
+        self.assertIn('error', json.loads(dstr))
+
+    def test_07_gaps(self):
+        loaded = []
+        handler = chunks.ChunkHandler(lambda: b'', loaded.append)
+
+        def send(xfer, seq, total, nbytes):
+            head = {'op': 'set', 'xfer': xfer, 'seq': seq, 'size': 10, 'total': total, 'nbytes': nbytes}
+            return json.loads(handler(json.dumps(head), bytes(range(seq * 10, seq * 10 + 10)))[0])
+
+        send('gap', 0, 3, 30)
+        self.assertIn('error', send('gap', 2, 3, 30))
+        self.assertNotIn('gap', handler.receiving)
+
+        send('retry', 0, 3, 30)
+        send('retry', 1, 3, 30)
+        self.assertIn('error', send('retry', 1, 3, 30))
+        self.assertNotIn('retry', handler.receiving)
+
+        send('short', 0, 2, 30)
+        self.assertIn('error', send('short', 1, 2, 30))
+        self.assertEqual(loaded, [])
+
+        send('full', 0, 2, 20)
+        self.assertNotIn('error', send('full', 1, 2, 20))
+        self.assertEqual(loaded, [bytearray(range(20))])
@@ -0,0 +1,73 @@
+import unittest
+
+import numpy as np
+
+from src.rlsdk import convert
+from src.rlsdk.codec import SimCodec
+from src.rlsdk.configs import Simenv
+
+
+class CodecTestCase(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.simenv = Simenv.from_files('src/tests/examples/simenv')
+        cls.codec = SimCodec.from_simenv(cls.simenv)
+        cls.states = {
+            'example_uav': [{
+                'longitude': 122.0 + i,
+                'latitude': 26.5,
+                'altitude': 1000.0,
+                'speed': 200.0,
+                'azimuth': 45.0,
+            } for i in range(3)],
+            'example_sub': [{
+                'longitude': 122.75,
+                'latitude': 26.75,
+                'altitude': 0.0,
+                'speed': 20.0,
+                'azimuth': 90.0,
+                'example_struct': {
+                    'field1': True,
+                    'field2': 1
+                },
+                'example_array': [1, 2, 3],
+                'example_combine': [],
+                'example_nest': {
+                    'field1': False
+                },
+            }],
+        }
+
+    def test_00_decode(self):
+        states, terminated, truncated, reward = self.codec.decode_state(
+            convert.encode_sim_state(self.states, terminated=True, reward=2.0))
+        self.assertTrue(terminated)
+        self.assertFalse(truncated)
+        self.assertEqual(reward, 2.0)
+        uav = states['example_uav']
+        self.assertEqual(uav.shape, (3,))
+        self.assertEqual(uav.dtype['longitude'], np.float64)
+        np.testing.assert_array_equal(uav['longitude'], [122.0, 123.0, 124.0])
+        sub = states['example_sub']
+        self.assertEqual(sub['example_array'][0], [1, 2, 3])
+        self.assertEqual(sub['example_struct'][0], {'field1': True, 'field2': 1})
+
+    def test_01_missing(self):
+        codec = SimCodec({'m': {'modelid': '', 'inputs': [], 'outputs': ['a', 'b']}}, state_dtypes={'m': {'b': 'i4'}})
+        states = codec.decode(convert.encode_sim_state({'m': [{'a': 1.5}, {'a': 2.5, 'b': 3}]}))
+        np.testing.assert_array_equal(states['m']['a'], [1.5, 2.5])
+        np.testing.assert_array_equal(states['m']['b'], [0, 3])
+
+    def test_02_encode(self):
+        actions = np.zeros(2, dtype=[('azimuth', 'f8'), ('example_struct', 'O'), ('example_array', 'O')])
+        actions['azimuth'] = [45.0, 90.0]
+        actions['example_struct'][:] = [{'field1': True}, {'field1': False}]
+        actions['example_array'][0], actions['example_array'][1] = [1.0], []
+        decoded = convert.decode_sim_action(self.codec.encode({'example_uav': actions}))
+        self.assertEqual(decoded['example_uav'][1]['azimuth'], 90.0)
+        self.assertEqual(decoded['example_uav'][0]['example_struct'], {'field1': True})
+        self.assertEqual(decoded['example_uav'][0]['example_array'], [1.0])
+
+        decoded = convert.decode_sim_action(self.codec.encode({'example_uav': {'azimuth': np.array([1, 2])}}))
+        self.assertEqual([e['azimuth'] for e in decoded['example_uav']], [1, 2])
@@ -0,0 +1,36 @@
+import io
+import unittest
+import zipfile
+
+from src.rlsdk import convert
+from src.rlsdk import testing
+from src.rlsdk.client import Client
+
+
+class CustomTestCase(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.bff, cls.address = testing.serve(testing.BFFStandIn({'agent': testing.StandInModel()}))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.bff.stop(None)
+
+    def test_00_pack(self):
+        file = convert.pack_custom('src/tests/examples/simenv/custom')
+        self.assertEqual(file, convert.pack_custom('src/tests/examples/simenv/custom'))
+        with zipfile.ZipFile(io.BytesIO(file)) as zf:
+            names = zf.namelist()
+            self.assertEqual(names, ['custom/', 'custom/__init__.py', 'custom/custom.py'])
+            self.assertEqual(zf.getinfo('custom/custom.py').compress_type, zipfile.ZIP_DEFLATED)
+        with zipfile.ZipFile(io.BytesIO(convert.pack_custom('src/tests/examples/agent/custom.py'))) as zf:
+            self.assertEqual(zf.namelist(), ['custom.py'])
+
+    def test_01_upload(self):
+        with Client(self.address) as client:
+            self.assertEqual(client.upload_custom_model('src/tests/examples/agent/custom.py'), ['agent'])
+            self.assertEqual(client.upload_custom_model('src/tests/examples/agent/custom.py'), [])
+            self.assertEqual(client.upload_custom_model('src/tests/examples/agent/custom.py', force=True), ['agent'])
+            client.reset_service(['agent'])
+            self.assertEqual(client.upload_custom(['agent'], 'src/tests/examples/agent/custom.py'), ['agent'])
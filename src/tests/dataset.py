@@ -0,0 +1,92 @@
+import importlib.util
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from src.rlsdk import dataset
+from src.rlsdk import testing
+from src.rlsdk.buffers import ReplayBuffer
+from src.rlsdk.configs import Agent
+from src.rlsdk.task import Task
+
+HAS_ARROW = importlib.util.find_spec('pyarrow') is not None
+
+
+def replay(capacity: int, n: int, start: int) -> ReplayBuffer:
+    buffer = ReplayBuffer(capacity)
+    for i in range(start, start + n):
+        buffer.add(np.full(2, i, dtype=np.float32), i % 3, np.full(2, i + 1, dtype=np.float32), float(i), False, False)
+    return buffer
+
+
+class DatasetTestCase(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.cluster = testing.StandInCluster(agents=3)
+        agent = Agent.from_files('src/tests/examples/agent')
+        cls.task = Task(dict(cls.cluster.services), {id: agent for id in cls.cluster.services})
+        cls.task.push(cls.cluster.address, reset=True)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.task.close()
+        cls.cluster.stop()
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = self.tmpdir.name
+        self.task.set_buffer('agent0', replay(8, 10, 0))
+        self.task.set_buffer('agent1', replay(8, 5, 100))
+        self.task.set_buffer('agent2', None)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_00_segments(self):
+        parts = dataset.segments(replay(8, 10, 0).to_dict())
+        np.testing.assert_array_equal(np.concatenate([part['reward'] for part in parts]), np.arange(2, 10))
+        parts = dataset.segments({'obs': np.zeros((6, 2)), 'act': np.ones(6), 'size': 4})
+        self.assertEqual(len(parts[0]['obs']), 4)
+        self.assertEqual(dataset.segments(None), [])
+        with self.assertRaises(ValueError):
+            dataset.segments({'obs': np.zeros((6, 2)), 'act': np.ones(5)})
+
+    def test_01_merge(self):
+        manifest = self.task.export_dataset([], self.path, shard_rows=4)
+        self.assertEqual(manifest['rows'], 13)
+        self.assertEqual(manifest['sources'], ['agent0', 'agent1'])
+        self.assertEqual([shard['rows'] for shard in manifest['shards']], [4, 4, 4, 1])
+        self.assertEqual(manifest['shards'][1]['sources'], {'agent0': 4})
+        self.assertEqual(manifest['shards'][2]['sources'], {'agent1': 4})
+        self.assertEqual(manifest['columns']['states'], {'dtype': '<f4', 'shape': [2]})
+        self.assertEqual(dataset.read_manifest(self.path), manifest)
+        shards = list(dataset.iterate(self.path))
+        reward = np.concatenate([shard['reward'] for shard in shards])
+        np.testing.assert_array_equal(reward, [*range(2, 10), *range(100, 105)])
+        agent = np.concatenate([shard['agent'] for shard in shards])
+        np.testing.assert_array_equal(agent, [0] * 8 + [1] * 5)
+        self.assertEqual(set(shards[0]), {'states', 'actions', 'next_states', 'reward', 'terminated', 'truncated', 'agent'})
+
+    def test_02_append(self):
+        self.task.export_dataset(['agent1'], self.path, shard_rows=4, merge=False)
+        manifest = self.task.export_dataset(['agent0', 'agent1'], self.path, shard_rows=4, merge=False)
+        self.assertEqual(manifest['rows'], 18)
+        self.assertEqual([shard['rows'] for shard in manifest['shards']], [4, 1, 4, 4, 4, 1])
+        self.assertTrue(all(len(shard['sources']) == 1 for shard in manifest['shards']))
+        self.assertEqual(sorted(os.listdir(self.path))[-1], 'shard-00005.npz')
+        self.task.set_buffer('agent0', {'obs': np.zeros((3, 2))})
+        with self.assertRaises(ValueError):
+            self.task.export_dataset(['agent0'], self.path)
+        with self.assertRaises(ValueError):
+            self.task.export_dataset(['simenv0'], self.path)
+
+    @unittest.skipUnless(HAS_ARROW, 'pyarrow not installed')
+    def test_03_arrow(self):
+        manifest = self.task.export_dataset([], self.path, shard_rows=4, format='arrow')
+        self.assertEqual(manifest['shards'][0]['file'], 'shard-00000.arrow')
+        shards = list(dataset.iterate(self.path))
+        np.testing.assert_array_equal(shards[0]['states'], np.stack([np.full(2, i, dtype=np.float32) for i in range(2, 6)]))
+        np.testing.assert_array_equal(shards[-1]['reward'], [104.0])
@@ -0,0 +1,63 @@
+import unittest
+
+import numpy as np
+
+from src.rlsdk import testing
+from src.rlsdk.client import Client
+from src.rlsdk.configs import Service
+from src.rlsdk.sync import WeightSync
+
+
+class DirectTestCase(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.model = testing.StandInModel(weights={'w': np.zeros(4)}, buffer=[], status={'steps': 0})
+        cls.agent, address = testing.serve(testing.AgentStandIn(cls.model))
+        host, port = address.rsplit(':', 1)
+        services = {'agent': Service('agent', 'agent', host, int(port), '')}
+        cls.relayed = testing.StandInModel()
+        cls.bff, cls.address = testing.serve(testing.BFFStandIn({'agent': cls.relayed}, services))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.bff.stop(None)
+        cls.agent.stop(None)
+
+    def setUp(self):
+        self.client = Client(self.address, direct=True)
+
+    def tearDown(self):
+        self.client.close()
+
+    def test_00_weights(self):
+        self.client.set_model_weights({'agent': {'w': np.arange(4.0)}}, format='tensor')
+        self.assertIsNone(self.relayed.weights)
+        np.testing.assert_array_equal(self.client.get_model_weights()['agent']['w'], np.arange(4.0))
+
+    def test_01_buffer(self):
+        self.client.set_model_buffer({'agent': [1, 2, 3]})
+        self.assertEqual(self.client.get_model_buffer(['agent']), {'agent': [1, 2, 3]})
+        self.client.set_model_buffer({'agent': list(range(1000))}, chunk_size=256)
+        self.assertEqual(self.client.get_model_buffer(['agent'], chunk_size=256), {'agent': list(range(1000))})
+        self.assertIsNone(self.relayed.buffer)
+
+    def test_02_status(self):
+        self.client.set_model_status({'agent': {'steps': 10}})
+        self.assertEqual(self.client.get_model_status(), {'agent': {'steps': 10}})
+        self.assertEqual(self.relayed.status, {})
+
+    def test_03_sync(self):
+        state = WeightSync()
+        weights = {'agent': {'w': np.ones(4), 'b': np.zeros(2)}}
+        self.client.sync_model_weights(weights, state)
+        weights['agent']['b'] = np.ones(2)
+        sent = self.client.sync_model_weights(weights, state, mode='xor')
+        self.assertLess(sent['agent'], 1024)
+        np.testing.assert_array_equal(self.model.weights['b'], np.ones(2))
+
+    def test_04_unknown(self):
+        with self.assertRaises(ValueError):
+            self.client.get_model_weights(['missing'])
+        self.client.forget_routes()
+        self.assertEqual(len(self.client.routes), 0)
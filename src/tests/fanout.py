@@ -0,0 +1,39 @@
+import unittest
+
+from src.rlsdk import testing
+from src.rlsdk.client import BatchError, Client
+
+
+class FanoutTestCase(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.models = {f'agent{i}': testing.StandInModel(weights=[i], buffer=[], status={'i': i}) for i in range(8)}
+        cls.bff, cls.address = testing.serve(testing.BFFStandIn(cls.models))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.bff.stop(None)
+
+    def setUp(self):
+        self.client = Client(self.address, fanout=4)
+
+    def tearDown(self):
+        self.client.close()
+
+    def test_00_get(self):
+        weights = self.client.get_model_weights()
+        self.assertEqual(weights, {id: model.weights for id, model in self.models.items()})
+        self.assertEqual(list(self.client.get_model_status(['agent3', 'agent1']).keys()), ['agent3', 'agent1'])
+
+    def test_01_set(self):
+        self.client.set_model_buffer({id: [id] for id in self.models})
+        self.assertEqual(self.client.get_model_buffer(), {id: [id] for id in self.models})
+        self.client.set_model_buffer({id: list(range(100)) for id in self.models}, chunk_size=64)
+        self.assertTrue(all(model.buffer == list(range(100)) for model in self.models.values()))
+
+    def test_02_errors(self):
+        with self.assertRaises(BatchError) as cm:
+            self.client.get_model_weights(['agent0', 'missing', 'agent2'])
+        self.assertEqual(cm.exception.results, {'agent0': [0], 'agent2': [2]})
+        self.assertEqual(list(cm.exception.errors.keys()), ['missing'])
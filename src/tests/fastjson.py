@@ -0,0 +1,65 @@
+import importlib.util
+import json
+import math
+import unittest
+
+import numpy as np
+
+from src.rlsdk import convert
+from src.rlsdk import fastjson
+
+from src.rlsdk.protos import simenv_pb2
+
+
+class FastJSONTestCase(unittest.TestCase):
+
+    def tearDown(self):
+        fastjson.use()
+
+    def test_00_numpy(self):
+        status = {'loss': np.float32(0.5), 'steps': np.int64(3), 'q': np.arange(3), 1: True}
+        for backend in ['orjson', 'json']:
+            try:
+                fastjson.use(backend)
+            except ImportError:
+                continue
+            decoded = fastjson.loads(fastjson.dumps(status))
+            self.assertEqual(decoded, {'loss': 0.5, 'steps': 3, 'q': [0, 1, 2], '1': True})
+        with self.assertRaises(TypeError):
+            fastjson.dumps({'obj': object()})
+
+    def test_01_backend(self):
+        fastest = 'json'
+        for name in ['ujson', 'orjson']:
+            if importlib.util.find_spec(name) is not None:
+                fastest = name
+        self.assertEqual(fastjson.backend, fastest)
+        self.assertEqual(fastjson.use('json'), 'json')
+        self.assertEqual(fastjson.backend, 'json')
+        with self.assertRaises(ValueError):
+            fastjson.use('simdjson')
+
+    def test_02_nan(self):
+        status = {'loss': float('nan'), 'max': float('inf'), 'min': -float('inf')}
+        self.assertEqual(fastjson.dumps(status), json.dumps(status))
+        for backend in ['orjson', 'ujson', 'json']:
+            try:
+                fastjson.use(backend)
+            except ImportError:
+                continue
+            decoded = fastjson.loads(json.dumps(status))
+            self.assertTrue(math.isnan(decoded['loss']))
+            self.assertEqual((decoded['max'], decoded['min']), (math.inf, -math.inf))
+            decoded = fastjson.loads(json.dumps(status).encode())
+            self.assertEqual(decoded['max'], math.inf)
+
+    def test_03_lazy(self):
+        msg = simenv_pb2.SimInfo(state='running', data='{"a": [1, 2]}', logs='["x", "y"]')
+        info = convert.decode_info(msg, lazy=True)
+        self.assertFalse(info['data'].parsed)
+        self.assertEqual(info['data']['a'], [1, 2])
+        self.assertTrue(info['data'].parsed)
+        self.assertEqual(info['data'].keys(), {'a': None}.keys())
+        self.assertEqual(info['logs'], ['x', 'y'])
+        self.assertEqual(len(info['logs']), 2)
+        self.assertEqual(convert.decode_info(msg), {'state': 'running', 'data': info['data'].value, 'logs': ['x', 'y']})
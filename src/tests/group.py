@@ -0,0 +1,66 @@
+import unittest
+
+import numpy as np
+
+from src.rlsdk import testing
+from src.rlsdk.configs import Agent, Simenv
+from src.rlsdk.group import TaskGroup
+
+
+class TaskGroupTestCase(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.clusters = [testing.StandInCluster(agents=2, simenvs=1) for _ in range(2)]
+        cls.addresses = [cluster.address for cluster in cls.clusters]
+        cls.services, cls.placement = {}, {}
+        for i, cluster in enumerate(cls.clusters):
+            for id, service in cluster.services.items():
+                cls.services[f'c{i}-{id}'] = service
+                cls.placement[f'c{i}-{id}'] = cluster.address
+        agent = Agent.from_files('src/tests/examples/agent')
+        simenv = Simenv.from_files('src/tests/examples/simenv')
+        cls.agents = {id: agent for id, s in cls.services.items() if s.type == 'agent'}
+        cls.simenvs = {id: simenv for id, s in cls.services.items() if s.type == 'simenv'}
+
+    @classmethod
+    def tearDownClass(cls):
+        for cluster in cls.clusters:
+            cluster.stop()
+
+    def setUp(self):
+        self.group = TaskGroup.shard(self.addresses, self.services, self.agents, self.simenvs, self.placement)
+        self.group.push(reset=True)
+
+    def tearDown(self):
+        self.group.close()
+
+    def test_00_shard(self):
+        self.assertTrue(self.group.inited)
+        self.assertEqual(set(self.group.tasks[self.addresses[0]].services), {'c0-agent0', 'c0-agent1', 'c0-simenv0'})
+        group = TaskGroup.shard(self.addresses, self.services, self.agents, self.simenvs)
+        self.assertEqual(sorted(len(task.services) for task in group.tasks.values()), [3, 3])
+        with self.assertRaises(ValueError):
+            TaskGroup.shard(self.addresses, self.services, self.agents, self.simenvs, {})
+
+    def test_01_details(self):
+        details = self.group.details()
+        self.assertEqual(set(details), set(self.services))
+        self.assertEqual(details['c1-simenv0']['type'], 'simenv')
+
+    def test_02_control(self):
+        self.group.init()
+        self.group.start()
+        infos = self.group.monitor()
+        self.assertEqual({infos[id]['state'] for id in self.simenvs}, {'RUNNING'})
+        self.group.stop()
+
+    def test_03_weights(self):
+        self.group.set_weights({'c0-agent0': {'w': np.arange(4.0)}})
+        sent = self.group.sync_weights('c0-agent0')
+        self.assertEqual(set(sent), {'c0-agent1', 'c1-agent0', 'c1-agent1'})
+        weights = self.group.get_weights()
+        self.assertEqual(set(weights), set(self.agents))
+        np.testing.assert_array_equal(weights['c1-agent1']['w'], np.arange(4.0))
+        with self.assertRaises(ValueError):
+            self.group.get_weights(['unknown'])
@@ -0,0 +1,110 @@
+import os
+import tempfile
+import unittest
+
+from src.rlsdk import convert
+from src.rlsdk.configs import Agent, Simenv
+from src.rlsdk.local import CustomPackage, LocalTask
+
+WALK = '''from typing import List, Tuple
+
+from ..base import SimEngineBase, AnyDict, CommandType
+
+
+class Walk(SimEngineBase):
+
+    def __init__(self, *, length=3, max_steps=10):
+        super().__init__()
+        self.length = length
+        self.max_steps = max_steps
+        self.pos = 0
+        self.steps = 0
+
+    def control(self, type: CommandType, params: AnyDict = {}) -> bool:
+        if type == CommandType.EPISODE:
+            self.pos, self.steps = 0, 0
+        elif type == CommandType.STEP:
+            self.pos += params['actions']['move']
+            self.steps += 1
+        return True
+
+    def monitor(self) -> Tuple[AnyDict, List[str]]:
+        terminated = self.pos >= self.length
+        return {
+            'states': {'pos': self.pos},
+            'reward': 1.0 if terminated else 0.0,
+            'terminated': terminated,
+            'truncated': self.steps >= self.max_steps,
+        }, []
+'''
+
+SIFUNC = '''import numpy as np
+
+
+def func(states):
+    return np.array([states['pos']])
+'''
+
+OAFUNC = '''def func(outputs):
+    return {'move': 1}
+'''
+
+
+class LocalTaskTestCase(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.TemporaryDirectory()
+        cls.engine = os.path.join(cls.tmpdir.name, 'walk')
+        os.makedirs(cls.engine)
+        with open(os.path.join(cls.engine, '__init__.py'), 'w') as f:
+            f.write('from .walk import Walk  # noqa: F401\n')
+        with open(os.path.join(cls.engine, 'walk.py'), 'w') as f:
+            f.write(WALK)
+        with open('src/tests/examples/agent/reward_func.py', 'r') as f:
+            rewfunc = f.read()
+        cls.agent = Agent('Custom', {'obs_dim': 1, 'act_num': 2}, True, SIFUNC, OAFUNC, rewfunc)
+        cls.simenv = Simenv('Walk', {'length': 3})
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmpdir.cleanup()
+
+    def make_task(self, **kwargs) -> LocalTask:
+        return LocalTask(
+            self.agent,
+            self.simenv,
+            'src/tests/examples/agent/custom.py',
+            convert.pack_custom(self.engine),
+            model_base='src/tests/examples/agent/base.py',
+            engine_base='src/tests/examples/simenv/base.py',
+            **kwargs,
+        )
+
+    def test_00_package(self):
+        package = CustomPackage('src/tests/examples/simenv/custom', 'src/tests/examples/simenv/base.py')
+        self.assertTrue(hasattr(package.module, 'Custom'))
+        package.close()
+        self.assertFalse(os.path.exists(package.dir))
+        with self.assertRaises(ImportError):
+            CustomPackage('src/tests/examples/simenv/custom')
+
+    def test_01_step(self):
+        with self.make_task() as task:
+            transition = task.step()
+            self.assertEqual(transition['states'], {'pos': 0})
+            self.assertEqual(transition['next_states'], {'pos': 1})
+            self.assertEqual(transition['actions'], {'move': 1})
+            self.assertFalse(transition['terminated'])
+
+    def test_02_run(self):
+        with self.make_task(train_every=2) as task:
+            report = task.run(episodes=2)
+        self.assertEqual(report['steps'], 6)
+        self.assertEqual(report['episodes'], 2)
+        self.assertEqual(report['rewards'], [2.0, 2.0])
+        self.assertGreater(report['steps_per_sec'], 0)
+        self.assertEqual(report['stages']['react']['count'], 6)
+        self.assertEqual(report['stages']['sifunc']['count'], 8)
+        self.assertEqual(report['stages']['train']['count'], 3)
+        self.assertEqual(set(report['stages']), {'sifunc', 'react', 'oafunc', 'engine', 'rewfunc', 'store', 'train'})
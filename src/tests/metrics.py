@@ -0,0 +1,69 @@
+import json
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from src.rlsdk import testing
+from src.rlsdk.client import Client
+from src.rlsdk.metrics import Histogram, Metrics
+
+
+class MetricsTestCase(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.model = testing.StandInModel(weights={'w': np.zeros(1024)}, status={'steps': 1})
+        cls.bff, cls.address = testing.serve(testing.BFFStandIn({'agent': cls.model}))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.bff.stop(None)
+
+    def test_00_histogram(self):
+        hist = Histogram((1.0, 2.0, 4.0))
+        for value in [0.5, 1.5, 1.5, 3.0, 8.0]:
+            hist.observe(value)
+        self.assertEqual(hist.counts, [1, 2, 1, 1])
+        self.assertEqual(hist.count, 5)
+        self.assertAlmostEqual(hist.quantile(0.5), 1.75)
+        self.assertTrue(np.isnan(Histogram().quantile(0.5)))
+
+    def test_01_client(self):
+        metrics = Metrics()
+        with Client(self.address, metrics=metrics) as client:
+            client.get_model_weights(['agent'])
+            client.get_model_status(['agent'])
+            with self.assertRaises(Exception):
+                client.get_model_weights(['missing'])
+            stats = client.stats()
+        weights = stats['rpc']['BFF/GetModelWeights']
+        self.assertEqual(weights['latency']['count'], 2)
+        self.assertGreater(weights['response_bytes'], 8 * 1024)
+        self.assertEqual(sum(weights['errors'].values()), 1)
+        self.assertGreater(stats['serde']['loads/weights']['bytes'], 8 * 1024)
+        self.assertEqual(stats['serde']['loads/status']['seconds']['count'], 1)
+        with Client(self.address) as client:
+            self.assertEqual(client.stats(), {})
+
+    def test_02_export(self):
+        metrics = Metrics()
+        metrics.observe_rpc('BFF', 'Call', 0.003, 10, 20)
+        metrics.observe_rpc('BFF', 'Call', 0.2, 10, 0, 'UNAVAILABLE')
+        metrics.timed('dumps', 'weights', lambda obj: b'x' * 8, None)
+        text = metrics.to_prometheus()
+        self.assertIn('# TYPE rlsdk_rpc_latency_seconds histogram', text)
+        self.assertIn('rlsdk_rpc_latency_seconds_bucket{service="BFF",method="Call",le="+Inf"} 2', text)
+        self.assertIn('rlsdk_rpc_latency_seconds_count{service="BFF",method="Call"} 2', text)
+        self.assertIn('rlsdk_rpc_request_bytes_total{service="BFF",method="Call"} 20', text)
+        self.assertIn('rlsdk_rpc_errors_total{service="BFF",method="Call",code="UNAVAILABLE"} 1', text)
+        self.assertIn('rlsdk_serde_seconds_count{op="dumps",kind="weights"} 1', text)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'metrics.jsonl')
+            metrics.write_jsonl(path)
+            metrics.write_jsonl(path)
+            with open(path) as f:
+                lines = [json.loads(line) for line in f]
+        self.assertEqual(len(lines), 2)
+        self.assertEqual(lines[0]['serde']['dumps/weights']['bytes'], 8)
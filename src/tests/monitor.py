@@ -0,0 +1,65 @@
+import json
+import unittest
+
+from src.rlsdk import testing
+from src.rlsdk.client import Client
+from src.rlsdk.monitor import Backoff, MonitorCursor
+
+from src.rlsdk.protos import bff_pb2
+from src.rlsdk.protos import simenv_pb2
+
+
+def info(state, data, logs, indent=None):
+    return simenv_pb2.SimInfo(state=state, data=json.dumps(data), logs=json.dumps(logs, indent=indent))
+
+
+class ScriptedBFF(testing.BFFStandIn):
+
+    def __init__(self, snapshots):
+        super().__init__({})
+        self.snapshots = snapshots
+        self.polls = 0
+
+    def SimMonitor(self, request, context):
+        sim_info_map = bff_pb2.SimInfoMap()
+        sim_info_map.infos['simenv'].CopyFrom(self.snapshots[min(self.polls, len(self.snapshots) - 1)])
+        self.polls += 1
+        return sim_info_map
+
+
+class MonitorTestCase(unittest.TestCase):
+
+    def test_00_cursor(self):
+        cursor = MonitorCursor()
+        update = cursor.feed(info('running', {'a': 1, 'b': 2}, ['x']))
+        self.assertEqual(update, {'state': 'running', 'data': {'a': 1, 'b': 2}, 'removed': [], 'logs': ['x']})
+        self.assertIsNone(cursor.feed(info('running', {'a': 1, 'b': 2}, ['x'])))
+        update = cursor.feed(info('running', {'a': 1, 'c': 3}, ['x', 'y', 'z']))
+        self.assertEqual(update, {'state': 'running', 'data': {'c': 3}, 'removed': ['b'], 'logs': ['y', 'z']})
+        update = cursor.feed(info('stopped', {'a': 1, 'c': 3}, ['x', 'y', 'z']))
+        self.assertEqual(update, {'state': 'stopped', 'data': {}, 'removed': [], 'logs': []})
+
+    def test_01_logs(self):
+        cursor = MonitorCursor()
+        cursor.feed(info('', {}, [{'t': 0}], indent=1))
+        self.assertEqual(cursor.feed(info('', {}, [{'t': 0}, {'t': 1}], indent=1))['logs'], [{'t': 1}])
+        self.assertEqual(cursor.feed(info('', {}, [{'t': 1}, {'t': 2}, {'t': 3}]))['logs'], [{'t': 2}, {'t': 3}])
+        self.assertEqual(cursor.feed(info('', {}, [{'t': 9}]))['logs'], [{'t': 9}])
+
+    def test_02_backoff(self):
+        backoff = Backoff(0.1, 0.5)
+        self.assertEqual([backoff.next(False) for _ in range(4)], [0.2, 0.4, 0.5, 0.5])
+        self.assertEqual(backoff.next(True), 0.1)
+        with self.assertRaises(ValueError):
+            Backoff(1.0, 0.5)
+
+    def test_03_watch(self):
+        snapshots = [info('running', {'step': i // 2}, list(range(i // 2 + 1))) for i in range(6)]
+        bff, address = testing.serve(ScriptedBFF(snapshots))
+        try:
+            with Client(address) as client:
+                changes = list(client.watch_monitor(min_interval=0.01, max_interval=0.02, duration=0.5))
+        finally:
+            bff.stop(None)
+        self.assertEqual([c['simenv']['data'] for c in changes], [{'step': 0}, {'step': 1}, {'step': 2}])
+        self.assertEqual([c['simenv']['logs'] for c in changes], [[0], [1], [2]])
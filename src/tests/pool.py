@@ -0,0 +1,45 @@
+import unittest
+
+from src.rlsdk import testing
+from src.rlsdk.client import Client
+from src.rlsdk.pool import ChannelPool
+
+
+class PoolTestCase(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server, cls.address = testing.serve(testing.BFFStandIn({'agent': testing.StandInModel(weights={})}))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop(None)
+
+    def test_00_shared(self):
+        pool = ChannelPool()
+        clients = [Client(self.address, pool=pool) for _ in range(8)]
+        self.assertEqual(len(pool), 1)
+        self.assertTrue(all(client.channel is clients[0].channel for client in clients))
+        Client(self.address, max_msg_len=1, pool=pool).close()
+        self.assertEqual(len(pool), 2)
+        for client in clients:
+            client.close()
+        pool.close()
+        self.assertEqual(len(pool), 0)
+
+    def test_01_evict(self):
+        pool = ChannelPool(idle_timeout=60)
+        with Client(self.address, pool=pool) as client:
+            self.assertIn('agent', client.get_model_weights(ids=['agent']))
+            pool.evict(idle_timeout=0)
+            self.assertEqual(len(pool), 1)
+        self.assertIsNone(client.channel)
+        self.assertEqual(len(pool), 1)
+        pool.evict(idle_timeout=0)
+        self.assertEqual(len(pool), 0)
+
+    def test_02_timeout(self):
+        pool = ChannelPool()
+        with self.assertRaises(ConnectionError):
+            pool.acquire('localhost:1', timeout=0.1)
+        self.assertEqual(len(pool), 0)
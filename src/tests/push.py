@@ -0,0 +1,71 @@
+import copy
+import unittest
+
+from src.rlsdk import testing
+from src.rlsdk.configs import Agent, Simenv
+from src.rlsdk.task import Task
+
+
+class PushTestCase(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.path = 'src/tests/examples'
+        cls.agent = Agent.from_files(f'{cls.path}/agent')
+        cls.simenv = Simenv.from_files(f'{cls.path}/simenv')
+        cls.cluster = testing.StandInCluster(agents=2, simenvs=1)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.cluster.stop()
+
+    def make_task(self, agent1: Agent = None) -> Task:
+        agents = {'agent0': self.agent, 'agent1': agent1 or self.agent}
+        return Task(dict(self.cluster.services), agents, {'simenv0': self.simenv})
+
+    def test_00_digest(self):
+        agent = copy.deepcopy(self.agent)
+        agent.hypers = dict(reversed(list(agent.hypers.items())))
+        self.assertEqual(agent.digest(), self.agent.digest())
+        agent.training = not agent.training
+        self.assertNotEqual(agent.digest(), self.agent.digest())
+
+    def test_01_push(self):
+        with self.make_task() as task:
+            changed = task.push(self.cluster.address, reset=True)
+            self.assertEqual(sorted(changed), ['agent0', 'agent1', 'simenv0'])
+            self.assertTrue(task.inited)
+        with self.make_task() as task:
+            with self.assertRaises(RuntimeError):
+                task.push(self.cluster.address)
+            self.assertEqual(task.push(self.cluster.address, only_changed=True), [])
+
+    def test_02_reset(self):
+        with self.make_task() as task:
+            task.push(self.cluster.address, reset=True)
+            engine = self.cluster.engines['simenv0']
+            engine.steps = 5
+            self.assertEqual(sorted(task.push(self.cluster.address, reset=True)), ['agent0', 'agent1', 'simenv0'])
+            self.assertEqual(engine.steps, 0)
+            engine.steps = 5
+            self.assertEqual(task.push(self.cluster.address, reset=True, only_changed=True), [])
+            self.assertEqual(engine.steps, 5)
+
+    def test_03_changed(self):
+        agent1 = copy.deepcopy(self.agent)
+        agent1.training = not agent1.training
+        with self.make_task(agent1) as task:
+            with self.assertRaises(RuntimeError):
+                task.push(self.cluster.address, only_changed=True)
+            self.assertEqual(task.push(self.cluster.address, reset=True, only_changed=True), ['agent1'])
+            self.assertEqual(task.client.get_agent_mode(['agent1']), {'agent1': agent1.training})
+
+    def test_04_service_info(self):
+        with self.make_task() as task:
+            task.push(self.cluster.address, reset=True)
+        task = self.make_task()
+        task.services['agent0'] = copy.deepcopy(task.services['agent0'])
+        task.services['agent0'].desc = 'changed'
+        with task:
+            self.assertEqual(task.push(self.cluster.address, reset=True, only_changed=True), ['agent0'])
+            self.assertEqual(task.client.get_service_info(['agent0'])['agent0'].desc, 'changed')
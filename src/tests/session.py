@@ -0,0 +1,57 @@
+import unittest
+
+from src.rlsdk import convert
+from src.rlsdk import testing
+from src.rlsdk.client import Client
+from src.rlsdk.configs import Service
+from src.rlsdk.session import AgentSession, load_test
+
+
+class SessionTestCase(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.agent, cls.address = testing.serve(testing.AgentStandIn(testing.StandInModel()))
+        cls.states = [{'uav': [{'longitude': 122.0 + i, 'speed': i, 'alive': True}]} for i in range(8)]
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.agent.stop(None)
+
+    def test_00_act(self):
+        with AgentSession(self.address) as session:
+            action = session.act(self.states[0], timeout=5)
+            self.assertEqual(convert.decode_sim_action(action), self.states[0])
+
+    def test_01_pipeline(self):
+        with AgentSession(self.address) as session:
+            futures = [session.submit(state) for state in self.states]
+            actions = [convert.decode_sim_action(future.result(5)) for future in futures]
+        self.assertEqual(actions, self.states)
+
+    def test_02_fromservice(self):
+        host, port = self.address.rsplit(':', 1)
+        services = {'agent': Service('agent', 'agent', host, int(port), '')}
+        bff, address = testing.serve(testing.BFFStandIn({'agent': testing.StandInModel()}, services))
+        try:
+            with Client(address) as client, AgentSession.from_service(client, 'agent') as session:
+                self.assertIn('uav', session.act(self.states[1], timeout=5).actions)
+        finally:
+            bff.stop(None)
+
+    def test_03_loadtest(self):
+        report = load_test(self.address, self.states, streams=4, rate=400, duration=0.5, depth=2)
+        self.assertEqual(report['errors'], 0)
+        self.assertGreater(report['requests'], 100)
+        self.assertLessEqual(report['p50'], report['p99'])
+        report = load_test(self.address, self.states, streams=2, duration=0.3, depth=4)
+        self.assertGreater(report['throughput'], 0)
+
+    def test_04_unexpected(self):
+        with AgentSession(self.address) as session:
+            session.requests.put(convert.encode_sim_state(self.states[0]))
+            session.reader.join(5)
+            self.assertFalse(session.reader.is_alive())
+            self.assertIsInstance(session.error, RuntimeError)
+            with self.assertRaises(RuntimeError):
+                session.submit(self.states[1])
@@ -0,0 +1,66 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from src.rlsdk import shm
+from src.rlsdk import testing
+from src.rlsdk.client import Client
+from src.rlsdk.configs import Service
+
+
+def segments():
+    return [f for f in os.listdir(shm.SHM_DIR) if f.startswith(shm.PREFIX)]
+
+
+class ShmTestCase(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.TemporaryDirectory()
+        cls.cluster = testing.StandInCluster(agents=2, simenvs=1, host=f'unix:{cls.tmpdir.name}')
+        cls.before = set(segments())
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.cluster.stop()
+        cls.tmpdir.cleanup()
+
+    def setUp(self):
+        self.client = Client(self.cluster.address, use_shm=True)
+
+    def tearDown(self):
+        self.client.close()
+        self.assertEqual(set(segments()), self.before)
+
+    def test_00_address(self):
+        self.assertEqual(Service('agent', 'a', 'unix:/tmp/a.sock', 0, '').address, 'unix:/tmp/a.sock')
+        self.assertEqual(Service('agent', 'a', 'localhost', 8080, '').address, 'localhost:8080')
+        self.assertTrue(self.cluster.address.startswith('unix:'))
+        self.assertEqual(set(self.client.get_service_info().keys()), {'agent0', 'agent1', 'simenv0'})
+
+    def test_01_weights(self):
+        self.client.set_model_weights({'agent0': {'w': np.arange(8.0)}}, format='tensor')
+        np.testing.assert_array_equal(self.cluster.models['agent0'].weights['w'], np.arange(8.0))
+        weights = self.client.get_model_weights(['agent0'])
+        np.testing.assert_array_equal(weights['agent0']['w'], np.arange(8.0))
+
+    def test_02_buffer(self):
+        self.client.set_model_buffer({'agent0': [1, 2, 3], 'agent1': {'x': np.ones(4)}})
+        buffers = self.client.get_model_buffer(['agent0', 'agent1'])
+        self.assertEqual(buffers['agent0'], [1, 2, 3])
+        np.testing.assert_array_equal(buffers['agent1']['x'], np.ones(4))
+
+    def test_03_empty(self):
+        self.client.set_model_buffer({'agent0': b''}, format='pickle')
+        self.assertEqual(self.client.get_model_buffer(['agent0']), {'agent0': b''})
+
+    def test_04_errors(self):
+        handler = shm.ShmHandler({})
+        with self.assertRaises(RuntimeError):
+            shm.check((shm.NAME, *handler(shm.request_get('weights')[1], b'')))
+        with self.assertRaises(RuntimeError):
+            shm.check(('other', '', b''))
+        with self.assertRaises(ValueError):
+            shm.attach('../etc/passwd', 1)
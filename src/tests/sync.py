@@ -0,0 +1,104 @@
+import unittest
+
+import numpy as np
+
+from src.rlsdk import sync
+from src.rlsdk import testing
+from src.rlsdk.client import Client
+
+
+class SyncTestCase(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.models = {
+            'learner': testing.StandInModel(),
+            'actor1': testing.StandInModel(),
+            'actor2': testing.StandInModel(),
+            'legacy': testing.StandInModel(),
+        }
+        cls.models['legacy'].call = lambda name, dstr='', dbin=b'': (name, '', b'')
+        cls.server, cls.address = testing.serve(testing.BFFStandIn(cls.models))
+        cls.client = Client(cls.address)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop(None)
+
+    def weights(self):
+        return {
+            'body': [np.random.rand(256, 256).astype(np.float32) for _ in range(4)],
+            'head': np.random.rand(256, 8).astype(np.float32),
+            'steps': np.int64(0),
+        }
+
+    def assertSynced(self, weights, ids):
+        for id in ids:
+            for i in range(4):
+                np.testing.assert_array_equal(self.models[id].weights['body'][i], weights['body'][i])
+            np.testing.assert_array_equal(self.models[id].weights['head'], weights['head'])
+            self.assertEqual(self.models[id].weights['steps'], weights['steps'])
+
+    def test_00_delta(self):
+        state = sync.WeightSync()
+        weights = self.weights()
+        full = self.client.sync_model_weights({'actor1': weights, 'actor2': weights}, state)
+        self.assertSynced(weights, ['actor1', 'actor2'])
+
+        weights['head'] = weights['head'] + 1
+        weights['steps'] = np.int64(1)
+        delta = self.client.sync_model_weights({'actor1': weights, 'actor2': weights}, state)
+        self.assertSynced(weights, ['actor1', 'actor2'])
+        self.assertLess(delta['actor1'] * 10, full['actor1'])
+
+    def test_01_modes(self):
+        for mode in ['xor', 'sub']:
+            state = sync.WeightSync()
+            weights = self.weights()
+            self.client.sync_model_weights({'actor1': weights}, state, mode)
+            for _ in range(3):
+                weights['head'] = weights['head'] * 0.5
+                self.client.sync_model_weights({'actor1': weights}, state, mode)
+            if mode == 'xor':
+                self.assertSynced(weights, ['actor1'])
+            else:
+                np.testing.assert_allclose(self.models['actor1'].weights['head'], weights['head'], rtol=1e-6)
+
+    def test_02_fallback(self):
+        state = sync.WeightSync()
+        weights = self.weights()
+        self.client.sync_model_weights({'actor1': weights}, state)
+
+        weights = self.weights()
+        self.client.set_model_weights({'actor1': weights})
+        weights['head'] = weights['head'] + 1
+        sent = self.client.sync_model_weights({'actor1': weights}, state)
+        self.assertSynced(weights, ['actor1'])
+        self.assertGreater(sent['actor1'], 4 * 256 * 256 * 4)
+
+        self.client.sync_model_weights({'legacy': weights}, state)
+        self.assertSynced(weights, ['legacy'])
+        self.assertNotIn('legacy', state.peers)
+
+    def test_03_shared(self):
+        state = sync.WeightSync()
+        snapshots = state.snapshots({'actor1': self.weights(), 'actor2': self.weights()})
+        self.assertIsNot(snapshots['actor1'], snapshots['actor2'])
+
+        weights = self.weights()
+        snapshots = state.snapshots({'actor1': weights, 'actor2': weights})
+        self.assertIs(snapshots['actor1'], snapshots['actor2'])
+        for mode in ['replace', 'xor']:
+            first = state.patch('actor1', snapshots['actor1'], None, mode)
+            second = state.patch('actor2', snapshots['actor2'], None, mode)
+            self.assertIs(first[2], second[2])
+
+        self.client.sync_model_weights({'actor1': weights, 'actor2': weights}, state)
+        weights['head'] = weights['head'] + 1
+        snapshot = state.snapshots({'actor1': weights})['actor1']
+        heads = {id: state.peers[id].version for id in ['actor1', 'actor2']}
+        self.assertEqual(heads['actor1'], heads['actor2'])
+        first = state.patch('actor1', snapshot, heads['actor1'])
+        second = state.patch('actor2', snapshot, heads['actor2'])
+        self.assertIs(first[2], second[2])
+        self.assertLess(len(first[2]), 256 * 8 * 4 * 2)
@@ -80,3 +80,9 @@ class TaskTestCase(unittest.TestCase):
         task.pull(address=self.address, reset=True)
         infos = task.monitor()
         self.assertIn('simenv', infos)
+
+    def test_10_sync_weights(self):
+        task = Task()
+        task.pull(address=self.address, reset=True)
+        sent = task.sync_weights(src='agent', dsts=['agent'])
+        self.assertIn('agent', sent)
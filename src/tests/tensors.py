@@ -0,0 +1,54 @@
+import pickle
+import unittest
+
+import numpy as np
+
+from src.rlsdk import tensors
+from src.rlsdk import convert
+
+
+class TensorsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.weights = {
+            'actor': [np.random.rand(12, 64).astype(np.float32), np.zeros(64, dtype=np.float32)],
+            'critic': (np.arange(10)[::2], np.float64(0.5)),
+            1: {'steps': 100, 'name': 'dqn', 'none': None},
+            'struct': np.zeros(3, dtype=[('a', '<f8'), ('b', '<i4', (2,))]),
+        }
+
+    def test_00_roundtrip(self):
+        data = tensors.dumps(self.weights)
+        self.assertTrue(tensors.is_tensors(data))
+        weights = tensors.loads(data)
+        np.testing.assert_array_equal(weights['actor'][0], self.weights['actor'][0])
+        np.testing.assert_array_equal(weights['critic'][0], self.weights['critic'][0])
+        self.assertIsInstance(weights['critic'], tuple)
+        self.assertIsInstance(weights['critic'][1], np.float64)
+        self.assertEqual(weights[1], self.weights[1])
+        self.assertEqual(weights['struct'].dtype, self.weights['struct'].dtype)
+
+    def test_01_zerocopy(self):
+        data = tensors.dumps(self.weights)
+        weights = tensors.loads(data)
+        arr = weights['actor'][0]
+        self.assertFalse(arr.flags.writeable)
+        self.assertTrue(np.shares_memory(arr, np.frombuffer(data, dtype=np.uint8)))
+        weights = tensors.loads(data, copy=True)
+        self.assertTrue(weights['actor'][0].flags.writeable)
+
+    def test_02_invalid(self):
+        with self.assertRaises(TypeError):
+            tensors.dumps({'obj': np.array([object()])})
+        with self.assertRaises(TypeError):
+            tensors.dumps({'set': {1, 2}})
+        with self.assertRaises(ValueError):
+            tensors.loads(pickle.dumps({}))
+
+    def test_03_autodetect(self):
+        for format in ['pickle', 'tensor']:
+            msg = convert.encode_weights({'agent': self.weights}, format)
+            weights = convert.decode_weights(msg)
+            np.testing.assert_array_equal(weights['agent']['actor'][1], self.weights['actor'][1])
+        with self.assertRaises(ValueError):
+            convert.encode_weights({'agent': self.weights}, 'json')
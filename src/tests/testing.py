@@ -0,0 +1,65 @@
+import time
+import unittest
+
+import numpy as np
+
+from src.rlsdk import testing
+from src.rlsdk.client import Client
+from src.rlsdk.configs import Agent, Simenv
+from src.rlsdk.task import Task
+
+
+class TestingTestCase(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.cluster = testing.StandInCluster(agents=2, simenvs=1, payload_size=4096)
+        cls.path = 'src/tests/examples'
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.cluster.stop()
+
+    def test_00_task(self):
+        agent, simenv = Agent.from_files(f'{self.path}/agent'), Simenv.from_files(f'{self.path}/simenv')
+        task = Task(self.cluster.services, {'agent0': agent, 'agent1': agent}, {'simenv0': simenv})
+        with task:
+            task.push(self.cluster.address, reset=True)
+            details = task.details()
+            self.assertTrue(all(details[id]['inited'] for id in self.cluster.services))
+            self.assertEqual(details['simenv0']['infos']['state'], 'UNINITED')
+            task.init()
+            task.start()
+            self.assertEqual(task.monitor()['simenv0']['state'], 'RUNNING')
+            self.assertEqual(task.get_weights('agent0')['w'].nbytes, 4096)
+            task.set_status('agent1', {'loss': np.float32(0.5)})
+            self.assertEqual(task.get_status('agent1'), {'loss': 0.5})
+            task.stop()
+
+        pulled = Task()
+        with pulled:
+            pulled.pull(self.cluster.address)
+            self.assertEqual(set(pulled.agents.keys()), {'agent0', 'agent1'})
+            self.assertEqual(pulled.agents['agent0'].hypers, agent.hypers)
+
+    def test_01_client(self):
+        with Client(self.cluster.address) as client, Client(self.cluster.address, direct=True) as direct:
+            client.set_agent_mode({'agent0': True})
+            self.assertTrue(direct.get_agent_mode(['agent0'])['agent0'])
+            direct.set_model_buffer({'agent1': list(range(10))}, chunk_size=16)
+            self.assertEqual(client.get_model_buffer(['agent1']), {'agent1': list(range(10))})
+            self.assertEqual(client.call({'simenv0': ('echo', '', b'')}), {'simenv0': ('echo', '', b'')})
+            with self.assertRaises(Exception):
+                client.get_model_weights(['missing'])
+
+    def test_02_latency(self):
+        model = testing.StandInModel(latency=0.05)
+        bff, address = testing.serve(testing.BFFStandIn({'agent': model}))
+        try:
+            with Client(address) as client:
+                start = time.perf_counter()
+                client.get_model_status(['agent'])
+                client.get_model_weights(['agent'])
+                self.assertGreaterEqual(time.perf_counter() - start, 0.05)
+        finally:
+            bff.stop(None)
@@ -0,0 +1,76 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from src.rlsdk.configs import Agent, Simenv
+from src.rlsdk.vector import VectorEnv
+from src.tests.local import OAFUNC, SIFUNC, WALK
+
+
+class VectorEnvTestCase(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.TemporaryDirectory()
+        cls.engine = os.path.join(cls.tmpdir.name, 'walk')
+        os.makedirs(cls.engine)
+        with open(os.path.join(cls.engine, '__init__.py'), 'w') as f:
+            f.write('from .walk import Walk  # noqa: F401\n')
+        with open(os.path.join(cls.engine, 'walk.py'), 'w') as f:
+            f.write(WALK)
+        cls.agent = Agent('Custom', {'obs_dim': 1, 'act_num': 2}, True, SIFUNC, OAFUNC, '')
+        cls.envs = VectorEnv(
+            Simenv('Walk', {'length': 3}),
+            cls.engine,
+            4,
+            engine_base='src/tests/examples/simenv/base.py',
+            agent=cls.agent,
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.envs.close()
+        cls.tmpdir.cleanup()
+
+    def setUp(self):
+        self.envs.reset()
+
+    def test_00_step(self):
+        np.testing.assert_array_equal(self.envs.obs, np.zeros((4, 1)))
+        obs, rewards, terminated, truncated, infos = self.envs.step([0] * 4)
+        np.testing.assert_array_equal(obs, np.ones((4, 1)))
+        np.testing.assert_array_equal(rewards, np.zeros(4))
+        self.assertFalse(terminated.any() or truncated.any())
+        self.envs.step([0] * 4)
+        obs, rewards, terminated, _, infos = self.envs.step([0] * 4)
+        self.assertTrue(terminated.all())
+        np.testing.assert_array_equal(rewards, np.ones(4))
+        np.testing.assert_array_equal(obs, np.zeros((4, 1)))
+        np.testing.assert_array_equal(infos[0]['final_obs'], [3])
+
+    def test_01_async(self):
+        self.envs.step_async({0: 0, 1: 0})
+        with self.assertRaises(RuntimeError):
+            self.envs.step_async({0: 0})
+        infos = self.envs.step_wait(2)
+        self.assertEqual(set(infos), {0, 1})
+        np.testing.assert_array_equal(self.envs.obs[:, 0], [1, 1, 0, 0])
+
+    def test_02_run(self):
+        batches = []
+
+        def react(obs):
+            batches.append(len(obs))
+            return [0] * len(obs)
+
+        steps = self.envs.env_steps
+        report = self.envs.run(react, 12)
+        self.assertEqual(report['env_steps'] - steps, 12)
+        self.assertEqual(batches, [4, 4, 4])
+        report = self.envs.run(react, 10, asynchronous=True)
+        self.assertEqual(report['env_steps'] - steps, 22)
+        self.assertGreater(report['steps_per_sec'], 0)
+        self.assertGreaterEqual(report['episodes'], 4)
+        self.assertEqual(report['returns'][0], 1.0)
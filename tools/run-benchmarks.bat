@@ -0,0 +1,4 @@
+@echo off
+
+@REM extra arguments are passed to `python -m benchmarks run`, e.g. --sizes 1KB,1MB --services 1,4
+python -m benchmarks run %*